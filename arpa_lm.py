@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:41:09 2026
+
+@author: Samuele Garda
+"""
+
+import time
+import logging
+import argparse
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def parse_arguments():
+  """
+  Parse command line arguments.
+  """
+  
+  parser = argparse.ArgumentParser(description='Compare ARPA language model with KenLM')
+  
+  parser.add_argument('--arpa',required = True, type = str, help = "Path to ARPA language model")
+  parser.add_argument('--text',required = True, type = str, help = "Path to text file, one sentence per line")
+  parser.add_argument('--kenlm',default = None, type = str, help = "Path to KenLM model. If not given the ARPA file is used")
+  parser.add_argument('--hashed',action = 'store_true', help = "Index n-grams with dictionaries")
+  
+  return parser.parse_args()
+
+
+class ArpaState(object):
+  """
+  Language model state: indices of the last words of context, at most `order - 1`.
+  """
+  
+  __slots__ = ("words",)
+  
+  def __init__(self,words = ()):
+    """
+    Initialize ArpaState.
+    
+    Args:
+      words (tuple) : indices of context words, most recent last
+    """
+    
+    self.words = words
+  
+  def __hash__(self):
+    return hash(self.words)
+  
+  def __eq__(self,other):
+    return isinstance(other,ArpaState) and self.words == other.words
+
+
+class ArpaModel(object):
+  """
+  N-gram language model loaded from an ARPA file, exposing the subset of `kenlm.Model` interface
+  used by the rankers : `order`, `score`, `BeginSentenceWrite`, `NullContextWrite` and `BaseScore`.
+  Scores are log10 probabilities with backoff, as in KenLM.
+  
+  N-grams of each order are stored in sorted arrays of keys, where the key of n-gram `w_1 ... w_n` is:
+  
+  .. math::
+    index(w_1 ... w_{n-1}) \\times V + id(w_n)
+  
+  with `V` the vocabulary size. N-grams are found by binary search, one order at a time.
+  If `hashed` is True keys are indexed with dictionaries as well: lookups are faster but use more memory.
+  """
+  
+  State = ArpaState
+  
+  def __init__(self,path,hashed = False):
+    """
+    Initialize ArpaModel.
+    
+    Args:
+      path (str) : system path to ARPA file
+      hashed (bool) : index n-gram keys with dictionaries
+    """
+    
+    self.vocab = {}
+    self.probs = []
+    self.backoffs = []
+    self.keys = []
+    self.index = None
+    
+    self.load(path)
+    
+    self.index = [{int(k) : i for i,k in enumerate(keys)} for keys in self.keys] if hashed else None
+    
+    self.order = len(self.probs)
+    self.bos = self.vocab.get("<s>")
+    self.eos = self.vocab.get("</s>")
+    self.unk = self.vocab.get("<unk>")
+    
+    logger.info("Loaded {}-gram ARPA language model from : `{}`".format(self.order,path))
+  
+  def read_sections(self,path):
+    """
+    Read n-grams from ARPA file.
+    
+    Args:
+      path (str) : system path to ARPA file
+    Return:
+      (generator) : generator of tuples (order,list of (log10 probability, words, log10 backoff))
+    """
+    
+    order = None
+    entries = []
+    
+    with open(path, encoding = "utf-8") as infile:
+      for line in infile:
+        line = line.strip()
+        if not line:
+          continue
+        if line.startswith("\\") and line.endswith("-grams:"):
+          if order is not None:
+            yield order,entries
+          order = int(line[1:].split("-")[0])
+          entries = []
+        elif line == "\\end\\":
+          break
+        elif order is not None:
+          fields = line.split("\t")
+          backoff = float(fields[2]) if len(fields) > 2 else 0.0
+          entries.append((float(fields[0]),fields[1].split(),backoff))
+    
+    if order is not None:
+      yield order,entries
+  
+  def load(self,path):
+    """
+    Build n-gram tables from ARPA file.
+    
+    Args:
+      path (str) : system path to ARPA file
+    """
+    
+    for order,entries in self.read_sections(path):
+      
+      if order == 1:
+        
+        for _,words,_ in entries:
+          self.vocab.setdefault(words[0],len(self.vocab))
+        
+        if "<unk>" not in self.vocab:
+          # KenLM assigns this probability to unknown words missing from ARPA file
+          self.vocab["<unk>"] = len(self.vocab)
+          entries.append((-100.0,["<unk>"],0.0))
+        
+        probs = np.zeros(len(self.vocab), dtype = np.float32)
+        backoffs = np.zeros(len(self.vocab), dtype = np.float32)
+        for prob,words,backoff in entries:
+          probs[self.vocab[words[0]]] = prob
+          backoffs[self.vocab[words[0]]] = backoff
+        keys = np.arange(len(self.vocab), dtype = np.uint64)
+      
+      else:
+        
+        V = len(self.vocab)
+        keys = np.asarray([self.lookup([self.vocab[w] for w in words[:-1]]) * V + self.vocab[words[-1]] for _,words,_ in entries],
+                          dtype = np.uint64)
+        order_idx = np.argsort(keys, kind = "stable")
+        keys = keys[order_idx]
+        probs = np.asarray([e[0] for e in entries], dtype = np.float32)[order_idx]
+        backoffs = np.asarray([e[2] for e in entries], dtype = np.float32)[order_idx]
+      
+      self.keys.append(keys)
+      self.probs.append(probs)
+      self.backoffs.append(backoffs)
+  
+  def lookup(self,ids):
+    """
+    Find n-gram in tables.
+    
+    Args:
+      ids (list or tuple) : word indices of n-gram
+    Return:
+      idx (int or None) : position of n-gram in table of its order. None if n-gram is not in language model
+    """
+    
+    if not ids or len(ids) > len(self.keys):
+      return None
+    
+    idx = ids[0]
+    V = len(self.vocab)
+    
+    for n in range(1,len(ids)):
+      key = idx * V + ids[n]
+      if self.index is not None:
+        idx = self.index[n].get(key)
+        if idx is None:
+          return None
+      else:
+        keys = self.keys[n]
+        idx = int(np.searchsorted(keys,key))
+        if idx >= len(keys) or keys[idx] != key:
+          return None
+    
+    return idx
+  
+  def BeginSentenceWrite(self,state):
+    """
+    Set state to beginning of sentence.
+    
+    Args:
+      state (ArpaState) : language model state
+    """
+    
+    state.words = (self.bos,)
+  
+  def NullContextWrite(self,state):
+    """
+    Set state to empty context.
+    
+    Args:
+      state (ArpaState) : language model state
+    """
+    
+    state.words = ()
+  
+  def BaseScore(self,in_state,word,out_state):
+    """
+    Score word following a language model state, backing off to shorter contexts if needed.
+    
+    Args:
+      in_state (ArpaState) : language model state
+      word (str) : word
+      out_state (ArpaState) : language model state after word. It is overwritten
+    Return:
+      score (float) : log10 probability of word
+    """
+    
+    wid = self.vocab.get(word,self.unk)
+    context = in_state.words
+    score = 0.0
+    
+    for start in range(len(context) + 1):
+      history = context[start:]
+      idx = self.lookup(history + (wid,))
+      if idx is not None:
+        score += float(self.probs[len(history)][idx])
+        break
+      hist_idx = self.lookup(history)
+      if hist_idx is not None:
+        score += float(self.backoffs[len(history) - 1][hist_idx])
+    
+    # keep the longest context that can still be extended
+    words = (context + (wid,))[-(self.order - 1):] if self.order > 1 else ()
+    while words and self.lookup(words) is None:
+      words = words[1:]
+    out_state.words = words
+    
+    return score
+  
+  def score(self,sentence,bos = True,eos = True):
+    """
+    Score sentence.
+    
+    Args:
+      sentence (str) : sentence
+      bos (bool) : sentence starts with beginning of sentence marker
+      eos (bool) : sentence ends with end of sentence marker
+    Return:
+      score (float) : log10 probability of sentence
+    """
+    
+    state = ArpaState()
+    
+    if bos:
+      self.BeginSentenceWrite(state)
+    else:
+      self.NullContextWrite(state)
+    
+    words = sentence.split() + (["</s>"] if eos else [])
+    
+    score = 0.0
+    
+    for word in words:
+      out_state = ArpaState()
+      score += self.BaseScore(state,word,out_state)
+      state = out_state
+    
+    return score
+
+
+def compare_with_kenlm(arpa_lm,kenlm_lm,sentences):
+  """
+  Compare scores and throughput of ArpaModel and KenLM.
+  
+  Args:
+    arpa_lm (ArpaModel) : ARPA language model
+    kenlm_lm (kenlm.Model) : KenLM language model
+    sentences (list) : sentences
+  """
+  
+  for name,lm in [("ArpaModel",arpa_lm),("KenLM",kenlm_lm)]:
+    
+    start = time.perf_counter()
+    scores = [lm.score(sent, bos = True, eos = True) for sent in sentences]
+    elapsed = time.perf_counter() - start
+    words = sum(len(sent.split()) + 1 for sent in sentences)
+    
+    logger.info("{} : {} sentences in {:.3f}s ({:.0f} words/s)".format(name,len(sentences),elapsed,words / max(elapsed,1e-9)))
+    
+    if name == "ArpaModel":
+      arpa_scores = scores
+    else:
+      diff = max([abs(a - k) for a,k in zip(arpa_scores,scores)] or [0.0])
+      logger.info("Maximum score difference : {:.6f}".format(diff))
+
+
+if __name__ == "__main__":
+  
+  logging.basicConfig(format = '%(asctime)s : %(levelname)s : %(module)s: %(message)s', level = 'INFO')
+  
+  args = parse_arguments()
+  
+  arpa_lm = ArpaModel(args.arpa, hashed = args.hashed)
+  
+  with open(args.text) as infile:
+    sentences = [line.strip() for line in infile if line.strip()]
+  
+  try:
+    import kenlm
+  except ImportError:
+    kenlm = None
+  
+  if kenlm is not None:
+    
+    compare_with_kenlm(arpa_lm,kenlm.Model(args.kenlm if args.kenlm is not None else args.arpa),sentences)
+  
+  else:
+    
+    start = time.perf_counter()
+    for sent in sentences:
+      arpa_lm.score(sent)
+    logger.info("KenLM not installed. ArpaModel : {} sentences in {:.3f}s".format(len(sentences),time.perf_counter() - start))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:31 2026
+
+@author: Samuele Garda
+"""
+
+
+class Candidate(object):
+  """
+  Simplification candidate (or complex word) carried through the pipeline components.
+  
+  It stores the scores computed on the word by the components: each score is computed
+  by the first component which needs it and then read by the following ones.
+  
+  Candidates are hashed and compared by their word,
+  hence they can be put in sets and compared with plain strings.
+  """
+  
+  __slots__ = ("word","similarity","complex_freq","simple_freq","complexity_score","pos")
+  
+  def __init__(self,word,similarity = None,complex_freq = None,simple_freq = None,complexity_score = None,pos = None):
+    """
+    Initialize Candidate.
+    
+    Args:
+      word (str) : word
+      similarity (float or None) : cosine similarity with complex word
+      complex_freq (int or None) : frequency in complex vocabulary
+      simple_freq (int or None) : frequency in simple vocabulary
+      complexity_score (float or None) : complexity score
+      pos (str or None) : Part of Speech tag
+    """
+    
+    self.word = word
+    self.similarity = similarity
+    self.complex_freq = complex_freq
+    self.simple_freq = simple_freq
+    self.complexity_score = complexity_score
+    self.pos = pos
+  
+  def copy(self):
+    """
+    Copy candidate with the scores that do not depend on context. 
+    Part of Speech tag is not copied, since it depends on the context in which the word is placed.
+    
+    Return:
+      candidate (Candidate) : candidate record
+    """
+    
+    candidate = Candidate(self.word,
+                          similarity = self.similarity,
+                          complex_freq = self.complex_freq,
+                          simple_freq = self.simple_freq,
+                          complexity_score = self.complexity_score)
+    
+    return candidate
+  
+  def __hash__(self):
+    return hash(self.word)
+  
+  def __eq__(self,other):
+    other = other.word if isinstance(other,Candidate) else other
+    return self.word == other
+  
+  def __str__(self):
+    return self.word
+  
+  def __repr__(self):
+    return "Candidate({!r}, similarity = {}, complexity_score = {}, pos = {})".format(self.word,self.similarity,
+                      self.complexity_score,self.pos)
+
+
+def as_candidate(word):
+  """
+  Wrap word into a Candidate. If `word` is already a Candidate it is returned as it is,
+  keeping the scores already computed.
+  
+  Args:
+    word (str or Candidate) : word
+  Return:
+    candidate (Candidate) : candidate record for word
+  """
+  
+  candidate = word if isinstance(word,Candidate) else Candidate(word)
+  
+  return candidate
+
+def get_similarity(model,complex_word,candidate):
+  """
+  Get cosine similarity between candidate and complex word. It is computed
+  with the embedding model only if the generator did not provide it.
+  
+  Args:
+    model (gensim.models.*) : embedding model
+    complex_word (str or Candidate) : complex word
+    candidate (Candidate) : simplification candidate
+  Return:
+    similarity (float) : cosine similarity
+  """
+  
+  if candidate.similarity is None:
+    candidate.similarity = model.similarity(str(complex_word),candidate.word)
+  
+  similarity = candidate.similarity
+  
+  return similarity
+
+def get_words(candidates):
+  """
+  Get words from candidate records.
+  
+  Args:
+    candidates (list) : list of Candidate
+  Return:
+    words (list) : list of words
+  """
+  
+  words = [c.word for c in candidates]
+  
+  return words
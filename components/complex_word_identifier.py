@@ -6,7 +6,9 @@ Created on Fri Sep 21 16:13:46 2018
 @author: Samuele Garda
 """
 
+import numpy as np
 from abc import ABCMeta,abstractmethod
+from components.candidates import Candidate
 
 
 class AbstractComplexWordIdentifier(object,metaclass = ABCMeta):
@@ -26,6 +28,34 @@ class AbstractComplexWordIdentifier(object,metaclass = ABCMeta):
       res (bool) : whether the word is considered complex
     """
     pass
+  
+  def is_complex_batch(self,tokens):
+    """
+    Determine which words are considered complex.
+    
+    Args:
+      tokens (list) : words
+    Return:
+      mask (np.ndarray) : boolean mask, True where word is considered complex
+    """
+    
+    mask = np.asarray([self.is_complex(t) for t in tokens], dtype = bool)
+    
+    return mask
+  
+  def get_complex_positions(self,sentence):
+    """
+    Find complex words in sentence.
+    
+    Args:
+      sentence (components.sentence.Sentence) : annotated sentence
+    Return:
+      positions (list) : positions of complex words in sentence
+    """
+    
+    positions = np.flatnonzero(self.is_complex_batch(sentence.words)).tolist()
+    
+    return positions
 
 class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
   """
@@ -33,6 +63,11 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
   
   Frequency of word in a 'complex' and 'simple' vocabulary are combined to obtain a score.
   If that score is below a given threshold the word is considered complex.
+  
+  Frequencies and scores of all words in the two vocabularies are stored in arrays aligned with `word2id`,
+  so that many words are scored at once with array indexing. If frequencies are memory mapped stores
+  (`freq_store.FrequencyStore`) scores are not precomputed, not to load all words in memory.
+  Arrays are built on first use, so that frequencies can be loaded lazily (see `resources.LazyResource`).
   """
 
   
@@ -41,22 +76,55 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
     Initialize DummyComplexWordIdentifier.
     
     Args:
-      complex_freq (dict) : lookup complex word -> frequency
-      simple_freq (dict) : lookup simple word -> frequency
+      complex_freq (dict or freq_store.FrequencyStore) : lookup complex word -> frequency
+      simple_freq (dict or freq_store.FrequencyStore) : lookup simple word -> frequency
       threshold (int) : threshold below which word is considered complex
     """
     
     self.complex_freq = complex_freq
     self.simple_freq = simple_freq
     self.threshold = threshold
+    self._word2id = None
+    self._scores = None
+  
+  def precompute(self):
+    """
+    Build lookup word -> index and array of complexity scores of all words in the two vocabularies.
+    """
+    
+    complex_freq = self.complex_freq
+    simple_freq = self.simple_freq
+    
+    precompute = isinstance(complex_freq,dict) and isinstance(simple_freq,dict)
+    
+    word2id = {w : i for i,w in enumerate(dict.fromkeys(list(complex_freq) + list(simple_freq)))} if precompute else {}
+    
+    words = list(word2id)
+    complex_freqs = np.asarray([complex_freq.get(w,1e-10) for w in words], dtype = np.float64)
+    simple_freqs = np.asarray([simple_freq.get(w,1e-10) for w in words], dtype = np.float64)
+    lengths = np.asarray([len(w) for w in words], dtype = np.float64)
     
+    self._scores = (complex_freqs / simple_freqs) * lengths
+    self._word2id = word2id
+  
+  @property
+  def word2id(self):
+    if self._word2id is None:
+      self.precompute()
+    return self._word2id
+  
+  @property
+  def scores(self):
+    if self._word2id is None:
+      self.precompute()
+    return self._scores
   
   def is_complex(self,word):
     """
     Determine if a word is considered complex.
     
     Args:
-      word (str) : word
+      word (str or Candidate) : word
     Return:
       res (bool) : whether the word is considered complex
     """
@@ -67,6 +135,46 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
     
     return res
   
+  def is_complex_batch(self,tokens):
+    """
+    Determine which words are considered complex.
+    
+    Args:
+      tokens (list) : words (str or Candidate)
+    Return:
+      mask (np.ndarray) : boolean mask, True where word is considered complex
+    """
+    
+    mask = self.get_complexity_scores(tokens) <= self.threshold
+    
+    return mask
+  
+  def get_complexity_scores(self,tokens):
+    """
+    Compute complexity score of many words at once. Each distinct word is looked up only once
+    and scores are read from the precomputed array.
+    
+    Args:
+      tokens (list) : words (str or Candidate)
+    Return:
+      scores (np.ndarray) : complexity scores
+    """
+    
+    if not len(tokens):
+      return np.zeros(0, dtype = np.float64)
+    
+    words,inverse = np.unique([str(t) for t in tokens], return_inverse = True)
+    
+    ids = np.asarray([self.word2id.get(w,-1) for w in words], dtype = np.int64)
+    
+    scores = np.asarray([(self.get_complex_freq(w) / self.get_simple_freq(w)) * len(w) if i < 0 else 0.0 
+                         for w,i in zip(words,ids)], dtype = np.float64)
+    scores[ids >= 0] = self.scores[ids[ids >= 0]]
+    
+    scores = scores[inverse.reshape(-1)]
+    
+    return scores
+  
   def get_complexity_score(self,word):
     """
     Compute complexity score. The following computes the score:
@@ -77,12 +185,26 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
     where `sf` is frequency in simple vocabulary, `cf` in complex and
     `length` is the number of word's charcters 
     
+    If `word` is a Candidate the score is computed only once and stored in it.
+    
     Args:
-      word (str) : word
+      word (str or Candidate) : word
     Return:
       score (int) : complexity score
     """
     
+    if isinstance(word,Candidate):
+      
+      if word.complexity_score is None:
+        word.complexity_score = self.get_complexity_score(word.word)
+      
+      return word.complexity_score
+    
+    idx = self.word2id.get(word)
+    
+    if idx is not None:
+      return float(self.scores[idx])
+    
     sci_f = self.get_complex_freq(word)
     
     std_f = self.get_simple_freq(word)
@@ -98,11 +220,18 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
     Get word frequency in complex vocabulary
     
     Args:
-      word (str) : word
+      word (str or Candidate) : word
     Return:
       freq (int) : word frequency
     """
     
+    if isinstance(word,Candidate):
+      
+      if word.complex_freq is None:
+        word.complex_freq = self.get_complex_freq(word.word)
+      
+      return word.complex_freq
+    
     freq = self.complex_freq.get(word,1e-10)
     return freq
   
@@ -111,11 +240,18 @@ class DummyComplexWordIdentifier(AbstractComplexWordIdentifier):
     Get word frequency in simple vocabulary
     
     Args:
-      word (str) : word
+      word (str or Candidate) : word
     Return:
       freq (int) :  word frequency
     """
     
+    if isinstance(word,Candidate):
+      
+      if word.simple_freq is None:
+        word.simple_freq = self.get_simple_freq(word.word)
+      
+      return word.simple_freq
+    
     freq = self.simple_freq.get(word,1e-10)
     return freq
 
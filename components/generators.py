@@ -7,7 +7,9 @@ Created on Fri Sep 21 15:47:18 2018
 """
 
 
+import numpy as np
 from abc import ABCMeta,abstractmethod
+from components.candidates import Candidate
 
 
 class AbstractGenerator(object, metaclass = ABCMeta):
@@ -44,8 +46,8 @@ class Word2VecGenerator(AbstractGenerator):
   Implements substitute generator with word2vec or fasttext model.
   """
   
-  def __init__(self):
-    super(Word2VecGenerator,self).__init__()
+  def __init__(self,topn):
+    super(Word2VecGenerator,self).__init__(topn)
   
   def get_candidates(self,model,word):
     """
@@ -53,13 +55,13 @@ class Word2VecGenerator(AbstractGenerator):
     
     Args:
       model (gensim.models.Word2Vec or gensim.models.FastText) : embeddings model
-      word (str) : complex word
+      word (str or Candidate) : complex word
     Return:
-      subs (list) : substitution candidates
+      subs (list) : substitution candidates (Candidate) with their cosine similarity
     """
     
     try:
-      subs = [w[0].lower() for w in model.most_similar(word,topn = self.topn)] 
+      subs = [Candidate(w.lower(),similarity = s) for w,s in model.most_similar(str(word),topn = self.topn)] 
     
     except KeyError:
 
@@ -67,14 +69,42 @@ class Word2VecGenerator(AbstractGenerator):
     
     return subs
   
+  def get_candidate_ids(self,vocab,idx):
+    """
+    Retrive indices of substitution candidates from vocabulary via cosine similarity.
+    They are read from the table of nearest neighbors of vocabulary, if it has been computed.
+    
+    Args:
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+      idx (int) : index of complex word
+    Return:
+      ids (np.ndarray) : indices of substitution candidates, by decreasing similarity
+      sims (np.ndarray) : cosine similarity of substitution candidates
+    """
+    
+    ids,sims = vocab.get_neighbors(idx,self.topn)
+    
+    if ids is not None:
+      return ids,sims
+    
+    sims = vocab.similarity(idx)
+    sims[idx] = -np.inf
+    
+    topn = min(self.topn,len(sims) - 1)
+    
+    ids = np.argpartition(-sims,topn)[:topn]
+    ids = ids[np.argsort(-sims[ids], kind = "stable")]
+    
+    return ids,sims[ids]
+  
   
 class PoincareGenerator(AbstractGenerator):
   """
   Implement substitute generator with Poincare embedding model.
   """
   
-  def __init__(self):
-    super(PoincareGenerator,self).__init__()
+  def __init__(self,topn):
+    super(PoincareGenerator,self).__init__(topn)
     
   def get_candidates(self,model,word):
     """
@@ -82,14 +112,14 @@ class PoincareGenerator(AbstractGenerator):
     
     Args:
       model (gensim.models.PoincareModel) : embeddings model
-      word (str) : complex word
+      word (str or Candidate) : complex word
     Return:
-      subs (list) : substitution candidates
+      subs (list) : substitution candidates (Candidate) with their similarity
     """
     
     try:
-      
-      substitutions = [w[0] for w in model.kv.most_similar(word,topn = self.topn)]
+      # Poincare similarity as in `gensim.models.poincare.PoincareKeyedVectors.similarity`
+      substitutions = [Candidate(w,similarity = 1 / (1 + d)) for w,d in model.kv.most_similar(str(word),topn = self.topn)]
       
     except KeyError:
       
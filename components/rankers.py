@@ -6,7 +6,22 @@ Created on Fri Sep 21 16:23:14 2018
 @author: Samuele Garda
 """
 
+import heapq
+import logging
+import threading
+import numpy as np
 from abc import ABCMeta,abstractmethod
+from components.sentence import Sentence
+from components.candidates import as_candidate,get_similarity
+from collections import OrderedDict
+
+try:
+  import kenlm
+except ImportError:
+  kenlm = None
+
+
+logger = logging.getLogger(__name__)
 
 
 class AbstractRanker(object,metaclass = ABCMeta):
@@ -29,48 +44,454 @@ class SimpleScienceRanker(AbstractRanker):
   
   Kim, Yea Seul, et al. "Simplescience: Lexical simplification of scientific terminology."
   Proceedings of the 2016 Conference on Empirical Methods in Natural Language Processing. 2016.
+  
+  Similarities not provided by the generator are computed at once with a matrix-vector product
+  and only the best `topk` candidates are fully sorted.
   """  
   
-  def rank_candidates(complex_word,candidates,model):
+  def __init__(self,topk = None):
+    """
+    Initialize Ranker.
+    
+    Args:
+      topk (int or None) : number of ranked candidates to return. If None return all of them
+    """
+    
+    self.topk = topk
+  
+  def get_unit_vectors(self,model,words):
+    """
+    Get unit length word vectors.
+    
+    Args:
+      model (gensim.models.*) : embedding model
+      words (list) : words
+    Return:
+      vectors (np.ndarray) : matrix of word vectors, one per row
+    """
+    
+    wv = model.wv if hasattr(model,"wv") else model
+    
+    vectors = np.asarray([wv[w] for w in words], dtype = np.float32).reshape(len(words),-1)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis = 1, keepdims = True), 1e-8)
+    
+    return vectors
+  
+  def get_top_indices(self,sims):
+    """
+    Get positions of best `topk` similarities, in decreasing order. Ties keep input order.
+    
+    Args:
+      sims (np.ndarray) : cosine similarities
+    Return:
+      top (np.ndarray) : positions of best similarities
+    """
+    
+    top = np.arange(len(sims))
+    
+    if self.topk is not None and self.topk < len(sims):
+      # threshold of partial sort, then keep ties in input order
+      kth = -np.partition(-sims,self.topk - 1)[self.topk - 1]
+      top = top[sims >= kth]
+    
+    top = top[np.argsort(-sims[top], kind = "stable")][:self.topk]
+    
+    return top
+  
+  def fill_similarities(self,complex_word,candidates,model):
+    """
+    Compute with a single matrix-vector product all similarities not provided by the generator
+    and store them in candidate records.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates (Candidate)
+      model (gensim.models.*) : embedding model
+    """
+    
+    missing = [c for c in candidates if c.similarity is None]
+    
+    if missing:
+      
+      words = list(dict.fromkeys([str(c) for c in missing]))
+      word2row = {w : i for i,w in enumerate(words)}
+      
+      sims = self.get_unit_vectors(model,words).dot(self.get_unit_vectors(model,[str(complex_word)])[0])
+      
+      for c in missing:
+        c.similarity = float(sims[word2row[str(c)]])
+  
+  def rank_candidates(self,complex_word,candidates,model):
     """
-    Sort simplification candidates in decreasing cosine similarity with compelx word
+    Sort simplification candidates in decreasing cosine similarity with compelx word.
+    The similarity is computed only if not already provided by the generator.
     
     Args:
-      complex_word (str) : word
+      complex_word (str or Candidate) : word
       model (gensim.models.Word2Vec) : embedding model
-      candidates (list) : simplification candidates
+      candidates (list) : simplification candidates (str or Candidate)
     Return:
       candidates (list) : ranked simplification candidates
     """
     
-    candidates = [(sub,model.similarity(sub,complex_word)) for sub in candidates]
+    candidates = [as_candidate(c) for c in candidates]
     
-    candidates = sorted(candidates , key=lambda tup: tup[1], reverse = True)
-  
-    candidates = [sub[0] for sub in candidates]
+    self.fill_similarities(complex_word,candidates,model)
+    
+    sims = np.asarray([c.similarity for c in candidates], dtype = np.float64)
+    
+    candidates = [candidates[i] for i in self.get_top_indices(sims)]
     
 #    print("Ranked : {}".format(subs))
     
     return candidates
   
+  def rank_candidate_ids(self,ids,sims,complex_word = None,vocab = None):
+    """
+    Sort indices of simplification candidates in decreasing cosine similarity with complex word
+    
+    Args:
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      complex_word (str or Candidate or None) : word. Not needed
+      vocab (components.vocabulary.Vocabulary or None) : vocabulary of embedding model. Not needed
+    Return:
+      ids (np.ndarray) : ranked indices of simplification candidates
+    """
+    
+    ids = ids[self.get_top_indices(sims)]
+    
+    return ids
+  
+  def rank_candidate_ids_batch(self,pairs,truncate = True):
+    """
+    Sort indices of simplification candidates of many complex words at once, e.g. of a whole document.
+    Candidates of all complex words are concatenated and sorted with a single array sort,
+    grouped by complex word and by decreasing cosine similarity. Ties keep input order, as in `rank_candidate_ids`.
+    
+    Ranking by similarity does not depend on context and is preserved by filters : 
+    candidates can be ranked before filtering them in context, if they are not truncated.
+    
+    Args:
+      pairs (list) : list of tuples (indices of simplification candidates,cosine similarities), one per complex word
+      truncate (bool) : keep only best `topk` candidates. If False all candidates are kept, sorted
+    Return:
+      ranked (list) : list of tuples (ranked indices,their similarity), one per complex word
+    """
+    
+    if not pairs:
+      return []
+    
+    sizes = [len(ids) for ids,_ in pairs]
+    
+    ids = np.concatenate([ids for ids,_ in pairs])
+    sims = np.concatenate([sims for _,sims in pairs])
+    group = np.repeat(np.arange(len(pairs)),sizes)
+    
+    # lexsort is stable : last key is the primary one
+    order = np.lexsort((-sims,group))
+    
+    bounds = np.cumsum(sizes)[:-1]
+    topk = self.topk if truncate else None
+    
+    ranked = [(i[:topk],s[:topk]) for i,s in zip(np.split(ids[order],bounds),np.split(sims[order],bounds))]
+    
+    return ranked
+  
+  
+
+class MeSHTreeRanker(AbstractRanker):
+  """
+  Ranker that sorts simplification candidates by their distance from complex word in MeSH tree,
+  i.e. candidates closer in the hierarchy come first. Distances are computed with 
+  constant time lowest common ancestor queries (see `mesh_db.MeSHTree`).
+  
+  Hierarchy proximity, i.e. `1 / (1 + distance)`, can be blended with existing scores of candidates
+  (by default cosine similarity provided by the generator):
+  
+  .. math::
+    (1 - weight) \\times proximity + weight \\times score
+  
+  Candidates not in MeSH have proximity 0.
+  """
+  
+  def __init__(self,tree,weight = 0.0):
+    """
+    Initialize Ranker.
+    
+    Args:
+      tree (mesh_db.MeSHTree) : MeSH tree
+      weight (float) : weight of existing scores in blend. If 0 candidates are sorted by distance only
+    """
+    
+    self.tree = tree
+    self.weight = weight
+  
+  def get_order(self,complex_word,words,scores):
+    """
+    Sort words by blend of MeSH tree proximity with complex word and existing scores.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      words (list) : simplification candidates (str)
+      scores (np.ndarray) : existing scores of candidates
+    Return:
+      order (np.ndarray) : positions of candidates, from best to worst
+    """
+    
+    proximity = 1.0 / (1.0 + self.tree.term_distance(str(complex_word),words))
+    
+    combined = (1.0 - self.weight) * proximity + self.weight * scores
+    
+    order = np.lexsort((-scores,-combined))
+    
+    return order
+  
+  def rank_candidates(self,complex_word,candidates,model = None,scores = None):
+    """
+    Sort simplification candidates by increasing MeSH tree distance with complex word,
+    blended with existing scores. Ties are broken by existing scores.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates (Candidate)
+      model (gensim.models.* or None) : embedding model, computing similarities not provided by the generator
+      scores (list or None) : existing scores of candidates. If None similarity stored in candidates is used
+    Return:
+      candidates (list) : ranked simplification candidates
+    """
+    
+    candidates = [as_candidate(c) for c in candidates]
+    
+    if scores is None:
+      scores = [get_similarity(model,complex_word,c) if model is not None else 
+                (c.similarity if c.similarity is not None else 0.0) for c in candidates]
+    
+    order = self.get_order(complex_word,[str(c) for c in candidates],np.asarray(scores, dtype = np.float64))
+    
+    candidates = [candidates[i] for i in order]
+    
+    return candidates
+  
+  def rank_candidate_ids(self,ids,sims,complex_word = None,vocab = None):
+    """
+    Sort indices of simplification candidates by increasing MeSH tree distance with complex word,
+    blended with their cosine similarity.
+    
+    Args:
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      complex_word (str or Candidate) : word
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      ids (np.ndarray) : ranked indices of simplification candidates
+    """
+    
+    ids = ids[self.get_order(complex_word,[vocab.words[i] for i in ids],np.asarray(sims, dtype = np.float64))]
+    
+    return ids
+
+
+class Beam(object):
+  """
+  Hypothesis of beam search. It keeps the language model state after its last word 
+  and the accumulated log-probability, so that it can be extended by scoring only the new word.
+  
+  Beams only store their last word and point to the beam they extend:
+  hypotheses share their common prefix, which is materialized only when needed.
+  `depth` is the number of words from the start of the search.
+  """
+  
+  __slots__ = ("word","parent","state","score","depth")
+  
+  def __init__(self,word,parent,state,score):
+    """
+    Initialize Beam.
+    
+    Args:
+      word (str or None) : last word of hypothesis. None for the beam starting the search
+      parent (Beam or None) : beam extended by this one
+      state (kenlm.State) : language model state after last word
+      score (float) : accumulated log10 probability
+    """
+    
+    self.word = word
+    self.parent = parent
+    self.state = state
+    self.score = score
+    self.depth = parent.depth + 1 if parent is not None else 0
   
+  def get_ancestor(self,depth):
+    """
+    Get beam extended by this one at given depth.
+    
+    Args:
+      depth (int) : depth of ancestor
+    Return:
+      beam (Beam) : ancestor
+    """
+    
+    beam = self
+    
+    while beam.depth > depth:
+      beam = beam.parent
+    
+    return beam
+  
+  def get_words(self):
+    """
+    Materialize words of hypothesis following back pointers.
+    
+    Return:
+      words (list) : words of hypothesis
+    """
+    
+    words = []
+    beam = self
+    
+    while beam is not None:
+      if beam.word is not None:
+        words.append(beam.word)
+      beam = beam.parent
+    
+    words.reverse()
+    
+    return words
+  
+  def __str__(self):
+    return " ".join(self.get_words())
+
+
+class LMScoreCache(object):
+  """
+  Bounded cache of language model scores, shared across sentences and requests.
+  
+  Scores are keyed on language model state (i.e. the last `order - 1` words of context) and word.
+  Least recently used entries are discarded when the cache is full.
+  """
+  
+  def __init__(self,size = 1000000):
+    """
+    Initialize LMScoreCache.
+    
+    Args:
+      size (int) : maximum number of cached scores
+    """
+    
+    self.size = size
+    self.cache = OrderedDict()
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+  
+  def after_fork(self):
+    """
+    Create a new lock in a forked process: the one of the parent process may have been held
+    by one of its threads while forking, and would never be released in the child.
+    Cached scores are still valid and are kept, while usage statistics restart from zero.
+    """
+    
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+  
+  def get(self,state,word):
+    """
+    Get cached score of word following language model state.
+    
+    Args:
+      state (kenlm.State) : language model state
+      word (str) : word
+    Return:
+      item (tuple or None) : language model state after word and log10 probability of word. None if not cached
+    """
+    
+    key = (state,word)
+    
+    with self.lock:
+      item = self.cache.get(key)
+      if item is not None:
+        self.cache.move_to_end(key)
+        self.hits += 1
+      else:
+        self.misses += 1
+    
+    return item
+  
+  def put(self,state,word,out_state,score):
+    """
+    Cache score of word following language model state.
+    
+    Args:
+      state (kenlm.State) : language model state
+      word (str) : word
+      out_state (kenlm.State) : language model state after word
+      score (float) : log10 probability of word
+    """
+    
+    with self.lock:
+      self.cache[(state,word)] = (out_state,score)
+      if len(self.cache) > self.size:
+        self.cache.popitem(last = False)
+        self.evictions += 1
+  
+  def get_hit_rate(self):
+    """
+    Fraction of lookups answered by the cache.
+    
+    Return:
+      rate (float) : cache hit rate
+    """
+    
+    total = self.hits + self.misses
+    rate = self.hits / total if total else 0.0
+    
+    return rate
+  
+  def report(self):
+    """
+    Log cache usage.
+    """
+    
+    logger.info("LM cache : size - {} , hits - {} , misses - {} , evictions - {} , hit rate - {:.3f}".format(len(self.cache),
+                self.hits,self.misses,self.evictions,self.get_hit_rate()))
+
 
 class PartialBeamSearchRanker:
   """
-  Ranker that uses BeamSearch on complex word to sort the simplification candidates
+  Ranker that uses BeamSearch on complex word to sort the simplification candidates.
+  Beams carry the language model state, hence each step scores only the word 
+  appended to them. Hypotheses are kept in a tree of beams sharing their prefixes.
   """
   
-  def __init__(self,lm,beam_width):
+  def __init__(self,lm,beam_width,cache = None):
     """
     Initialize Ranker.
     
     Args:
-      lm (kenlm.Model) : Language model interfaced with kenlm python library
+      lm (kenlm.Model or arpa_lm.ArpaModel) : Language model interfaced with kenlm python library, or ARPA model with same interface
       beam_width (int) : number of candidates to consider
+      cache (LMScoreCache or None) : cache of language model scores. If None language model is always queried
     """
     super(PartialBeamSearchRanker,self).__init__()
     self.lm = lm
+    self._state_class = None
     self.beam_width = beam_width
+    self.cache = cache
+  
+  @property
+  def state_class(self):
+    """
+    Class of language model states, looked up on first use so that language model can be loaded lazily.
+    """
+    
+    if self._state_class is None:
+      # ARPA models provide their own state class
+      self._state_class = getattr(self.lm,"State",None) or kenlm.State
+    
+    return self._state_class
   
     
   def merge_words(self,w1,w2):
@@ -84,54 +505,222 @@ class PartialBeamSearchRanker:
       out (str) : joined strings
     """
     
-    out = " ".join(w1,w2)
+    out = " ".join([w1,w2])
     return out 
   
+  def new_state(self):
+    """
+    Create empty language model state.
+    
+    Return:
+      state (kenlm.State or arpa_lm.ArpaState) : language model state
+    """
+    
+    return self.state_class()
+  
+  def score_words(self,state,words):
+    """
+    Score words following a language model state. Scores are looked up in the cache first, if any.
+    
+    Args:
+      state (kenlm.State) : language model state
+      words (list) : words
+    Return:
+      state,score (tuple) : language model state after last word and log10 probability of words
+    """
+    
+    score = 0.0
+    
+    for word in words:
+      
+      item = self.cache.get(state,word) if self.cache is not None else None
+      
+      if item is None:
+        out_state = self.new_state()
+        word_score = self.lm.BaseScore(state, word, out_state)
+        if self.cache is not None:
+          self.cache.put(state,word,out_state,word_score)
+      else:
+        out_state,word_score = item
+      
+      score += word_score
+      state = out_state
+    
+    return state,score
   
-  def prune_beams(self,hypotheses):
+  def start_beam(self,context = None):
+    """
+    Create beam from context. Only the last `order - 1` words of context are fed to the language model:
+    the beginning of sentence marker is used only if context is shorter.
+    Accumulated score starts from 0, since it is the same for all the hypotheses extending the context.
+    
+    Args:
+      context (str or Sentence or None) : context in which word appears 
+    Return:
+      beam (Beam) : beam with context
+    """
+    
+    history = self.lm.order - 1
+    
+    if isinstance(context,Sentence):
+      length = context.index
+      words = context.tokens[max(0,length - history):length]
+    else:
+      words = context.split() if context is not None else []
+      words = words[1:] if words and words[0] == "<s>" else words
+      length = len(words)
+      words = words[-history:] if history else []
+    
+    state = self.new_state()
+    
+    if length < history:
+      self.lm.BeginSentenceWrite(state)
+    else:
+      self.lm.NullContextWrite(state)
+    
+    state,_ = self.score_words(state,words)
+    
+    beam = Beam(word = None, parent = None, state = state, score = 0.0)
+    
+    return beam
+  
+  def extend_beam(self,beam,word):
+    """
+    Extend beam with word, scoring only the word given beam language model state.
+    
+    Args:
+      beam (Beam) : hypothesis
+      word (str) : word (it can be a multi word expression)
+    Return:
+      beam (Beam) : extended hypothesis
+    """
+    
+    state,score = self.score_words(beam.state,word.split())
+    
+    beam = Beam(word = word, parent = beam, state = state, score = beam.score + score)
+    
+    return beam
+  
+  def prune_beams(self,hypotheses,recombine = False):
     """
     Implement beam search step. All simplification candidates are sorted by increasing 
     negative log-likelihood of language model given its context.
     
+    If `recombine` is True, among hypotheses with the same language model state 
+    only the best one is kept: they would be extended in the same way.
+    
     Args:
-      hypotheses (list) : simplification candidates
+      hypotheses (list) : beams with simplification candidates
+      recombine (bool) : recombine hypotheses with same language model state
     
     Return:
       
-      beams_to_keep (list) : ranked simplification candidates
+      beams_to_keep (list) : ranked beams
     """
-        
-    scored_hypotheses = [(hypo, self.lm.score(hypo, bos = True, eos = False)) for hypo in hypotheses]
-            
-    beams_to_keep = sorted(scored_hypotheses , key=lambda tup: tup[1], reverse = True)[:self.beam_width]
-          
-    beams_to_keep = [hypo[0] for hypo in beams_to_keep]      
+    
+    if recombine:
+      best = {}
+      for beam in hypotheses:
+        if beam.state not in best or beam.score > best[beam.state].score:
+          best[beam.state] = beam
+      hypotheses = best.values()
+    
+    beams_to_keep = heapq.nlargest(self.beam_width, hypotheses, key = lambda beam: beam.score)
     
     return beams_to_keep
   
+  def get_common_ancestor(self,hypotheses):
+    """
+    Find the last beam shared by all hypotheses, i.e. the end of their common prefix.
+    
+    Args:
+      hypotheses (list) : beams
+    Return:
+      ancestor (Beam) : common ancestor
+    """
+    
+    depth = min(beam.depth for beam in hypotheses)
+    
+    nodes = {beam.get_ancestor(depth) for beam in hypotheses}
+    
+    while len(nodes) > 1:
+      nodes = {beam.parent for beam in nodes}
+    
+    ancestor = nodes.pop()
+    
+    return ancestor
   
-  def rank_candidates(self,comlex_word,candidates,context = None):
+  def commit_beams(self,hypotheses,max_lag = None):
     """
-    Sort simplification candidates decreasing by negative log-likelihood given by language model
+    Commit the prefix on which all hypotheses agree, so that it can be emitted.
+    If the best hypothesis is more than `max_lag` words ahead of the commit point,
+    its prefix is committed anyway and the hypotheses disagreeing with it are dropped.
+    
+    Committed words are detached from the beam tree: the committed beam becomes the new root,
+    so memory does not grow with the length of the text.
+    
+    Args:
+      hypotheses (list) : beams
+      max_lag (int or None) : maximum number of words not committed. If None commit only on agreement
+    Return:
+      words,hypotheses (tuple) : committed words and surviving beams
+    """
+    
+    ancestor = self.get_common_ancestor(hypotheses)
+    
+    if max_lag is not None:
+      
+      best = max(hypotheses, key = lambda beam: beam.score)
+      
+      if best.depth - ancestor.depth > max_lag:
+        ancestor = best.get_ancestor(best.depth - max_lag)
+        hypotheses = [beam for beam in hypotheses if beam.get_ancestor(ancestor.depth) is ancestor]
+    
+    words = ancestor.get_words()
+    
+    ancestor.word = None
+    ancestor.parent = None
+    
+    return words,hypotheses
+  
+  
+  def prefilter_candidates(self,candidates):
+    """
+    Cheap stage of ranking, applied to simplification candidates before they are scored with the language model.
+    Partial Beam Search has none: all candidates are kept.
     
     Args:
-      complex_word (str) : word
       candidates (list) : simplification candidates
-      context (str or None) : context in which word appears 
+    Return:
+      candidates (list) : simplification candidates
+    """
+    
+    return candidates
+  
+  def rank_candidates(self,complex_word,candidates,context = None,return_beams = False):
+    """
+    Sort simplification candidates decreasing by negative log-likelihood given by language model
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates (Candidate)
+      context (str or Sentence or None) : context in which word appears 
+      return_beams (bool) : return beams instead of candidates
     Return:
       candidates (list) : ranked simplification candidates
       
     """
     
+    start = self.start_beam(context)
     
-    if context is not None:
-      start_hypo = context if context.startswith("<s>") else "<s> "+ context 
-    else:  
-      start_hypo = "<s>"
+    records = {str(sub) : sub for sub in candidates}
     
-    candidates = self.prune_beams([self.merge_words(start_hypo,sub) for sub in candidates])
-        
-    candidates = [sub.split()[-1] for sub in candidates]
+    beams = self.prune_beams([self.extend_beam(start,str(sub)) for sub in candidates])
+    
+    if return_beams:
+      return beams
+    
+    candidates = [records.get(beam.word) for beam in beams]
         
     return candidates
     
@@ -139,4 +728,184 @@ class PartialBeamSearchRanker:
     
     
     
-    
\ No newline at end of file
+    
+
+class CascadeRanker(PartialBeamSearchRanker):
+  """
+  Ranker in two stages. A cheap score keeps the best `k` simplification candidates,
+  then only those are ranked with the language model by Partial Beam Search.
+  
+  The cheap score can be:
+    - similarity : similarity with complex word given by generator
+    - frequency : frequency in simple vocabulary
+    - unigram : language model probability of candidate with no context
+  
+  Every `audit_every` calls the exact ranking of all candidates is computed as well,
+  to measure how often the cascade changes the top candidate. Counters are shared by all threads
+  using the ranker and guarded by a lock.
+  """
+  
+  # usage statistics, not part of configuration
+  STATS = ("calls","audited","changed")
+  
+  def __init__(self,lm,beam_width,k,prefilter = "similarity",cwi = None,cache = None,audit_every = 0):
+    """
+    Initialize Ranker.
+    
+    Args:
+      lm (kenlm.Model) : Language model interfaced with kenlm python library
+      beam_width (int) : number of candidates to consider
+      k (int) : number of candidates ranked with language model
+      prefilter (str) : cheap score, one of `similarity`,`frequency`,`unigram`
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier. Needed by `frequency`
+      cache (LMScoreCache or None) : cache of language model scores
+      audit_every (int) : compare with exact ranking every this many calls. If 0 never
+    """
+    super(CascadeRanker,self).__init__(lm = lm, beam_width = beam_width, cache = cache)
+    
+    if prefilter not in ("similarity","frequency","unigram"):
+      raise ValueError("Unknown prefilter `{}`".format(prefilter))
+    
+    if prefilter == "frequency" and cwi is None:
+      raise ValueError("Prefilter `frequency` needs a complex word identifier")
+    
+    self.k = k
+    self.prefilter = prefilter
+    self.cwi = cwi
+    self.audit_every = audit_every
+    self._null_state = None
+    self.lock = threading.Lock()
+    self.calls = 0
+    self.audited = 0
+    self.changed = 0
+  
+  def after_fork(self):
+    """
+    Create a new lock in a forked process, since the one of the parent process may have been held
+    by one of its threads while forking. Counters restart from zero.
+    """
+    
+    self.lock = threading.Lock()
+    self.calls = 0
+    self.audited = 0
+    self.changed = 0
+  
+  def get_prefilter_score(self,candidate):
+    """
+    Compute cheap score of simplification candidate.
+    
+    Args:
+      candidate (str or Candidate) : simplification candidate
+    Return:
+      score (float) : cheap score
+    """
+    
+    if self.prefilter == "similarity":
+      score = getattr(candidate,"similarity",None)
+      score = score if score is not None else float("-inf")
+    elif self.prefilter == "frequency":
+      score = self.cwi.get_simple_freq(candidate)
+    else:
+      _,score = self.score_words(self.get_null_state(),str(candidate).split())
+    
+    return score
+  
+  def get_null_state(self):
+    """
+    Get language model state with no context, from which unigram scores are computed.
+    It is created once, so that unigram scores are looked up in the cache as any other score.
+    
+    Return:
+      state (kenlm.State or arpa_lm.ArpaState) : language model state
+    """
+    
+    if self._null_state is None:
+      state = self.new_state()
+      self.lm.NullContextWrite(state)
+      self._null_state = state
+    
+    return self._null_state
+  
+  def prefilter_candidates(self,candidates):
+    """
+    Keep `k` simplification candidates with highest cheap score.
+    
+    Args:
+      candidates (list) : simplification candidates
+    Return:
+      candidates (list) : best simplification candidates, in their original order
+    """
+    
+    if len(candidates) <= self.k:
+      return candidates
+    
+    best = set(heapq.nlargest(self.k, range(len(candidates)), key = lambda i: self.get_prefilter_score(candidates[i])))
+    
+    candidates = [c for i,c in enumerate(candidates) if i in best]
+    
+    return candidates
+  
+  def rank_candidates(self,complex_word,candidates,context = None,return_beams = False):
+    """
+    Sort best `k` simplification candidates by cheap score decreasing by negative log-likelihood 
+    given by language model.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates (Candidate)
+      context (str or Sentence or None) : context in which word appears 
+      return_beams (bool) : return beams instead of candidates
+    Return:
+      candidates (list) : ranked simplification candidates
+    """
+    
+    candidates = list(candidates)
+    
+    with self.lock:
+      self.calls += 1
+      audit = self.audit_every and self.calls % self.audit_every == 0
+    
+    ranked = super(CascadeRanker,self).rank_candidates(complex_word = complex_word,
+                                                       candidates = self.prefilter_candidates(candidates),
+                                                       context = context,
+                                                       return_beams = return_beams)
+    
+    if audit:
+      
+      exact = super(CascadeRanker,self).rank_candidates(complex_word = complex_word,
+                                                        candidates = candidates,
+                                                        context = context,
+                                                        return_beams = return_beams)
+      changed = bool(ranked and exact and str(ranked[0]) != str(exact[0]))
+      
+      with self.lock:
+        self.audited += 1
+        self.changed += changed
+    
+    return ranked
+  
+  def get_change_rate(self):
+    """
+    Fraction of audited calls in which the cascade changed the top candidate.
+    
+    Return:
+      rate (float) : change rate
+    """
+    
+    with self.lock:
+      rate = self.changed / self.audited if self.audited else 0.0
+    
+    return rate
+  
+  def report(self):
+    """
+    Log how often the cascade changes the top candidate.
+    """
+    
+    with self.lock:
+      calls,audited,changed = self.calls,self.audited,self.changed
+    
+    rate = changed / audited if audited else 0.0
+    
+    logger.info("Cascade ranker (k = {}, prefilter = {}) : calls - {} , audited - {} , top-1 changed - {} ({:.3f})".format(self.k,
+                self.prefilter,calls,audited,changed,rate))
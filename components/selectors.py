@@ -7,7 +7,169 @@ Created on Fri Sep 21 15:50:42 2018
 """
 
 
+import time
+import logging
+import threading
+import functools
+import numpy as np
 from abc import ABCMeta,abstractmethod
+from components.candidates import Candidate,get_similarity
+from components.sentence import Sentence
+from components.taggers import GeniaTaggerPool
+
+
+logger = logging.getLogger(__name__)
+
+
+# prior cost per candidate (seconds) of each filter, used until the filter has actually been run
+FILTER_COSTS = {"lemma" : 1e-6,
+                "complexity" : 2e-6,
+                "cos_sim" : 1e-5,
+                "mesh" : 1e-4,
+                "postag" : 5e-3}
+
+
+class SelectorPipeline(object):
+  """
+  Apply a collection of filters to simplification candidates, running first the ones
+  that are cheap and discard many candidates. 
+  
+  Every filter is a pure predicate over the candidates, hence the order in which they are
+  applied does not change the selected candidates. For each filter are kept statistics on
+  its cost per candidate and on the fraction of candidates it lets through (selectivity). 
+  Filters are sorted by :
+    
+  .. math::
+    \\frac{cost}{1 - selectivity}
+    
+  and the pipeline stops as soon as there are no candidates left.
+  
+  Statistics are shared by all threads using the pipeline and guarded by a lock.
+  """
+  
+  def __init__(self,costs = None, selectivity = 0.5):
+    """
+    Initialize SelectorPipeline.
+    
+    Args:
+      costs (dict) : lookup filter name -> prior cost per candidate 
+      selectivity (float) : prior fraction of candidates that pass a filter never run before
+    """
+    
+    self.costs = costs if costs is not None else FILTER_COSTS
+    self.selectivity = selectivity
+    self.stats = {}
+    self.lock = threading.Lock()
+  
+  def after_fork(self):
+    """
+    Replace lock, that may have been held by another thread of the parent process at fork.
+    """
+    
+    self.lock = threading.Lock()
+  
+  def get_stats(self,name):
+    """
+    Get statistics of a filter. Must be called holding `lock`.
+    
+    Args:
+      name (str) : filter name
+    Return:
+      stats (dict) : number of calls, total time, number of candidates in input and in output
+    """
+    
+    stats = self.stats.setdefault(name,{"calls" : 0, "time" : 0.0, "in" : 0, "out" : 0})
+    
+    return stats
+  
+  def update_stats(self,name,n_in,n_out,elapsed):
+    """
+    Update statistics of a filter after it has been run.
+    
+    Args:
+      name (str) : filter name
+      n_in (int) : number of candidates given to the filter
+      n_out (int) : number of candidates that passed the filter
+      elapsed (float) : time spent in the filter (seconds)
+    """
+    
+    with self.lock:
+      
+      stats = self.get_stats(name)
+      
+      stats["calls"] += 1
+      stats["time"] += elapsed
+      stats["in"] += n_in
+      stats["out"] += n_out
+  
+  def get_rank(self,name):
+    """
+    Compute rank of filter: expected cost for discarding a candidate. Must be called holding `lock`.
+    
+    Args:
+      name (str) : filter name
+    Return:
+      rank (float) : filters with lower rank are run first
+    """
+    
+    stats = self.get_stats(name)
+    
+    if stats["in"]:
+      cost = stats["time"] / stats["in"]
+      selectivity = stats["out"] / stats["in"]
+    else:
+      cost = self.costs.get(name,max(self.costs.values()))
+      selectivity = self.selectivity
+    
+    rank = cost / max(1.0 - selectivity, 1e-6)
+    
+    return rank
+  
+  def run(self,candidates,filters):
+    """
+    Apply filters to simplification candidates.
+    
+    Args:
+      candidates (list) : simplification candidates
+      filters (list) : list of tuples (name,function). Each function takes as argument `candidates` and returns the filtered ones
+    Return:
+      candidates (list) : filtered simplification candidates, in their original order
+    """
+    
+    selected = set(candidates)
+    
+    with self.lock:
+      filters = sorted(filters, key = lambda f : self.get_rank(f[0]))
+    
+    for name,filter_fn in filters:
+      
+      if not selected:
+        break
+      
+      n_in = len(selected)
+      start = time.perf_counter()
+      selected = set(filter_fn(candidates = selected))
+      self.update_stats(name,n_in,len(selected),time.perf_counter() - start)
+          
+    candidates = [w for w in dict.fromkeys(candidates) if w in selected]
+    
+    return candidates
+  
+  def report(self):
+    """
+    Log cost per candidate and selectivity of each filter.
+    """
+    
+    with self.lock:
+      names = sorted(self.stats, key = self.get_rank)
+      all_stats = {name : dict(self.stats[name]) for name in names}
+    
+    for name in names:
+      stats = all_stats[name]
+      cost = stats["time"] / stats["in"] if stats["in"] else 0.0
+      selectivity = stats["out"] / stats["in"] if stats["in"] else 0.0
+      logger.info("Filter `{}` : calls - {} , cost per candidate - {:.2e}s , selectivity - {:.3f}".format(name,
+                  stats["calls"],cost,selectivity))
 
 
 class AbstractSelector(object,metaclass = ABCMeta):
@@ -25,26 +187,79 @@ class AbstractSelector(object,metaclass = ABCMeta):
       char_ngram (int) : size of character ngrams for filtering by lemma
     """
     self.char_ngram = char_ngram
+    self.pipeline = SelectorPipeline()
     
   def get_pos(self,word,parser,context = None):
     """
-    Get Part of Speech tag of word with spacy. If context is given parse entire text.
+    Get Part of Speech tag of word with spacy or GeniaTagger. If context is given parse entire text.
+    If context is an annotated sentence the tag is read from it, or computed in a window of it if `parser` is not
+    the one that annotated the sentence, i.e. with the same tagger used for the candidates.
+    If `word` is a Candidate the tag is computed only once and stored in it.
     
     Args:
-      word (str) : word
-      parser (spacy.lang.*) : spacy language instance
-      context (str or None) : context in which word appears
+      word (str or Candidate) : word
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
     Return:
       pos (str) : Part of Speech tag
     """
     
-    if context is not None:
+    if isinstance(word,Candidate):
+      
+      if word.pos is None:
+        word.pos = self.get_pos(word.word,parser,context)
+      
+      return word.pos
+    
+    if isinstance(context,Sentence):
+      pos = context.get_pos(word,parser)
+    elif isinstance(parser,GeniaTaggerPool):
+      pos = parser.get_pos(str(word),self.get_context_str(context))
+    elif context is not None:
       pos = parser(" ".join([context,word]))[-1].pos_
     else:
       pos = parser(word)[0].pos_
       
     return pos
     
+  def get_context_str(self,context):
+    """
+    Get context as string.
+    
+    Args:
+      context (str or Sentence or None) : context in which word appears
+    Return:
+      context (str or None) : context
+    """
+    
+    if isinstance(context,Sentence):
+      context = context.get_context(window = context.window)
+    
+    return context
+  
+  def tag_candidates(self,candidates,tagger,context = None):
+    """
+    Tag at once all simplification candidates whose tag is not known yet, placed in annotated sentence
+    or, with GeniaTagger pool, appended to context. Tags are stored in candidates records.
+    
+    Args:
+      candidates (list) : simplification candidates (Candidate)
+      tagger (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
+    """
+    
+    to_tag = [w for w in candidates if isinstance(w,Candidate) and w.pos is None]
+    
+    if to_tag:
+      
+      if isinstance(context,Sentence):
+        tags = context.get_pos_batch([w.word for w in to_tag],tagger)
+      else:
+        tags = tagger.get_pos_batch([w.word for w in to_tag],self.get_context_str(context))
+      
+      for w,pos in zip(to_tag,tags):
+        w.pos = pos
+  
   def filter_lemma(self,complex_word,candidates):
     """
     Filter out simplification candidates that have a character ngram in common with complex word.
@@ -56,10 +271,12 @@ class AbstractSelector(object,metaclass = ABCMeta):
       candidates (list) : filtered simplification candidates
     """
         
+    complex_word = str(complex_word)
+    
     # generate list of character ngrams for a given word
     char_ngram = [complex_word[i:i+self.char_ngram] for i in range(len(complex_word)-self.char_ngram+1)]
     
-    candidates = set([w for w in candidates if not any([c in w for c in char_ngram])])
+    candidates = set([w for w in candidates if not any([c in str(w) for c in char_ngram])])
         
     return candidates
   
@@ -70,8 +287,8 @@ class AbstractSelector(object,metaclass = ABCMeta):
     Args:
       complex_word (str) : word
       candidates (list) : simplification candidates
-      parser (spacy.lang.*) : spacy language instance
-      context (str or None) : context in which word appears
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
     Return:
       candidates (list) : filtered simplification candidates
     """
@@ -79,10 +296,96 @@ class AbstractSelector(object,metaclass = ABCMeta):
     
     cw_pos = self.get_pos(complex_word,parser,context)
     
+    if isinstance(parser,GeniaTaggerPool) or isinstance(context,Sentence):
+      self.tag_candidates(candidates,parser,context)
+    
     candidates = set([w for w in candidates if self.get_pos(w,parser,context) == cw_pos])
     
     return candidates
   
+  def filter_lemma_ids(self,complex_word,ids,vocab):
+    """
+    Mask out indices of simplification candidates that have a character ngram in common with complex word.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      mask (np.ndarray) : boolean mask of candidates to keep
+    """
+    
+    complex_word = str(complex_word)
+    
+    char_ngram = [complex_word[i:i+self.char_ngram] for i in range(len(complex_word)-self.char_ngram+1)]
+    
+    mask = np.asarray([not any([c in vocab.words[i] for c in char_ngram]) for i in ids], dtype = bool)
+    
+    return mask
+  
+  def filter_postag_ids(self,complex_word,ids,parser,vocab,context = None):
+    """
+    Mask out indices of simplification candidates that do not have same PoS tag of complex word.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+      context (str or Sentence or None) : context in which word appears
+    Return:
+      mask (np.ndarray) : boolean mask of candidates to keep
+    """
+    
+    cw_pos = vocab.get_tag_id(self.get_pos(complex_word,parser,context))
+    
+    mask = vocab.get_pos(ids,parser,context) == cw_pos
+    
+    return mask
+  
+  def select_in_context(self,complex_word,candidates,parser,context):
+    """
+    Apply filters that depend on the context of complex word, i.e. Part of Speech tag.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
+    Return:
+      candidates (list) : filtered simplification candidates
+    """
+    
+    filters = [("postag", functools.partial(self.filter_postag, complex_word = complex_word,
+                                            parser = parser, context = context))]
+    
+    candidates = self.pipeline.run(candidates = candidates, filters = filters)
+    
+    return candidates
+  
+  def select_ids_in_context(self,complex_word,ids,sims,parser,context,vocab):
+    """
+    Apply filters that depend on the context of complex word, i.e. Part of Speech tag, 
+    on indices of simplification candidates.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    if len(ids):
+      mask = self.filter_postag_ids(complex_word = complex_word, ids = ids, parser = parser,
+                                    vocab = vocab, context = context)
+      ids,sims = ids[mask],sims[mask]
+    
+    return ids,sims
+  
   @abstractmethod
   def select_candidates():
     """
@@ -99,22 +402,24 @@ class SimpleScienceSelector(AbstractSelector):
   Proceedings of the 2016 Conference on Empirical Methods in Natural Language Processing. 2016.
   """
   
-  def __init__(self,cosine_threshold,frequency_threshold):
+  def __init__(self,char_ngram,cosine_threshold,frequency_threshold):
     """
     Initialize Selector.
     
     Args:
+      char_ngram (int) : size of character ngrams for filtering by lemma
       cosine_threshold (int) : threshold for filtering by cosine similarity
       frequency_threshold (int) : threshold for filtering by frequency
     """
-    super(SimpleScienceSelector,self).__init__()
+    super(SimpleScienceSelector,self).__init__(char_ngram)
     self.cos_thr = cosine_threshold
     self.freq_thr = frequency_threshold
   
-  def filter_cos_sim(self,complex_word,model,condidates):
+  def filter_cos_sim(self,complex_word,model,candidates):
     """
     Filter out simplification candidates that have a cosine similarity with the
-    complex word lower than a given threshold.
+    complex word lower than a given threshold. The similarity is computed only 
+    if not already provided by the generator.
     
     Args:
       complex_word (str) : word
@@ -124,7 +429,7 @@ class SimpleScienceSelector(AbstractSelector):
       candidates (list) : filtered simplification candidates
     """
     
-    sub = [w for w in condidates if model.similarity(complex_word,w) > self.cos_thr]
+    sub = [w for w in candidates if get_similarity(model,complex_word,w) > self.cos_thr]
         
     return sub
  
@@ -161,44 +466,162 @@ class SimpleScienceSelector(AbstractSelector):
       complex_word (str) : word
       model (gensim.models.Word2Vec) : embedding model
       candidates (list) : simplification candidates
-      parser (spacy.lang.*) : spacy language instance
-      context (str or None) : context in which word appears
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
       cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
     Return:
       candidates (list) : filtered simplification candidates
       
     """
     
-    candidates = self.filter_lemma(complex_word = complex_word,candidates = candidates)
+    filters = self.get_context_free_filters(complex_word = complex_word, model = model, cwi = cwi)
+    filters.append(("postag", functools.partial(self.filter_postag, complex_word = complex_word,
+                                                parser = parser, context = context)))
     
-    candidates = self.filter_postag(complex_word = complex_word, candidates = candidates,
-                                    parser = parser, context = context)
+    candidates = self.pipeline.run(candidates = candidates, filters = filters)
     
-    candidates = self.filter_cos_sim(complex_word = complex_word, candidates = candidates,
-                                     model = model)
+    return candidates
+  
+  def get_context_free_filters(self,complex_word,model,cwi):
+    """
+    Get filters that do not depend on the context of complex word.
     
-    candidates = self.filter_complexity_score(complex_word = complex_word, candidates = candidates,
-                                              cwi = cwi)
+    Args:
+      complex_word (str or Candidate) : word
+      model (gensim.models.Word2Vec) : embedding model
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
+    Return:
+      filters (list) : list of tuples (name,function)
+    """
+    
+    filters = [("lemma", functools.partial(self.filter_lemma, complex_word = complex_word)),
+               ("cos_sim", functools.partial(self.filter_cos_sim, complex_word = complex_word,
+                                             model = model)),
+               ("complexity", functools.partial(self.filter_complexity_score, complex_word = complex_word,
+                                                cwi = cwi))]
+    
+    return filters
+  
+  def select_context_free(self,complex_word,candidates,model,cwi):
+    """
+    Apply filters that do not depend on the context of complex word: 
+    their result can be shared by all the occurrences of the word.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates
+      model (gensim.models.Word2Vec) : embedding model
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
+    Return:
+      candidates (list) : filtered simplification candidates
+    """
+    
+    filters = self.get_context_free_filters(complex_word = complex_word, model = model, cwi = cwi)
+    
+    candidates = self.pipeline.run(candidates = candidates, filters = filters)
     
     return candidates
   
+  def select_candidate_ids(self,complex_word,ids,sims,parser,context,vocab,cwi):
+    """
+    Implement full selection logic of SimpleScienceSelector on indices of simplification candidates.
+    Filters on cosine similarity, complexity score and frequency are computed at once 
+    on vocabulary arrays, before the ones which need the words.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    ids,sims = self.select_context_free_ids(complex_word = complex_word, ids = ids, sims = sims, vocab = vocab, cwi = cwi)
+    
+    ids,sims = self.select_ids_in_context(complex_word = complex_word, ids = ids, sims = sims, 
+                                          parser = parser, context = context, vocab = vocab)
+    
+    return ids,sims
+  
+  def select_context_free_ids(self,complex_word,ids,sims,vocab,cwi):
+    """
+    Apply filters that do not depend on the context of complex word on indices of simplification candidates.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    cwcs = cwi.get_complexity_score(complex_word)
+    
+    mask = (sims > self.cos_thr) & (vocab.complexity_score[ids] < cwcs) & (vocab.complex_freq[ids] > self.freq_thr)
+    ids,sims = ids[mask],sims[mask]
+    
+    mask = self.filter_lemma_ids(complex_word = complex_word, ids = ids, vocab = vocab)
+    ids,sims = ids[mask],sims[mask]
+    
+    return ids,sims
+  
 class MeSHSelector(AbstractSelector):
   """
   Selector that exploits MeSH hierarchy, i.e. accept substitutions 
-  if they are in complex word hierarchy ( hypernym, synonym or hyponym of complex word)
+  if they are in complex word hierarchy ( hypernym, synonym or hyponym of complex word).
+  The hierarchy is queried either on the parsed MeSH (`mesh_db.MeSHierarchy`) or, in constant time
+  per pair of terms, on the MeSH tree (`mesh_db.MeSHTree`), whose arrays can be memory mapped.
   """
   
-  def __init__(self,mesh_db):
+  def __init__(self,char_ngram,mesh_db,mesh_words = None):
     """
     Initialize Selector.
     
     Args:
-      mesh_db (mesh_db.MeSHierarchy) : object for querying MeSH hierarchy
+      char_ngram (int) : size of character ngrams for filtering by lemma
+      mesh_db (mesh_db.MeSHierarchy or mesh_db.MeSHTree) : object for querying MeSH hierarchy
+      mesh_words (set or freq_store.StringTable or None) : all MeSH terms. If None they are collected from `mesh_db` on first use
 
     """
-    super(MeSHSelector,self).__init__()
+    super(MeSHSelector,self).__init__(char_ngram)
     self.mesh_db = mesh_db
-    self.mesh_words = set([v for sublist in self.mesh_db.mesh_db.values() for v in sublist])
+    self._mesh_words = mesh_words
+  
+  @property
+  def mesh_words(self):
+    """
+    All MeSH terms, collected on first use so that MeSH database can be loaded lazily.
+    """
+    
+    if self._mesh_words is None:
+      self._mesh_words = self.mesh_db.get_terms()
+    
+    return self._mesh_words
+  
+  def in_hierarchy(self,complex_word,words):
+    """
+    Check which words are in MeSH hierarchy of complex word.
+    
+    Args:
+      complex_word (str or Candidate) : MeSH term
+      words (list) : words
+    Return:
+      mask (np.ndarray or None) : boolean mask of words in hierarchy. None if complex word has no hierarchy
+    """
+    
+    if hasattr(self.mesh_db,"in_hierarchy"):
+      mask = self.mesh_db.in_hierarchy(str(complex_word),[str(w) for w in words])
+    else:
+      hierarchy = self.mesh_db.get_hierarchy(str(complex_word))
+      mask = np.asarray([str(w) in hierarchy for w in words], dtype = bool) if hierarchy else None
+    
+    return mask
     
   def filter_mesh_hierarchy(self,complex_word,candidates):
     """
@@ -208,10 +631,12 @@ class MeSHSelector(AbstractSelector):
     """
     
     if complex_word in self.mesh_words:
+      
+      candidates = list(candidates)
     
-      hierarchy = self.mesh_db.get_hierarchy(complex_word)
+      mask = self.in_hierarchy(complex_word,candidates)
       
-      candidates = [s for s in candidates if s in hierarchy] if hierarchy else candidates
+      candidates = [s for s,keep in zip(candidates,mask) if keep] if mask is not None else candidates
           
     return candidates
   
@@ -222,21 +647,124 @@ class MeSHSelector(AbstractSelector):
     Args:
       complex_word (str) : word
       candidates (list) : simplification candidates
-      parser (spacy.lang.*) : spacy language instance
-      context (str or None) : context in which word appears
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
     Return:
       candidates (list) : filtered simplification candidates
       
     """
     
-    candidates = self.filter_lemma(complex_word = complex_word,candidates = candidates)
+    filters = self.get_context_free_filters(complex_word = complex_word)
+    filters.append(("postag", functools.partial(self.filter_postag, complex_word = complex_word,
+                                                parser = parser, context = context)))
+    
+    candidates = self.pipeline.run(candidates = candidates, filters = filters)
+    
+    return candidates
+  
+  def get_context_free_filters(self,complex_word):
+    """
+    Get filters that do not depend on the context of complex word.
+    
+    Args:
+      complex_word (str or Candidate) : word
+    Return:
+      filters (list) : list of tuples (name,function)
+    """
     
-    candidates = self.filter_postag(complex_word = complex_word, candidates = candidates,
-                                    parser = parser, context = context)  
+    filters = [("lemma", functools.partial(self.filter_lemma, complex_word = complex_word)),
+               ("mesh", functools.partial(self.filter_mesh_hierarchy, complex_word = complex_word))]
     
-    candidates = self.filter_mesh_hierarchy(complex_word = complex_word, candidates = candidates)
+    return filters
+  
+  def select_context_free(self,complex_word,candidates):
+    """
+    Apply filters that do not depend on the context of complex word: 
+    their result can be shared by all the occurrences of the word.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      candidates (list) : simplification candidates
+    Return:
+      candidates (list) : filtered simplification candidates
+    """
+    
+    filters = self.get_context_free_filters(complex_word = complex_word)
+    
+    candidates = self.pipeline.run(candidates = candidates, filters = filters)
     
     return candidates
+  
+  def filter_mesh_hierarchy_ids(self,complex_word,ids,vocab):
+    """
+    Mask out indices of simplification candidates that are not in MeSH hierarchy
+    of complex word. It is applied only if complex word is a MeSH term.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      mask (np.ndarray) : boolean mask of candidates to keep
+    """
+    
+    mask = np.ones(len(ids), dtype = bool)
+    
+    if complex_word in self.mesh_words:
+      
+      # hierarchy contains only MeSH terms : check words only for candidates in MeSH
+      in_mesh = vocab.in_mesh[ids]
+      
+      hierarchy_mask = self.in_hierarchy(complex_word,[vocab.words[i] for i in ids[in_mesh]])
+      
+      if hierarchy_mask is not None:
+        mask = np.array(in_mesh, dtype = bool)
+        mask[in_mesh] = hierarchy_mask
+    
+    return mask
+  
+  def select_candidate_ids(self,complex_word,ids,sims,parser,context,vocab):
+    """
+    Implement full selection logic of MeSHSelector on indices of simplification candidates.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which word appears
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    ids,sims = self.select_context_free_ids(complex_word = complex_word, ids = ids, sims = sims, vocab = vocab)
+    
+    ids,sims = self.select_ids_in_context(complex_word = complex_word, ids = ids, sims = sims, 
+                                          parser = parser, context = context, vocab = vocab)
+    
+    return ids,sims
+  
+  def select_context_free_ids(self,complex_word,ids,sims,vocab):
+    """
+    Apply filters that do not depend on the context of complex word on indices of simplification candidates.
+    
+    Args:
+      complex_word (str or Candidate) : word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+      vocab (components.vocabulary.Vocabulary) : vocabulary of embedding model
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    mask = self.filter_lemma_ids(complex_word = complex_word, ids = ids, vocab = vocab)
+    ids,sims = ids[mask],sims[mask]
+    
+    mask = self.filter_mesh_hierarchy_ids(complex_word = complex_word, ids = ids, vocab = vocab)
+    ids,sims = ids[mask],sims[mask]
+    
+    return ids,sims
     
     
     
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:20:05 2026
+
+@author: Samuele Garda
+"""
+
+from spacy.tokens import Doc
+from components.candidates import Candidate
+from components.taggers import GeniaTaggerPool
+
+# spacy pipeline components needed for Part of Speech tags: the others (parser, ner, lemmatizer, ...) are not run
+TAGGER_PIPES = ("tok2vec","tagger","attribute_ruler","morphologizer")
+
+
+def tag_tokens(tokens,parser):
+  """
+  Get Part of Speech tags of already tokenized text with spacy or GeniaTagger.
+  With spacy text is not re-tokenized and only the components of the pipeline producing tags are run (see `TAGGER_PIPES`).
+  GeniaTagger tokenizes text again, hence only the tag of the last token is guaranteed to be aligned.
+  
+  Args:
+    tokens (list) : tokens
+    parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+  Return:
+    pos (list) : Part of Speech tags
+  """
+  
+  pos = tag_batch([tokens],parser)[0]
+  
+  return pos
+
+
+def tag_batch(texts,parser):
+  """
+  Get Part of Speech tags of many already tokenized texts at once (see `tag_tokens`).
+  With spacy each component of the pipeline producing tags processes all texts in one batch.
+  
+  Args:
+    texts (list) : texts, each a list of tokens
+    parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+  Return:
+    pos (list) : Part of Speech tags of each text
+  """
+  
+  if isinstance(parser,GeniaTaggerPool):
+    return parser.tag_sentences([" ".join(tokens) for tokens in texts])
+  
+  docs = [Doc(parser.vocab, words = tokens) for tokens in texts]
+  
+  for name,proc in parser.pipeline:
+    if name in TAGGER_PIPES:
+      docs = list(proc.pipe(docs)) if hasattr(proc,"pipe") else [proc(doc) for doc in docs]
+  
+  pos = [[t.pos_ for t in doc] for doc in docs]
+  
+  return pos
+
+
+def split_sentences(tokens,boundaries = (".","!","?")):
+  """
+  Split tokenized document in sentences, closing a sentence after each boundary token.
+  Since text is already tokenized, abbreviations (e.g. `al.`) are single tokens and do not close sentences.
+  
+  Args:
+    tokens (list) : tokens
+    boundaries (tuple) : tokens closing a sentence
+  Return:
+    sentences (list) : sentences, each a list of tokens
+  """
+  
+  sentences = []
+  start = 0
+  
+  for idx,tok in enumerate(tokens):
+    if tok in boundaries:
+      sentences.append(tokens[start:idx+1])
+      start = idx + 1
+  
+  if start < len(tokens):
+    sentences.append(tokens[start:])
+  
+  return sentences
+
+
+class Sentence(object):
+  """
+  Annotation of a sentence shared by all pipeline components: tokens and Part of Speech tags, computed once.
+  Input words are stored as well as Candidate records, so that scores computed on them by the components
+  (e.g. complexity, Part of Speech tag) are kept.
+  
+  The position of the word being simplified is stored in `index`. Substitutions are tagged all at once,
+  each in a window of `window` tokens around that position, which gives the tag they would have in the sentence
+  if the window is larger than the span of text seen by the tagger: their tags can then be compared with the one of the input word.
+  GeniaTagger tokenizes text again, hence with it words are tagged as last token of the preceding window.
+  When a word is substituted tokens are updated in place.
+  """
+  
+  def __init__(self,tokens,parser,window = 10):
+    """
+    Initialize Sentence.
+    
+    Args:
+      tokens (list) : tokens
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      window (int) : number of tokens of context on each side used for tagging a substitution. It must be larger than the span of text seen by the spacy tagger.
+    """
+    
+    self.tokens = list(tokens)
+    self.original = list(tokens)
+    self.parser = parser
+    self.window = window
+    self.index = 0
+    
+    self.words = [Candidate(w) for w in self.tokens]
+    
+    self.pos = tag_tokens(self.tokens,parser) if self.tokens and not isinstance(parser,GeniaTaggerPool) else None
+  
+  def __len__(self):
+    return len(self.tokens)
+  
+  def __str__(self):
+    return " ".join(self.tokens)
+  
+  def get_context(self,window = None):
+    """
+    Get context of word being simplified, i.e. text preceding it.
+    
+    Args:
+      window (int or None) : number of preceding tokens to return. If None all of them
+    Return:
+      context (str) : context
+    """
+    
+    start = 0 if window is None else max(0,self.index - window)
+    
+    context = " ".join(self.tokens[start:self.index])
+    
+    return context
+  
+  def get_pos(self,word,parser = None):
+    """
+    Get Part of Speech tag of word placed in the position being simplified.
+    The tag of the input word is read from the annotation if `parser` is the one of the sentence.
+    
+    Args:
+      word (str) : word
+      parser (spacy.lang.* or GeniaTaggerPool) : tagger. If None the one of the sentence is used
+    Return:
+      pos (str) : Part of Speech tag
+    """
+    
+    parser = parser if parser is not None else self.parser
+    
+    if self.pos is not None and parser is self.parser and str(word) == self.original[self.index]:
+      return self.pos[self.index]
+    
+    pos = self.get_pos_batch([word],parser)[0]
+    
+    return pos
+  
+  def get_pos_batch(self,words,parser = None):
+    """
+    Get Part of Speech tags of words placed in the position being simplified, tagged all at once.
+    
+    Args:
+      words (list) : words
+      parser (spacy.lang.* or GeniaTaggerPool) : tagger. If None the one of the sentence is used
+    Return:
+      pos (list) : Part of Speech tags
+    """
+    
+    parser = parser if parser is not None else self.parser
+    
+    left = self.tokens[max(0,self.index - self.window):self.index]
+    
+    if isinstance(parser,GeniaTaggerPool):
+      pos = [tags[-1] for tags in tag_batch([left + str(w).split() for w in words],parser)]
+    
+    else:
+      right = self.tokens[self.index + 1:self.index + 1 + self.window]
+      texts = [left + str(w).split() for w in words]
+      pos = [tags[len(text) - 1] for text,tags in zip(texts,tag_batch([text + right for text in texts],parser))]
+    
+    return pos
+  
+  def substitute(self,index,word):
+    """
+    Replace token in place. Part of Speech tags keep referring to the input sentence.
+    
+    Args:
+      index (int) : token position
+      word (str) : substitution
+    """
+    
+    self.tokens[index] = word
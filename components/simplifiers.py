@@ -8,7 +8,8 @@ Created on Fri Sep 21 15:17:02 2018
 
 import logging
 from gensim.utils import unpickle
-from geniatagger import GeniaTagger 
+from freq_store import load_frequencies
+from taggers import GeniaTaggerPool
 from complex_word_identifier import ComplexWordIdentifier
 from generators import Word2VecGenerator,PoinGenerator
 from selectors import SimpleScienceSelector,HierarchySelector
@@ -28,11 +29,10 @@ class SimpleScienceSimplifier(object):
     logger.info("Loaded embeddings models from : `{}`".format(model))
     self.topn = topn
     self.alpha = alpha
-    self.tagger = GeniaTagger(tagger)
-    logger.info("Loaded Genia PoS tagger from : `{}`".format(tagger))
-    self.complex_freq = unpickle(complex_freq)
+    self.tagger = GeniaTaggerPool(tagger)
+    self.complex_freq = load_frequencies(complex_freq)
     logger.info("Loaded Complex Word Frequencies from : `{}`".format(complex_freq))
-    self.simple_freq = unpickle(simple_freq)
+    self.simple_freq = load_frequencies(simple_freq)
     logger.info("Loaded Simple Word Frequencies from : `{}`".format(simple_freq))
     self.freq_t = freq_t
     self.char_ngram = char_ngram
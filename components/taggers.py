@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:12 2026
+
+@author: Samuele Garda
+"""
+
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class GeniaTaggerPool(object):
+  """
+  Pool of GeniaTagger processes for biomedical Part of Speech tagging.
+  
+  Sentences are split in batches which are tagged concurrently by the processes of the pool,
+  each process serving one batch at a time. Tags of isolated words are cached.
+  """
+  
+  def __init__(self,path,processes = None,batch_size = 16,cache_size = 100000):
+    """
+    Initialize GeniaTaggerPool.
+    
+    Args:
+      path (str) : system path to GeniaTagger executable
+      processes (int or None) : number of GeniaTagger processes. If None one per core
+      batch_size (int) : number of sentences sent to a process at once
+      cache_size (int) : maximum number of words whose tag is cached
+    """
+    
+    self.path = path
+    self.processes = processes if processes is not None else multiprocessing.cpu_count()
+    self.batch_size = batch_size
+    self.cache_size = cache_size
+    
+    self.start()
+    
+    self.cache = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+    
+    logger.info("Started {} GeniaTagger processes from : `{}`".format(self.processes,path))
+  
+  def start(self):
+    """
+    Start GeniaTagger processes and threads serving them.
+    """
+    
+    from geniatagger import GeniaTagger
+    
+    self.taggers = queue.Queue()
+    for _ in range(self.processes):
+      self.taggers.put(GeniaTagger(self.path))
+    
+    self.executor = ThreadPoolExecutor(max_workers = self.processes)
+    self.lock = threading.Lock()
+  
+  def after_fork(self):
+    """
+    Start a new GeniaTagger process in a forked process: the ones of the parent process
+    cannot be shared, since they communicate through pipes. Forked processes are workers 
+    of a pool, hence each of them uses a single GeniaTagger process.
+    """
+    
+    self.processes = 1
+    self.start()
+  
+  def tag_batch(self,sentences):
+    """
+    Tag batch of sentences with one of the processes of the pool.
+    
+    Args:
+      sentences (list) : sentences (str)
+    Return:
+      tags (list) : for each sentence list of Part of Speech tags
+    """
+    
+    tagger = self.taggers.get()
+    
+    try:
+      tags = [[tok[2] for tok in tagger.parse(sent)] for sent in sentences]
+    finally:
+      self.taggers.put(tagger)
+    
+    return tags
+  
+  def tag_sentences(self,sentences):
+    """
+    Tag sentences in parallel.
+    
+    Args:
+      sentences (list) : sentences (str)
+    Return:
+      tags (list) : for each sentence list of Part of Speech tags
+    """
+    
+    batches = [sentences[i:i+self.batch_size] for i in range(0,len(sentences),self.batch_size)]
+    
+    tags = [t for batch in self.executor.map(self.tag_batch,batches) for t in batch]
+    
+    return tags
+  
+  def _cache_get(self,word):
+    """
+    Get cached tag of word and update cache statistics.
+    
+    Args:
+      word (str) : word
+    Return:
+      pos (str or None) : Part of Speech tag, None if not cached
+    """
+    
+    with self.lock:
+      pos = self.cache.get(word)
+      if pos is not None:
+        self.cache.move_to_end(word)
+        self.hits += 1
+      else:
+        self.misses += 1
+    
+    return pos
+  
+  def _cache_put(self,word,pos):
+    """
+    Cache tag of word, discarding the least recently used one if cache is full.
+    
+    Args:
+      word (str) : word
+      pos (str) : Part of Speech tag
+    """
+    
+    with self.lock:
+      self.cache[word] = pos
+      if len(self.cache) > self.cache_size:
+        self.cache.popitem(last = False)
+  
+  def get_pos_batch(self,words,context = None):
+    """
+    Get Part of Speech tags of words. If context is given each word is tagged appended to it,
+    otherwise cached tags are used and only words never seen before are tagged.
+    
+    Args:
+      words (list) : words
+      context (str or None) : context in which words appear
+    Return:
+      pos (list) : Part of Speech tags
+    """
+    
+    if context:
+      
+      pos = [t[-1] for t in self.tag_sentences([" ".join([context,w]) for w in words])]
+    
+    else:
+      
+      pos = [self._cache_get(w) for w in words]
+      
+      missing = list(dict.fromkeys(w for w,p in zip(words,pos) if p is None))
+      
+      if missing:
+        tagged = dict(zip(missing,[t[-1] for t in self.tag_sentences(missing)]))
+        for w,p in tagged.items():
+          self._cache_put(w,p)
+        pos = [p if p is not None else tagged.get(w) for w,p in zip(words,pos)]
+    
+    return pos
+  
+  def get_pos(self,word,context = None):
+    """
+    Get Part of Speech tag of word.
+    
+    Args:
+      word (str) : word
+      context (str or None) : context in which word appears
+    Return:
+      pos (str) : Part of Speech tag
+    """
+    
+    pos = self.get_pos_batch([word],context)[0]
+    
+    return pos
+  
+  def get_hit_rate(self):
+    """
+    Fraction of isolated words whose tag was found in cache.
+    
+    Return:
+      rate (float) : cache hit rate
+    """
+    
+    total = self.hits + self.misses
+    rate = self.hits / total if total else 0.0
+    
+    return rate
+  
+  def close(self):
+    """
+    Stop all GeniaTagger processes.
+    """
+    
+    self.executor.shutdown()
+    
+    while not self.taggers.empty():
+      tagger = self.taggers.get()
+      # GeniaTagger wrapper keeps subprocess in `_tagger`
+      proc = getattr(tagger,"_tagger",None)
+      if proc is not None:
+        proc.terminate()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:47 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import json
+import logging
+import numpy as np
+from io_utils import IOManager as iom
+from freq_store import StringTable
+from components.sentence import Sentence
+from components.taggers import GeniaTaggerPool
+
+logger = logging.getLogger(__name__)
+
+
+class Vocabulary(object):
+  """
+  Vocabulary of an embedding model in which every word is represented by its index.
+  
+  All the information used by the pipeline components is stored in arrays aligned with the indices:
+    - unit length word vectors, for cosine similarity
+    - frequency in complex and simple vocabulary and complexity score
+    - MeSH membership
+    - context free Part of Speech tag (filled on first request, or all at once with `tag_words`)
+    - optionally, table of nearest neighbors of each word (see `compute_neighbors`)
+  
+  Components working with indices do selection and ranking by array indexing.
+  Words are decoded back to strings only at the end of the pipeline.
+  
+  A vocabulary can be saved and loaded with memory mapped arrays: processes loading it share the same
+  memory pages instead of each having its own copy. Words are loaded as string tables (see `freq_store.StringTable`),
+  hence they are decoded only when used.
+  """
+  
+  # arrays shared read only when loaded with memory map
+  ARRAYS = ["vectors","complex_freq","simple_freq","complexity_score","in_mesh"]
+  # optional arrays, saved only if computed
+  NEIGHBOR_ARRAYS = ["neighbor_ids","neighbor_sims"]
+  
+  def __init__(self,model,cwi,mesh_words = None):
+    """
+    Initialize Vocabulary.
+    
+    Args:
+      model (gensim.models.Word2Vec or gensim.models.FastText) : embedding model
+      cwi (components.complex_word_identifier.DummyComplexWordIdentifier) : provides word frequencies and complexity scores
+      mesh_words (set or None) : all MeSH terms
+    """
+    
+    wv = model.wv if hasattr(model,"wv") else model
+    
+    self.set_words(wv.index2word)
+    
+    vectors = np.asarray(wv.vectors, dtype = np.float32)
+    self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis = 1, keepdims = True), 1e-8)
+    
+    self.complex_freq = np.asarray([cwi.get_complex_freq(w) for w in self.words], dtype = np.float64)
+    self.simple_freq = np.asarray([cwi.get_simple_freq(w) for w in self.words], dtype = np.float64)
+    self.complexity_score = cwi.get_complexity_scores(self.words)
+    
+    mesh_words = mesh_words if mesh_words is not None else set()
+    self.in_mesh = np.asarray([w in mesh_words for w in self.words], dtype = bool)
+    
+    self.tag2id = {}
+    self.pos = np.full(len(self.words), -1, dtype = np.int16)
+    
+    self.neighbor_ids = None
+    self.neighbor_sims = None
+    
+    logger.info("Built vocabulary with {} words".format(len(self.words)))
+  
+  def set_words(self,index2word):
+    """
+    Set words of vocabulary.
+    
+    Args:
+      index2word (list) : words of embedding model, in order of index
+    """
+    
+    self.index2word = list(index2word)
+    self.word2id = {w : i for i,w in enumerate(self.index2word)}
+    # generators lowercase substitution candidates: word level information refers to lowercased words
+    self.words = [w.lower() for w in self.index2word]
+  
+  def save(self,path):
+    """
+    Save vocabulary in directory: words as string tables and arrays in numpy format.
+    
+    Args:
+      path (str) : system path to directory
+    """
+    
+    iom.make_dir(path)
+    
+    StringTable.build(self.index2word,path,"index2word")
+    StringTable.build(self.words,path,"words")
+    
+    for name in self.ARRAYS:
+      np.save(os.path.join(path,"{}.npy".format(name)),getattr(self,name))
+    
+    if self.neighbor_ids is not None:
+      for name in self.NEIGHBOR_ARRAYS:
+        np.save(os.path.join(path,"{}.npy".format(name)),getattr(self,name))
+    
+    if (self.pos >= 0).any():
+      np.save(os.path.join(path,"pos.npy"),self.pos)
+      with open(os.path.join(path,"tags.json"),"w") as outfile:
+        json.dump(self.tag2id,outfile)
+    
+    logger.info("Saved vocabulary with {} words at : `{}`".format(len(self),path))
+  
+  @classmethod
+  def load(cls,path,mmap = True):
+    """
+    Load vocabulary saved with `save`. 
+    Part of Speech tags are read in memory, since tags missing from the saved ones are filled on request.
+    
+    Args:
+      path (str) : system path to directory
+      mmap (bool) : memory map arrays and string tables (read only) instead of reading them
+    Return:
+      vocab (Vocabulary) : vocabulary
+    """
+    
+    vocab = cls.__new__(cls)
+    
+    # string table looks up word index as the dictionary it replaces
+    vocab.index2word = StringTable(path,"index2word", mmap_mode = "r" if mmap else None)
+    vocab.word2id = vocab.index2word
+    vocab.words = StringTable(path,"words", mmap_mode = "r" if mmap else None)
+    
+    for name in cls.ARRAYS:
+      setattr(vocab,name,np.load(os.path.join(path,"{}.npy".format(name)), mmap_mode = "r" if mmap else None))
+    
+    for name in cls.NEIGHBOR_ARRAYS:
+      array_path = os.path.join(path,"{}.npy".format(name))
+      setattr(vocab,name,np.load(array_path, mmap_mode = "r" if mmap else None) if os.path.exists(array_path) else None)
+    
+    # tags not saved are filled on request by each process
+    if os.path.exists(os.path.join(path,"pos.npy")):
+      vocab.pos = np.load(os.path.join(path,"pos.npy"))
+      with open(os.path.join(path,"tags.json")) as infile:
+        vocab.tag2id = json.load(infile)
+    else:
+      vocab.tag2id = {}
+      vocab.pos = np.full(len(vocab.words), -1, dtype = np.int16)
+    
+    logger.info("Loaded vocabulary with {} words from : `{}`".format(len(vocab),path))
+    
+    return vocab
+  
+  def __len__(self):
+    return len(self.words)
+  
+  def encode(self,word):
+    """
+    Get index of word.
+    
+    Args:
+      word (str) : word
+    Return:
+      idx (int or None) : word index, None if word is not in vocabulary
+    """
+    
+    idx = self.word2id.get(word)
+    
+    return idx
+  
+  def decode(self,ids):
+    """
+    Get words from indices. Words that are the same once lowercased are returned only once.
+    
+    Args:
+      ids (np.ndarray) : word indices
+    Return:
+      words (list) : words
+    """
+    
+    words = list(dict.fromkeys(self.words[i] for i in ids))
+    
+    return words
+  
+  def similarity(self,idx,ids = None):
+    """
+    Compute cosine similarity between a word and a collection of words.
+    
+    Args:
+      idx (int) : word index
+      ids (np.ndarray or None) : indices of words to compare with. If None compare with entire vocabulary
+    Return:
+      sims (np.ndarray) : cosine similarities
+    """
+    
+    vectors = self.vectors if ids is None else self.vectors[ids]
+    
+    sims = vectors.dot(self.vectors[idx])
+    
+    return sims
+  
+  def compute_neighbors(self,topn,block_size = 1024):
+    """
+    Compute table of `topn` nearest neighbors (by cosine similarity) of each word, 
+    so that generating substitution candidates is a table lookup. Similarities are computed by blocks of words,
+    sorted as in `components.generators.Word2VecGenerator.get_candidate_ids`.
+    
+    Args:
+      topn (int) : number of neighbors of each word
+      block_size (int) : number of words whose similarities are computed at once
+    """
+    
+    n = len(self)
+    topn = min(topn,n - 1)
+    
+    self.neighbor_ids = np.zeros((n,topn), dtype = np.int32)
+    self.neighbor_sims = np.zeros((n,topn), dtype = np.float32)
+    
+    for start in range(0,n,block_size):
+      
+      end = min(start + block_size,n)
+      
+      sims = self.vectors[start:end].dot(self.vectors.T)
+      sims[np.arange(end - start),np.arange(start,end)] = -np.inf
+      
+      ids = np.argpartition(-sims,topn,axis = 1)[:,:topn]
+      block_sims = np.take_along_axis(sims,ids,axis = 1)
+      order = np.argsort(-block_sims, axis = 1, kind = "stable")
+      
+      self.neighbor_ids[start:end] = np.take_along_axis(ids,order,axis = 1)
+      self.neighbor_sims[start:end] = np.take_along_axis(block_sims,order,axis = 1)
+    
+    logger.info("Computed {} nearest neighbors of {} words".format(topn,n))
+  
+  def get_neighbors(self,idx,topn):
+    """
+    Get nearest neighbors of word from table computed with `compute_neighbors`.
+    
+    Args:
+      idx (int) : word index
+      topn (int) : number of neighbors
+    Return:
+      ids (np.ndarray or None) : indices of neighbors, by decreasing similarity. None if table has less than `topn` neighbors
+      sims (np.ndarray or None) : cosine similarity of neighbors
+    """
+    
+    if self.neighbor_ids is None or self.neighbor_ids.shape[1] < min(topn,len(self) - 1):
+      return None,None
+    
+    ids = np.array(self.neighbor_ids[idx,:topn], dtype = np.int64)
+    sims = np.array(self.neighbor_sims[idx,:topn])
+    
+    return ids,sims
+  
+  def tag_words(self,parser,batch_size = 1000):
+    """
+    Compute context free Part of Speech tag of all words at once.
+    
+    Args:
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      batch_size (int) : number of words tagged at once by spacy
+    """
+    
+    words = list(self.words)
+    
+    if isinstance(parser,GeniaTaggerPool):
+      tags = parser.get_pos_batch(words)
+    else:
+      tags = [doc[0].pos_ if len(doc) else "X" for doc in parser.pipe(words, batch_size = batch_size)]
+    
+    self.pos = np.asarray([self.get_tag_id(t) for t in tags], dtype = np.int16)
+    
+    logger.info("Tagged {} words".format(len(self)))
+  
+  def get_tag_id(self,tag):
+    """
+    Get index of Part of Speech tag.
+    
+    Args:
+      tag (str) : Part of Speech tag
+    Return:
+      tag_id (int) : tag index
+    """
+    
+    tag_id = self.tag2id.setdefault(tag,len(self.tag2id))
+    
+    return tag_id
+  
+  def get_pos(self,ids,parser,context = None):
+    """
+    Get Part of Speech tags indices of words. If context is given each word is parsed
+    appended to it (placed in it, all at once, if it is an annotated sentence), otherwise tags are computed only once and stored.
+    
+    Args:
+      ids (np.ndarray) : word indices
+      parser (spacy.lang.* or GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+      context (str or Sentence or None) : context in which words appear
+    Return:
+      pos (np.ndarray) : Part of Speech tags indices
+    """
+    
+    if isinstance(parser,GeniaTaggerPool):
+      
+      if isinstance(context,Sentence):
+        context = context.get_context(window = context.window)
+      
+      if context:
+        tags = parser.get_pos_batch([self.words[i] for i in ids],context)
+        pos = np.asarray([self.get_tag_id(t) for t in tags], dtype = np.int16)
+      else:
+        missing = ids[self.pos[ids] < 0]
+        tags = parser.get_pos_batch([self.words[i] for i in missing])
+        self.pos[missing] = [self.get_tag_id(t) for t in tags]
+        pos = self.pos[ids]
+    
+    elif isinstance(context,Sentence):
+      
+      pos = np.asarray([self.get_tag_id(t) for t in context.get_pos_batch([self.words[i] for i in ids],parser)], dtype = np.int16)
+    
+    elif context is not None:
+    
+      pos = np.asarray([self.get_tag_id(parser(" ".join([context,self.words[i]]))[-1].pos_) for i in ids], dtype = np.int16)
+    
+    else:
+    
+      missing = ids[self.pos[ids] < 0]
+      
+      for i in missing:
+        self.pos[i] = self.get_tag_id(parser(self.words[i])[0].pos_)
+      
+      pos = self.pos[ids]
+    
+    return pos
@@ -7,12 +7,10 @@ Created on Mon Sep 24 17:06:57 2018
 """
 
 from abc import ABCMeta,abstractmethod
-import pandas as pd
 import logging
 from collections import OrderedDict
 import numpy as np
 from collections import defaultdict
-from nltk.tokenize import sent_tokenize
 
 
 logger = logging.getLogger(__name__)
@@ -123,6 +121,8 @@ class UnsupervisedEvaluation:
       lix (int) : readbility score
     """
     
+    from nltk.tokenize import sent_tokenize
+    
     words = len(text)
     sents = len(sent_tokenize(' '.join(text)))
     words_syl = sum([1 for word in text if self.syllable_count(word) > 2])
@@ -148,6 +148,8 @@ class UnsupervisedEvaluation:
       fkglt (int) : readbility score
     """
     
+    from nltk.tokenize import sent_tokenize
+    
     num_sents = len(sent_tokenize(' '.join(text)))
     num_words = len(text)
     
@@ -424,6 +426,8 @@ class SupervisedEvaluationWithContext(AbstractSupervisedEvaluation):
       eval_path (str) : system path to evaluation data 
     """
     
+    import pandas as pd
+    
     list_dict = pd.read_csv(eval_path, sep = ',').to_dict('records')
     
     sent_eval = {x.get('complex_word') : x .get('context') for x in list_dict }
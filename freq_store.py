@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:32:51 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import json
+import mmap
+import logging
+import argparse
+import numpy as np
+from io_utils import IOManager as iom
+
+logger = logging.getLogger(__name__)
+
+
+def parse_arguments():
+  """
+  Parse command line arguments.
+  """
+  
+  parser = argparse.ArgumentParser(description='Compile pickled word frequencies into memory mapped frequency store')
+  
+  parser.add_argument('--freqs',required = True, type = str, help = "Path to pickled word frequencies, e.g. created by `parse_wiki.py`")
+  parser.add_argument('--out',required = True, type = str, help = "Output directory of frequency store")
+  
+  return parser.parse_args()
+
+
+class FrequencyStore(object):
+  """
+  Read only lookup word -> frequency stored in a directory of flat files, which are memory mapped when opened.
+  Opening a store is instantaneous and the pages are shared by all processes using it.
+  
+  The store contains:
+    - `words.bin` : UTF-8 encoded words, sorted by their bytes and concatenated
+    - `offsets.npy` : start of each word in `words.bin` (plus end of last one)
+    - `counts.npy` : word counts (uint32, or uint64 if needed)
+    - `log_freqs.npy` : natural logarithm of relative frequencies, i.e. count / total count
+  
+  Words are found by binary search on the sorted string table.
+  It exposes the `get` interface of the pickled dictionary it replaces.
+  """
+  
+  def __init__(self,path):
+    """
+    Open FrequencyStore.
+    
+    Args:
+      path (str) : system path to frequency store directory
+    """
+    
+    self.path = path
+    
+    with open(os.path.join(path,"meta.json")) as infile:
+      self.meta = json.load(infile)
+    
+    self.offsets = np.load(os.path.join(path,"offsets.npy"), mmap_mode = "r")
+    self.counts = np.load(os.path.join(path,"counts.npy"), mmap_mode = "r")
+    self.log_freqs = np.load(os.path.join(path,"log_freqs.npy"), mmap_mode = "r")
+    
+    with open(os.path.join(path,"words.bin"),"rb") as infile:
+      # mmap does not accept empty files
+      self.words = mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ) if self.meta["size"] else b""
+    
+    self.total = self.meta["total"]
+    
+    logger.info("Opened frequency store with {} words from : `{}`".format(len(self),path))
+  
+  @staticmethod
+  def build(counts,path):
+    """
+    Write word frequencies to frequency store.
+    
+    Args:
+      counts (dict) : lookup word -> frequency
+      path (str) : system path to frequency store directory
+    """
+    
+    iom.make_dir(path)
+    
+    keys = sorted(w.encode("utf-8") for w in counts)
+    
+    offsets = np.zeros(len(keys) + 1, dtype = np.uint64)
+    offsets[1:] = np.cumsum([len(k) for k in keys])
+    
+    values = np.asarray([counts[k.decode("utf-8")] for k in keys], dtype = np.uint64)
+    if not len(values) or values.max() < np.iinfo(np.uint32).max:
+      values = values.astype(np.uint32)
+    
+    total = int(values.sum(dtype = np.uint64))
+    log_freqs = (np.log(np.maximum(values,1)) - np.log(max(total,1))).astype(np.float32)
+    
+    with open(os.path.join(path,"words.bin"),"wb") as outfile:
+      outfile.write(b"".join(keys))
+    
+    np.save(os.path.join(path,"offsets.npy"),offsets)
+    np.save(os.path.join(path,"counts.npy"),values)
+    np.save(os.path.join(path,"log_freqs.npy"),log_freqs)
+    
+    with open(os.path.join(path,"meta.json"),"w") as outfile:
+      json.dump({"size" : len(keys), "total" : total}, outfile)
+    
+    logger.info("Saved frequency store with {} words at : `{}`".format(len(keys),path))
+  
+  def __len__(self):
+    return self.meta["size"]
+  
+  def __contains__(self,word):
+    return self.find(word) is not None
+  
+  def __getitem__(self,word):
+    
+    idx = self.find(word)
+    
+    if idx is None:
+      raise KeyError(str(word))
+    
+    return int(self.counts[idx])
+  
+  def __iter__(self):
+    
+    for idx in range(len(self)):
+      yield self.get_word(idx)
+  
+  def get_word(self,idx):
+    """
+    Get word stored in position.
+    
+    Args:
+      idx (int) : position in string table
+    Return:
+      word (str) : word
+    """
+    
+    word = self.words[int(self.offsets[idx]):int(self.offsets[idx + 1])].decode("utf-8")
+    
+    return word
+  
+  def find(self,word):
+    """
+    Find position of word in string table.
+    
+    Args:
+      word (str or Candidate) : word
+    Return:
+      idx (int or None) : position of word, None if word is not in store
+    """
+    
+    key = str(word).encode("utf-8")
+    
+    lo,hi = 0,len(self)
+    
+    while lo < hi:
+      mid = (lo + hi) // 2
+      probe = self.words[int(self.offsets[mid]):int(self.offsets[mid + 1])]
+      if probe < key:
+        lo = mid + 1
+      elif probe > key:
+        hi = mid
+      else:
+        return mid
+    
+    return None
+  
+  def get(self,word,default = None):
+    """
+    Get word frequency.
+    
+    Args:
+      word (str or Candidate) : word
+      default (whatever) : returned if word is not in store
+    Return:
+      freq (int) : word frequency
+    """
+    
+    idx = self.find(word)
+    
+    freq = int(self.counts[idx]) if idx is not None else default
+    
+    return freq
+  
+  def get_log_freq(self,word,default = None):
+    """
+    Get logarithm of word relative frequency.
+    
+    Args:
+      word (str or Candidate) : word
+      default (whatever) : returned if word is not in store
+    Return:
+      log_freq (float) : log relative frequency
+    """
+    
+    idx = self.find(word)
+    
+    log_freq = float(self.log_freqs[idx]) if idx is not None else default
+    
+    return log_freq
+  
+  def close(self):
+    """
+    Release memory map of string table.
+    """
+    
+    if isinstance(self.words,mmap.mmap):
+      self.words.close()
+
+
+class StringTable(object):
+  """
+  Read only list of strings stored in flat files as the string table of `FrequencyStore`,
+  but keeping the position of each string (e.g. index of word in vocabulary).
+  Opening a table does not decode the strings, which are read from disk only when used.
+  
+  The table `name` in a directory consists of:
+    - `name.bin` : UTF-8 encoded strings, concatenated in their order
+    - `name_offsets.npy` : start of each string in `name.bin` (plus end of last one)
+    - `name_order.npy` : positions of strings sorted by their bytes
+  
+  Strings are found by binary search on the sorted positions.
+  It exposes the `get` interface of the dictionary string -> position it replaces.
+  """
+  
+  def __init__(self,path,name,mmap_mode = "r"):
+    """
+    Open StringTable.
+    
+    Args:
+      path (str) : system path to directory
+      name (str) : name of table
+      mmap_mode (str or None) : `r` to memory map files (read only), None to read them
+    """
+    
+    self.offsets = np.load(os.path.join(path,"{}_offsets.npy".format(name)), mmap_mode = mmap_mode)
+    self.order = np.load(os.path.join(path,"{}_order.npy".format(name)), mmap_mode = mmap_mode)
+    
+    with open(os.path.join(path,"{}.bin".format(name)),"rb") as infile:
+      # mmap does not accept empty files
+      if mmap_mode is not None and self.offsets[-1]:
+        self.strings = mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ)
+      else:
+        self.strings = infile.read()
+  
+  @staticmethod
+  def build(strings,path,name):
+    """
+    Write strings to table.
+    
+    Args:
+      strings (list) : strings
+      path (str) : system path to directory
+      name (str) : name of table
+    """
+    
+    iom.make_dir(path)
+    
+    keys = [s.encode("utf-8") for s in strings]
+    
+    offsets = np.zeros(len(keys) + 1, dtype = np.uint64)
+    offsets[1:] = np.cumsum([len(k) for k in keys])
+    
+    order = np.asarray(sorted(range(len(keys)), key = keys.__getitem__), dtype = np.int64)
+    
+    with open(os.path.join(path,"{}.bin".format(name)),"wb") as outfile:
+      outfile.write(b"".join(keys))
+    
+    np.save(os.path.join(path,"{}_offsets.npy".format(name)),offsets)
+    np.save(os.path.join(path,"{}_order.npy".format(name)),order)
+  
+  def __len__(self):
+    return len(self.offsets) - 1
+  
+  def __contains__(self,string):
+    return self.find(string) is not None
+  
+  def __getitem__(self,idx):
+    
+    idx = int(idx)
+    
+    if not -len(self) <= idx < len(self):
+      raise IndexError("String table index out of range")
+    
+    idx %= len(self)
+    
+    string = self.strings[int(self.offsets[idx]):int(self.offsets[idx + 1])].decode("utf-8")
+    
+    return string
+  
+  def __iter__(self):
+    
+    for idx in range(len(self)):
+      yield self[idx]
+  
+  def find(self,string):
+    """
+    Find position of string in table.
+    
+    Args:
+      string (str or Candidate) : string
+    Return:
+      idx (int or None) : position of string, None if string is not in table
+    """
+    
+    key = str(string).encode("utf-8")
+    
+    lo,hi = 0,len(self)
+    
+    while lo < hi:
+      mid = (lo + hi) // 2
+      idx = int(self.order[mid])
+      probe = self.strings[int(self.offsets[idx]):int(self.offsets[idx + 1])]
+      if probe < key:
+        lo = mid + 1
+      elif probe > key:
+        hi = mid
+      else:
+        return idx
+    
+    return None
+  
+  def get(self,string,default = None):
+    """
+    Get position of string.
+    
+    Args:
+      string (str or Candidate) : string
+      default (whatever) : returned if string is not in table
+    Return:
+      idx (int) : position of string
+    """
+    
+    idx = self.find(string)
+    
+    return idx if idx is not None else default
+  
+  def close(self):
+    """
+    Release memory map of strings.
+    """
+    
+    if isinstance(self.strings,mmap.mmap):
+      self.strings.close()
+
+
+def load_frequencies(path):
+  """
+  Load word frequencies, either a frequency store directory or a pickled dictionary.
+  
+  Args:
+    path (str) : system path
+  Return:
+    freqs (FrequencyStore or dict) : lookup word -> frequency
+  """
+  
+  freqs = FrequencyStore(path) if os.path.isdir(path) else iom.load_pickle(path)
+  
+  return freqs
+
+
+if __name__ == "__main__":
+  
+  logging.basicConfig(format = '%(asctime)s : %(levelname)s : %(module)s: %(message)s', level = 'INFO')
+  
+  args = parse_arguments()
+  
+  logger.info("Loading pickled word frequencies from : `{}`".format(args.freqs))
+  
+  FrequencyStore.build(iom.load_pickle(args.freqs),args.out)
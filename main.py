@@ -9,8 +9,7 @@ Created on Fri Sep 21 17:57:59 2018
 import os
 import logging
 import argparse
-from simplifiers import SimpleScienceSimplifier,HierarchicalW2VSimplifier,PoincareSimplifier
-from evaluation import UnsupervisedEvaluation,SimpleScienceEvaluation
+from simplifiers.factory import add_simplifier_arguments
 
 
 logger = logging.getLogger(__name__)
@@ -19,22 +18,43 @@ logging.basicConfig(format = '%(asctime)s : %(levelname)s : %(module)s: %(messag
 def parse_arguments():
   
   parser = argparse.ArgumentParser(description='Run lexical simplification experiments')
-  parser.add_argument('--model',required = True, type = str, help = "Directory where model is stored")
-  parser.add_argument('--simplifier',required = True,choices = ('simplescience','hierw2v','poin'), type = str, help = "Path where all models are stored")
-  parser.add_argument('--wiki-freq',required = True,type = str, help = "wikipedia freq folder")
-  parser.add_argument('--pubmed-freq',required = True,type = str, help = "wikipedia freq folder")
-  parser.add_argument('--genia',type = str, required = True, help = "Path to GeniaTagger") 
-  parser.add_argument('--lm',type = str, required = True, help = "Path to language model")
-  parser.add_argument('--mesh-db',type = str, required = True, help = "Path to parsed MeSH databese")
-  parser.add_argument('--eval-dir',default = None,type = str, help = "Path to folder with evaluation data")
+  subparsers = parser.add_subparsers(dest = 'command')
+  subparsers.required = True
+  
+  evaluate = subparsers.add_parser('evaluate', help = "Evaluate simplifier on benchmarks")
+  evaluate.add_argument('--model',required = True, type = str, help = "Directory where model is stored")
+  evaluate.add_argument('--simplifier',required = True,choices = ('simplescience','hierw2v','poin'), type = str, help = "Path where all models are stored")
+  evaluate.add_argument('--wiki-freq',required = True,type = str, help = "wikipedia freq folder")
+  evaluate.add_argument('--pubmed-freq',required = True,type = str, help = "wikipedia freq folder")
+  evaluate.add_argument('--genia',type = str, required = True, help = "Path to GeniaTagger") 
+  evaluate.add_argument('--lm',type = str, required = True, help = "Path to language model")
+  evaluate.add_argument('--mesh-db',type = str, required = True, help = "Path to parsed MeSH databese")
+  evaluate.add_argument('--eval-dir',default = None,type = str, help = "Path to folder with evaluation data")
+  
+  simplify = subparsers.add_parser('simplify', help = "Simplify corpus streaming it line by line")
+  add_simplifier_arguments(simplify)
+  simplify.add_argument('--input',required = True, type = str, help = "Path to corpus: plain text (one text per line) or JSONL, optionally gzip compressed")
+  simplify.add_argument('--output',required = True, type = str, help = "Path where simplified corpus is written (same format of input, not compressed)")
+  simplify.add_argument('--format',default = None,choices = ('text','jsonl'), type = str, help = "Corpus format. If not given guessed from input extension")
+  simplify.add_argument('--field',default = 'text', type = str, help = "Field of JSONL objects containing the text")
+  simplify.add_argument('--workers',default = 1, type = int, help = "Number of processes")
+  simplify.add_argument('--batch-size',default = 256, type = int, help = "Number of lines sent to a process at once")
+  simplify.add_argument('--max-in-flight',default = None, type = int, help = "Maximum number of batches read and not yet written. If not given number of workers + 1")
+  simplify.add_argument('--resume',action = 'store_true', help = "Resume interrupted run from its checkpoint")
+  
+  build_bundle = subparsers.add_parser('build-bundle', help = "Compile simplifier in a bundle loading in well under a second")
+  add_simplifier_arguments(build_bundle, bundle = False)
+  build_bundle.add_argument('--out',required = True, type = str, help = "Directory of bundles, in which bundle is written in subdirectory named after its version")
+  build_bundle.add_argument('--no-neighbors',action = 'store_true', help = "Do not precompute table of nearest neighbors of each word")
+  build_bundle.add_argument('--block-size',default = 1024, type = int, help = "Number of words whose nearest neighbors are computed at once")
 
   return parser.parse_args()
 
 
-
-if __name__ == "__main__":
-    
-  args = parse_arguments()
+def evaluate(args):
+  
+  from simplifiers import SimpleScienceSimplifier,HierarchicalW2VSimplifier,PoincareSimplifier
+  from evaluation import UnsupervisedEvaluation,SimpleScienceEvaluation
   
   MODEL = args.model
   TAGGER = args.genia
@@ -93,6 +113,47 @@ if __name__ == "__main__":
   
   logger.info("Evaluate unsupervised")
   us.evaluate_simplifier(simplifier)
+
+
+def simplify(args):
+  
+  from simplifiers.factory import build_simplifier
+  from simplifiers.corpus import simplify_file
+  
+  simplifier = build_simplifier(args)
+  
+  simplify_file(simplifier,
+                input_path = args.input,
+                output_path = args.output,
+                fmt = args.format,
+                field = args.field,
+                workers = args.workers,
+                batch_size = args.batch_size,
+                max_in_flight = args.max_in_flight,
+                resume = args.resume)
+  
+  if simplifier.cache is not None:
+    simplifier.cache.report()
+    simplifier.cache.close()
+
+
+def build_bundle(args):
+  
+  from simplifiers.bundle import build_bundle
+  
+  build_bundle(args, path = args.out, neighbors = not args.no_neighbors, block_size = args.block_size)
+
+
+if __name__ == "__main__":
+    
+  args = parse_arguments()
+  
+  if args.command == 'evaluate':
+    evaluate(args)
+  elif args.command == 'simplify':
+    simplify(args)
+  elif args.command == 'build-bundle':
+    build_bundle(args)
   
   
     
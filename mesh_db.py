@@ -10,9 +10,13 @@ Created on Mon Jul 30 14:47:15 2018
 # CREATE CLASS FOR MeSH
 # FIX REPETETITIONS OF TERMS, e.g. "Postmenopausal" - "Post Menopausal"
 
+import os
 import re
+import json
 import logging
+import numpy as np
 from io_utils import IOManager as iom
+from freq_store import StringTable
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format = '%(asctime)s : %(levelname)s : %(module)s: %(message)s', level = 'INFO') 
@@ -30,7 +34,70 @@ class MeSHierarchy(object):
       mesh_db (str) : system path to pickled parsed MeSH file
     """
     self.mesh_db = iom.load_pickle(mesh_db)
- 
+  
+  def get_terms(self):
+    """
+    Get all MeSH terms.
+    
+    Return:
+      terms (set) : MeSH terms
+    """
+    
+    terms = set([v for sublist in self.mesh_db.values() for v in sublist])
+    
+    return terms
+  
+  def save(self,path):
+    """
+    Save parsed MeSH in directory as JSON, together with the string table of all its terms.
+    
+    Args:
+      path (str) : system path to directory
+    """
+    
+    iom.make_dir(path)
+    
+    with open(os.path.join(path,"mesh_db.json"),"w") as outfile:
+      json.dump({mesh_id : sorted(terms) for mesh_id,terms in self.mesh_db.items()},outfile)
+    
+    StringTable.build(sorted(self.get_terms()),path,"terms")
+    
+    logger.info("Saved MeSH hierarchy with {} ids at : `{}`".format(len(self.mesh_db),path))
+  
+  @classmethod
+  def load(cls,path):
+    """
+    Load parsed MeSH saved with `save`.
+    
+    Args:
+      path (str) : system path to directory
+    Return:
+      hierarchy (MeSHierarchy) : MeSH hierarchy
+    """
+    
+    hierarchy = cls.__new__(cls)
+    
+    with open(os.path.join(path,"mesh_db.json")) as infile:
+      hierarchy.mesh_db = {mesh_id : set(terms) for mesh_id,terms in json.load(infile).items()}
+    
+    logger.info("Loaded MeSH hierarchy with {} ids from : `{}`".format(len(hierarchy.mesh_db),path))
+    
+    return hierarchy
+  
+  @staticmethod
+  def load_terms(path):
+    """
+    Load all MeSH terms saved with `save`, without loading the hierarchy.
+    
+    Args:
+      path (str) : system path to directory
+    Return:
+      terms (freq_store.StringTable) : MeSH terms, memory mapped
+    """
+    
+    terms = StringTable(path,"terms")
+    
+    return terms
     
   def get_synonyms_from_ids(self,mesh_ids):
     """
@@ -204,7 +271,300 @@ class MeSHierarchy(object):
     ids = [k for k,v in self.mesh_db.items() if list(filter(r.match,v))]
     
     return ids
-        
+
+
+class MeSHTree(object):
+  """
+  MeSH tree answering lowest common ancestor and distance queries between nodes in constant time.
+  
+  The tree is visited once with an Euler tour, i.e. each node is recorded every time the visit passes through it.
+  The lowest common ancestor of two nodes is the node of minimum depth in the tour between their first occurrences,
+  which is found with a sparse table of minima over spans of length power of two.
+  All MeSH roots (e.g. `A01`, `C05`) are children of a virtual root.
+  
+  The nodes of each term are stored contiguously: those of term `i` are `term_nodes[term_starts[i]:term_starts[i + 1]]`.
+  
+  The tree can be saved and loaded with memory mapped arrays and string tables of ids and terms (see `freq_store.StringTable`),
+  shared by all the processes loading it.
+  """
+  
+  ARRAYS = ["depth","first","tour","log","table","term_starts","term_nodes"]
+  
+  def __init__(self,path):
+    """
+    Initialize MeSHTree with MeSH tree file.
+    
+    Args:
+      path (str) : system path to MeSH tree file, one `Term;ID` per line (e.g. `mtrees2018.bin`)
+    """
+    
+    # virtual root
+    self.ids = [""]
+    self.id2node = {"" : 0}
+    term2nodes = {}
+    
+    with open(path) as infile:
+      for line in infile:
+        if ";" not in line:
+          continue
+        term,mesh_id = line.strip().rsplit(";",1)
+        node = self.id2node.setdefault(mesh_id,len(self.ids))
+        if node == len(self.ids):
+          self.ids.append(mesh_id)
+        for t in self._get_term_forms(term):
+          term2nodes.setdefault(t,[]).append(node)
+    
+    self.term2id = {t : i for i,t in enumerate(term2nodes)}
+    self.term_starts = np.zeros(len(term2nodes) + 1, dtype = np.int64)
+    self.term_starts[1:] = np.cumsum([len(nodes) for nodes in term2nodes.values()])
+    self.term_nodes = np.asarray([n for nodes in term2nodes.values() for n in nodes], dtype = np.int32)
+    
+    self._build()
+    
+    logger.info("Built MeSH tree with {} nodes and {} terms from : `{}`".format(len(self.ids) - 1,len(self.term2id),path))
+  
+  def save(self,path):
+    """
+    Save tree in directory: ids and terms as string tables and arrays in numpy format.
+    
+    Args:
+      path (str) : system path to directory
+    """
+    
+    iom.make_dir(path)
+    
+    StringTable.build(self.ids,path,"ids")
+    StringTable.build(list(self.term2id),path,"terms")
+    
+    for name in self.ARRAYS:
+      np.save(os.path.join(path,"{}.npy".format(name)),getattr(self,name))
+    
+    logger.info("Saved MeSH tree at : `{}`".format(path))
+  
+  @classmethod
+  def load(cls,path,mmap = True):
+    """
+    Load tree saved with `save`.
+    
+    Args:
+      path (str) : system path to directory
+      mmap (bool) : memory map arrays and string tables (read only) instead of reading them
+    Return:
+      tree (MeSHTree) : MeSH tree
+    """
+    
+    tree = cls.__new__(cls)
+    
+    # string tables look up positions as the dictionaries they replace
+    tree.ids = StringTable(path,"ids", mmap_mode = "r" if mmap else None)
+    tree.id2node = tree.ids
+    tree.term2id = StringTable(path,"terms", mmap_mode = "r" if mmap else None)
+    
+    for name in cls.ARRAYS:
+      setattr(tree,name,np.load(os.path.join(path,"{}.npy".format(name)), mmap_mode = "r" if mmap else None))
+    
+    logger.info("Loaded MeSH tree with {} nodes from : `{}`".format(len(tree.ids) - 1,path))
+    
+    return tree
+  
+  def _get_term_forms(self,term):
+    """
+    Get lowercased forms of MeSH term, i.e. as it is and with inverted comma separated parts
+    (e.g. `Mammary Glands, Human` -> `human mammary glands`).
+    
+    Args:
+      term (str) : MeSH term
+    Return:
+      forms (list) : term forms
+    """
+    
+    forms = [term.lower()]
+    
+    if ',' in term:
+      words = term.split(',')
+      forms.append(' '.join((words[1].strip(),words[0].strip())).lower())
+    
+    return forms
+  
+  def _build(self):
+    """
+    Compute depths, Euler tour and sparse table.
+    """
+    
+    children = [[] for _ in self.ids]
+    
+    for node,mesh_id in enumerate(self.ids[1:], start = 1):
+      parent_id = mesh_id.rsplit('.',1)[0] if '.' in mesh_id else ""
+      # parent missing from file : attach node to virtual root
+      children[self.id2node.get(parent_id,0)].append(node)
+    
+    self.depth = np.zeros(len(self.ids), dtype = np.int32)
+    self.first = np.zeros(len(self.ids), dtype = np.int64)
+    
+    tour = []
+    stack = [(0,iter(children[0]))]
+    self.first[0] = 0
+    tour.append(0)
+    
+    while stack:
+      node,it = stack[-1]
+      child = next(it,None)
+      if child is None:
+        stack.pop()
+        if stack:
+          tour.append(stack[-1][0])
+      else:
+        self.depth[child] = self.depth[node] + 1
+        self.first[child] = len(tour)
+        tour.append(child)
+        stack.append((child,iter(children[child])))
+    
+    self.tour = np.asarray(tour, dtype = np.int32)
+    
+    # floor of log2 of span lengths
+    self.log = np.zeros(len(tour) + 1, dtype = np.int64)
+    self.log[2:] = np.floor(np.log2(np.arange(2,len(tour) + 1))).astype(np.int64)
+    
+    # table[k,i] : node of minimum depth in tour[i:i + 2^k] (entries past the end of tour are never read)
+    self.table = np.tile(self.tour,(int(self.log[len(tour)]) + 1,1))
+    
+    for k in range(1,len(self.table)):
+      half = 1 << (k - 1)
+      left,right = self.table[k - 1,:len(tour) - half],self.table[k - 1,half:]
+      self.table[k,:len(tour) - half] = np.where(self.depth[left] <= self.depth[right],left,right)
+  
+  def get_terms(self):
+    """
+    Get all MeSH terms (lowercased).
+    
+    Return:
+      terms (dict or freq_store.StringTable) : MeSH terms (lookup term -> position), supporting `in`, iteration and `len`
+    """
+    
+    terms = self.term2id
+    
+    return terms
+  
+  def get_nodes(self,term):
+    """
+    Get nodes of MeSH term. A term can appear in many positions of the tree.
+    
+    Args:
+      term (str) : MeSH term
+    Return:
+      nodes (np.ndarray) : node indices. Empty if term is not in MeSH
+    """
+    
+    idx = self.term2id.get(str(term).lower())
+    
+    if idx is None:
+      return np.zeros(0, dtype = np.int32)
+    
+    nodes = np.asarray(self.term_nodes[self.term_starts[idx]:self.term_starts[idx + 1]])
+    
+    return nodes
+  
+  def lca(self,u,v):
+    """
+    Get lowest common ancestor of pairs of nodes.
+    
+    Args:
+      u (np.ndarray or int) : node indices
+      v (np.ndarray or int) : node indices
+    Return:
+      ancestors (np.ndarray) : node indices of lowest common ancestors
+    """
+    
+    fu,fv = self.first[u],self.first[v]
+    
+    lo,hi = np.minimum(fu,fv),np.maximum(fu,fv)
+    
+    k = self.log[hi - lo + 1]
+    
+    left = self.table[k,lo]
+    right = self.table[k,hi - (1 << k) + 1]
+    
+    ancestors = np.where(self.depth[left] <= self.depth[right],left,right)
+    
+    return ancestors
+  
+  def distance(self,u,v):
+    """
+    Get number of edges between pairs of nodes.
+    
+    Args:
+      u (np.ndarray or int) : node indices
+      v (np.ndarray or int) : node indices
+    Return:
+      dist (np.ndarray) : tree distances
+    """
+    
+    dist = self.depth[u] + self.depth[v] - 2 * self.depth[self.lca(u,v)]
+    
+    return dist
+  
+  def term_distance(self,term,others):
+    """
+    Get tree distance between MeSH term and other terms, as the minimum over all their positions in the tree.
+    
+    Args:
+      term (str) : MeSH term
+      others (list) : MeSH terms
+    Return:
+      dist (np.ndarray) : tree distances. Infinite if one of the two terms is not in MeSH
+    """
+    
+    dist = np.full(len(others), np.inf)
+    
+    nodes = self.get_nodes(term)
+    
+    others_nodes = [self.get_nodes(t) for t in others]
+    owners = np.repeat(np.arange(len(others)),[len(n) for n in others_nodes])
+    
+    if not len(nodes) or not len(owners):
+      return dist
+    
+    others_nodes = np.concatenate(others_nodes)
+    
+    pair_dist = self.distance(nodes[None,:],others_nodes[:,None]).min(axis = 1)
+    
+    np.minimum.at(dist,owners,pair_dist)
+    
+    return dist
+  
+  def in_hierarchy(self,term,others):
+    """
+    Check which terms are in the hierarchy of MeSH term, i.e. are its synonyms, hypernyms or hyponyms:
+    one of their positions in the tree is the same as, an ancestor of or a descendant of one of the positions of term.
+    
+    Args:
+      term (str) : MeSH term
+      others (list) : terms
+    Return:
+      mask (np.ndarray) : boolean mask of terms in hierarchy. False for terms not in MeSH
+    """
+    
+    mask = np.zeros(len(others), dtype = bool)
+    
+    nodes = self.get_nodes(term)
+    
+    others_nodes = [self.get_nodes(t) for t in others]
+    owners = np.repeat(np.arange(len(others)),[len(n) for n in others_nodes])
+    
+    if not len(nodes) or not len(owners):
+      return mask
+    
+    others_nodes = np.concatenate(others_nodes)
+    
+    u,v = np.broadcast_arrays(nodes[None,:],others_nodes[:,None])
+    ancestors = self.lca(u,v)
+    
+    related = ((ancestors == u) | (ancestors == v)).any(axis = 1)
+    
+    mask[owners[related]] = True
+    
+    return mask
+
 
 if __name__ == "__main__":
   
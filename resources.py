@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 17:21:09 2026
+
+@author: Samuele Garda
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class LazyResource(object):
+  """
+  Resource loaded on first use. It stands for the loaded object: attribute access, indexing,
+  membership, iteration, calls and `isinstance` checks load it (once, also if used by many threads at once)
+  and are forwarded to it. Components can then be built before their resources are loaded.
+  
+  Forwarding costs a call on every access: once loaded, `on_load` is called, so that the owner
+  replaces references to the resource with the loaded object (see `ResourceLoader.bind`).
+  """
+  
+  __slots__ = ("name","loader","lock","resource","loaded","elapsed","on_load")
+  
+  def __init__(self,name,loader,on_load = None):
+    """
+    Initialize LazyResource.
+    
+    Args:
+      name (str) : name of resource, used in logs
+      loader (callable) : function with no arguments returning loaded resource
+      on_load (callable or None) : function with no arguments called once resource is loaded
+    """
+    
+    object.__setattr__(self,"name",name)
+    object.__setattr__(self,"loader",loader)
+    object.__setattr__(self,"lock",threading.Lock())
+    object.__setattr__(self,"resource",None)
+    object.__setattr__(self,"loaded",False)
+    object.__setattr__(self,"elapsed",None)
+    object.__setattr__(self,"on_load",on_load)
+  
+  def load(self):
+    """
+    Load resource if not already loaded.
+    
+    Return:
+      resource (whatever) : loaded resource
+    """
+    
+    if not self.loaded:
+      with self.lock:
+        if not self.loaded:
+          start = time.perf_counter()
+          object.__setattr__(self,"resource",self.loader())
+          object.__setattr__(self,"elapsed",time.perf_counter() - start)
+          object.__setattr__(self,"loaded",True)
+          logger.info("Loaded `{}` in {:.2f}s".format(self.name,self.elapsed))
+      if self.on_load is not None:
+        self.on_load()
+    
+    return self.resource
+  
+  @property
+  def __class__(self):
+    return type(self.load())
+  
+  def __getattr__(self,name):
+    return getattr(self.load(),name)
+  
+  def __setattr__(self,name,value):
+    setattr(self.load(),name,value)
+  
+  def __getitem__(self,key):
+    return self.load()[key]
+  
+  def __contains__(self,key):
+    return key in self.load()
+  
+  def __iter__(self):
+    return iter(self.load())
+  
+  def __len__(self):
+    return len(self.load())
+  
+  def __call__(self,*args,**kwargs):
+    return self.load()(*args,**kwargs)
+  
+  def __repr__(self):
+    return "LazyResource({}, loaded = {})".format(self.name,self.loaded)
+
+
+def is_lazy(value):
+  """
+  Check whether value is a LazyResource (`isinstance` would load it).
+  
+  Args:
+    value (whatever) : value
+  Return:
+    lazy (bool) : value is a LazyResource
+  """
+  
+  return type(value) is LazyResource
+
+
+def resolve(obj):
+  """
+  Replace attributes of object holding loaded LazyResources with the loaded objects.
+  
+  Args:
+    obj (whatever) : object with attributes
+  """
+  
+  for name,value in list(vars(obj).items()):
+    if is_lazy(value) and value.loaded:
+      setattr(obj,name,value.resource)
+
+
+class ResourceLoader(object):
+  """
+  Registry of resources needed by a simplifier. Resources are loaded lazily on first use
+  or, with `preload`, all at once in parallel threads: startup time is then bounded by the slowest resource,
+  as long as loaders spend their time in I/O or native code releasing the GIL (e.g. KenLM, memory mapped stores).
+  
+  Objects holding resources (see `bind`) get the loaded objects as soon as each resource is loaded.
+  """
+  
+  def __init__(self):
+    """
+    Initialize ResourceLoader.
+    """
+    
+    self.resources = {}
+    self.owners = []
+  
+  def add(self,name,loader):
+    """
+    Register resource.
+    
+    Args:
+      name (str) : name of resource
+      loader (callable) : function with no arguments returning loaded resource
+    Return:
+      resource (LazyResource) : resource, loaded on first use
+    """
+    
+    resource = LazyResource(name,loader,on_load = self.resolve)
+    
+    self.resources[name] = resource
+    
+    return resource
+  
+  def bind(self,*owners):
+    """
+    Register objects whose attributes hold resources: when a resource is loaded
+    they are replaced with the loaded object (see `resolve`).
+    
+    Args:
+      owners (list) : objects holding resources (None are ignored)
+    """
+    
+    self.owners.extend(owner for owner in owners if owner is not None)
+    
+    self.resolve()
+  
+  def resolve(self):
+    """
+    Replace loaded resources held by registered objects with the loaded objects.
+    """
+    
+    for owner in self.owners:
+      resolve(owner)
+  
+  def preload(self,threads = None):
+    """
+    Load all registered resources in parallel and log startup time of each of them.
+    
+    Args:
+      threads (int or None) : number of loading threads. If None one per resource
+    """
+    
+    if not self.resources:
+      return
+    
+    start = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers = threads or len(self.resources)) as executor:
+      # propagate loading errors
+      list(executor.map(LazyResource.load, self.resources.values()))
+    
+    self.report(time.perf_counter() - start)
+  
+  def report(self,elapsed = None):
+    """
+    Log time spent loading each resource.
+    
+    Args:
+      elapsed (float or None) : wall clock time of loading
+    """
+    
+    loaded = [(name,r.elapsed) for name,r in self.resources.items() if r.loaded]
+    
+    for name,secs in sorted(loaded, key = lambda x : x[1], reverse = True):
+      logger.info("Startup time - {} : {:.2f}s".format(name,secs))
+    
+    total = sum(secs for _,secs in loaded)
+    
+    if elapsed is not None:
+      logger.info("Startup time - loaded {} resources in {:.2f}s (sum of loading times {:.2f}s)".format(len(loaded),elapsed,total))
+    else:
+      logger.info("Startup time - loaded {} of {} resources (sum of loading times {:.2f}s)".format(len(loaded),len(self.resources),total))
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:03:18 2026
+
+@author: Samuele Garda
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import simplifiers.abstract_simplifier as abstract_simplifier
+from components.candidates import Candidate
+from simplifiers.factory import add_simplifier_arguments,build_simplifier
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format = '%(asctime)s : %(levelname)s : %(module)s: %(message)s', level = 'INFO')
+
+# HTTP status lines
+STATUS = {200 : "200 OK", 400 : "400 Bad Request", 404 : "404 Not Found", 500 : "500 Internal Server Error"}
+
+
+def parse_arguments():
+  """
+  Parse command line arguments.
+  """
+  
+  parser = argparse.ArgumentParser(description='Serve lexical simplification over HTTP')
+  
+  add_simplifier_arguments(parser)
+  parser.add_argument('--host',default = '127.0.0.1', type = str, help = "Host to listen on")
+  parser.add_argument('--port',default = 8080, type = int, help = "Port to listen on")
+  parser.add_argument('--unix-socket',default = None, type = str, help = "Listen on Unix socket at this path instead of host and port")
+  parser.add_argument('--max-batch-size',default = 32, type = int, help = "Maximum number of requests processed together")
+  parser.add_argument('--max-wait',default = 5.0, type = float, help = "Maximum time (ms) a request waits for others to fill its batch")
+  parser.add_argument('--workers',default = 1, type = int, help = "Number of threads (or processes) processing batches")
+  parser.add_argument('--processes',action = 'store_true', help = "Process batches with a pool of forked processes instead of threads")
+  parser.add_argument('--sentence-workers',default = 1, type = int, help = "Number of processes simplifying sentences of a text concurrently (only with threads)")
+  
+  return parser.parse_args()
+
+
+def check_request(kind,payload):
+  """
+  Check fields of request, raising ValueError if it is malformed: `word` must be a string, 
+  `context` (optional) a string and `text` a string or a list of strings.
+  
+  Args:
+    kind (str) : `word` or `text`
+    payload (dict) : request
+  """
+  
+  if kind not in payload:
+    raise ValueError("missing field `{}`".format(kind))
+  
+  if kind == "word":
+    if not isinstance(payload["word"],str):
+      raise ValueError("field `word` must be a string")
+    if not isinstance(payload.get("context"),(str,type(None))):
+      raise ValueError("field `context` must be a string")
+  else:
+    text = payload["text"]
+    if not isinstance(text,str) and not (isinstance(text,list) and all(isinstance(tok,str) for tok in text)):
+      raise ValueError("field `text` must be a string or a list of strings")
+
+
+def get_tokens(text):
+  """
+  Get tokens of text of request.
+  
+  Args:
+    text (str or list) : text or tokens
+  Return:
+    tokens (list) : tokens
+  """
+  
+  tokens = text.split() if isinstance(text,str) else text
+  
+  return tokens
+
+
+def run_batch(simplifier,batch):
+  """
+  Process batch of requests together. The stages of the pipeline that do not depend on context are run at once
+  for all the words of the batch, i.e. the words of `word` requests and the complex words of `text` requests
+  (see `AbstractSimplifier.get_context_free_candidates_batch`), the others for each request.
+  Context free `word` requests are answered by `simplify_word`, hence from the simplification cache if any.
+  
+  Requests for the same word in the same context are processed only once. 
+  A request that fails gets an `error` result, without affecting the others of the batch.
+  
+  Args:
+    simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+    batch (list) : requests, tuples (kind,payload) where kind is `word` or `text` (see `check_request`)
+  Return:
+    results (list) : result of each request
+  """
+  
+  shared = {}
+  words = []
+  
+  for kind,payload in batch:
+    if kind == "text":
+      words.extend(simplifier.get_complex_words(get_tokens(payload["text"])))
+    elif payload.get("context") is not None or simplifier.cache is None:
+      words.append(Candidate(payload["word"]))
+  
+  try:
+    simplifier.share_context_free_candidates(words,shared)
+  except Exception:
+    # requests are processed one by one : the failing ones get their error
+    logger.exception("Failed processing batch of {} requests together".format(len(batch)))
+  
+  done = {}
+  results = []
+  
+  for kind,payload in batch:
+    
+    try:
+      
+      if kind == "word":
+        word,context = payload["word"],payload.get("context")
+        if (word,context) not in done:
+          if context is None and simplifier.cache is not None:
+            candidates = simplifier.simplify_word(word)
+          else:
+            simplifier.share_context_free_candidates([Candidate(word)],shared)
+            candidates = simplifier.simplify_in_context(word = word, candidates = shared[word], context = context)
+          done[(word,context)] = {"candidates" : candidates}
+        result = done[(word,context)]
+      
+      else:
+        result = {"text" : simplifier.simplify_document(get_tokens(payload["text"]), shared = shared)}
+    
+    except Exception as e:
+      logger.exception("Failed processing `{}` request".format(kind))
+      result = {"error" : "{} : {}".format(type(e).__name__,e)}
+    
+    results.append(result)
+  
+  return results
+
+
+def _run_batch(batch):
+  """
+  Process batch of requests in worker process of the service.
+  
+  Args:
+    batch (list) : requests
+  Return:
+    results (list) : result of each request
+  """
+  
+  return run_batch(abstract_simplifier._WORKER_SIMPLIFIER,batch)
+
+
+class SimplificationService(object):
+  """
+  Asynchronous simplification service. Requests arriving within `max_wait` of each other are
+  grouped in batches of at most `max_batch_size`, which are processed by a pool of threads
+  (or forked processes) while the event loop keeps accepting requests.
+  
+  A larger `max_wait` gives larger batches (more throughput) at the price of latency.
+  
+  Requests are HTTP POST with JSON body:
+    - `/simplify-word` : {"word" : str, "context" : str (optional)} -> {"candidates" : list}
+    - `/simplify-text` : {"text" : str or list of tokens} -> {"text" : list of tokens}
+  
+  Texts are simplified sentence by sentence (see `AbstractSimplifier.simplify_document`).
+  Failed requests get {"error" : str}, with status 400 if malformed and 500 if processing them failed.
+  """
+  
+  ROUTES = {"/simplify-word" : "word", "/simplify-text" : "text"}
+  
+  def __init__(self,simplifier,max_batch_size = 32,max_wait = 0.005,workers = 1,processes = False):
+    """
+    Initialize SimplificationService.
+    
+    Args:
+      simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+      max_batch_size (int) : maximum number of requests processed together
+      max_wait (float) : maximum time (seconds) a request waits for others to fill its batch
+      workers (int) : number of threads (or processes) processing batches
+      processes (bool) : process batches with forked processes instead of threads
+    """
+    
+    self.simplifier = simplifier
+    self.max_batch_size = max_batch_size
+    self.max_wait = max_wait
+    self.queue = None
+    
+    if processes:
+      # workers share resources loaded before fork. They are forked now, before any connection is accepted,
+      # so that they do not inherit open sockets
+      self.executor = abstract_simplifier.fork_pool(simplifier,workers,executor = True)
+      self.run_batch = _run_batch
+    else:
+      self.executor = ThreadPoolExecutor(max_workers = workers)
+      self.run_batch = lambda batch : run_batch(self.simplifier,batch)
+    
+    self.requests = 0
+    self.batches = 0
+  
+  async def submit(self,kind,payload):
+    """
+    Submit request and wait for its result.
+    
+    Args:
+      kind (str) : `word` or `text`
+      payload (dict) : request
+    Return:
+      result (dict) : result
+    """
+    
+    future = asyncio.get_running_loop().create_future()
+    
+    await self.queue.put((kind,payload,future))
+    
+    return await future
+  
+  async def batcher(self):
+    """
+    Collect requests in batches and dispatch them to the pool.
+    A batch is closed when it is full or `max_wait` has passed since its first request.
+    """
+    
+    loop = asyncio.get_running_loop()
+    
+    while True:
+      
+      batch = [await self.queue.get()]
+      deadline = loop.time() + self.max_wait
+      
+      while len(batch) < self.max_batch_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+          break
+        try:
+          batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+        except asyncio.TimeoutError:
+          break
+      
+      self.requests += len(batch)
+      self.batches += 1
+      
+      asyncio.ensure_future(self.dispatch(batch))
+  
+  async def dispatch(self,batch):
+    """
+    Process batch in the pool and deliver results.
+    
+    Args:
+      batch (list) : tuples (kind,payload,future)
+    """
+    
+    loop = asyncio.get_running_loop()
+    
+    try:
+      results = await loop.run_in_executor(self.executor,self.run_batch,[(kind,payload) for kind,payload,_ in batch])
+    except Exception as e:
+      logger.exception("Failed processing batch of {} requests".format(len(batch)))
+      for _,_,future in batch:
+        if not future.done():
+          future.set_exception(e)
+      return
+    
+    for (_,_,future),result in zip(batch,results):
+      if not future.done():
+        future.set_result(result)
+  
+  async def handle(self,reader,writer):
+    """
+    Handle HTTP connection: read one request and write its response.
+    
+    Args:
+      reader (asyncio.StreamReader) : connection input
+      writer (asyncio.StreamWriter) : connection output
+    """
+    
+    try:
+      
+      request_line = (await reader.readline()).decode("latin-1").split()
+      headers = {}
+      
+      while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+          break
+        name,_,value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+      
+      try:
+        length = int(headers.get("content-length",0))
+        if length < 0:
+          raise ValueError
+      except ValueError:
+        length = None
+      
+      if length is None:
+        status,result = 400,{"error" : "invalid Content-Length"}
+      elif len(request_line) < 2 or request_line[0] != "POST" or request_line[1] not in self.ROUTES:
+        await reader.readexactly(length)
+        status,result = 404,{"error" : "unknown endpoint"}
+      else:
+        body = await reader.readexactly(length)
+        try:
+          payload = json.loads(body.decode("utf-8"))
+          kind = self.ROUTES[request_line[1]]
+          if not isinstance(payload,dict):
+            raise ValueError("request must be a JSON object")
+          check_request(kind,payload)
+        except ValueError as e:
+          status,result = 400,{"error" : str(e)}
+        else:
+          try:
+            result = await self.submit(kind,payload)
+            status = 500 if "error" in result else 200
+          except Exception as e:
+            status,result = 500,{"error" : str(e)}
+      
+      data = json.dumps(result).encode("utf-8")
+      
+      writer.write("HTTP/1.1 {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n".format(
+                   STATUS[status],len(data)).encode("latin-1") + data)
+      await writer.drain()
+    
+    except (asyncio.IncompleteReadError,ConnectionError):
+      pass
+    
+    finally:
+      writer.close()
+  
+  async def serve(self,host = '127.0.0.1',port = 8080,unix_socket = None):
+    """
+    Start service and serve until cancelled.
+    
+    Args:
+      host (str) : host to listen on
+      port (int) : port to listen on
+      unix_socket (str or None) : listen on Unix socket at this path instead of host and port
+    """
+    
+    self.queue = asyncio.Queue()
+    
+    batcher = asyncio.ensure_future(self.batcher())
+    
+    if unix_socket is not None:
+      server = await asyncio.start_unix_server(self.handle, path = unix_socket)
+      logger.info("Serving on Unix socket : `{}`".format(unix_socket))
+    else:
+      server = await asyncio.start_server(self.handle, host = host, port = port)
+      logger.info("Serving on : `{}:{}`".format(host,port))
+    
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      batcher.cancel()
+      logger.info("Served {} requests in {} batches".format(self.requests,self.batches))
+  
+  def close(self):
+    """
+    Shut down pool processing batches.
+    """
+    
+    self.executor.shutdown()
+
+
+if __name__ == "__main__":
+  
+  args = parse_arguments()
+  
+  start = time.perf_counter()
+  
+  simplifier = build_simplifier(args)
+  
+  if args.sentence_workers > 1 and not args.processes:
+    simplifier.start_pool(args.sentence_workers)
+  
+  logger.info("Loaded simplifier in {:.2f}s".format(time.perf_counter() - start))
+  
+  service = SimplificationService(simplifier,
+                                  max_batch_size = args.max_batch_size,
+                                  max_wait = args.max_wait / 1000,
+                                  workers = args.workers,
+                                  processes = args.processes)
+  
+  try:
+    asyncio.run(service.serve(host = args.host, port = args.port, unix_socket = args.unix_socket))
+  except KeyboardInterrupt:
+    pass
+  finally:
+    service.close()
+    simplifier.stop_pool()
@@ -6,7 +6,123 @@ Created on Thu Sep 19 17:33:17 2019
 @author: Samuele Garda
 """
 
+import os
+import gc
+import time
+import logging
+import multiprocessing
 from abc import ABCMeta,abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from resources import is_lazy
+from components.candidates import Candidate
+from components.sentence import Sentence,split_sentences
+
+logger = logging.getLogger(__name__)
+
+# simplifier of worker process forked by `fork_pool`. Set only in workers
+_WORKER_SIMPLIFIER = None
+
+
+def _init_worker(simplifier):
+  """
+  Initialize worker process forked by `fork_pool`.
+  
+  Args:
+    simplifier (AbstractSimplifier) : simplifier inherited from parent process
+  """
+  
+  global _WORKER_SIMPLIFIER
+  
+  _WORKER_SIMPLIFIER = simplifier
+  _WORKER_SIMPLIFIER.after_fork()
+
+
+def fork_pool(simplifier,workers,executor = False):
+  """
+  Start pool of processes forked from the current one, which inherit the loaded resources of simplifier
+  copy-on-write instead of loading them again. Resources are loaded before forking. 
+  Objects existing before the fork are excluded from garbage collection, 
+  so that it does not write on (and copy) their memory pages.
+  
+  Simplifier is handed to workers as argument of their initializer, which is not pickled with fork,
+  and each worker calls its `after_fork`. Functions run by workers find it in `_WORKER_SIMPLIFIER`.
+  
+  Args:
+    simplifier (AbstractSimplifier) : simplifier
+    workers (int) : number of processes
+    executor (bool) : return `concurrent.futures.ProcessPoolExecutor` instead of `multiprocessing.Pool`
+  Return:
+    pool (multiprocessing.pool.Pool or concurrent.futures.ProcessPoolExecutor) : pool of processes
+  """
+  
+  simplifier.load_resources()
+  
+  context = multiprocessing.get_context("fork")
+  
+  gc.freeze()
+  
+  try:
+    if executor:
+      pool = ProcessPoolExecutor(max_workers = workers, mp_context = context,
+                                 initializer = _init_worker, initargs = (simplifier,))
+      # workers are forked on first submit : fork them now
+      pool.submit(os.getpid).result()
+    else:
+      pool = context.Pool(workers, initializer = _init_worker, initargs = (simplifier,))
+  finally:
+    gc.unfreeze()
+  
+  return pool
+
+
+def _simplify_text(text):
+  """
+  Simplify text in worker process of `simplify_corpus`.
+  
+  Args:
+    text (list) : tokens
+  Return:
+    tokens (list) : simplified tokens
+  """
+  
+  return _WORKER_SIMPLIFIER.simplify_text(text)
+
+
+def _simplify_text_with_memory(text):
+  """
+  Simplify text in worker process of `simplify_corpus` and measure memory of the worker.
+  
+  Args:
+    text (list) : tokens
+  Return:
+    tokens,pid,memory (tuple) : simplified tokens, process id and unique memory of process
+  """
+  
+  return _WORKER_SIMPLIFIER.simplify_text(text),os.getpid(),get_unique_memory()
+
+
+def get_unique_memory(pid = "self"):
+  """
+  Get memory used only by a process (Unique Set Size), i.e. private pages not shared 
+  with other processes (as pages of memory mapped files or not yet copied after fork).
+  Available only on Linux.
+  
+  Args:
+    pid (int or str) : process id
+  Return:
+    memory (int or None) : bytes of private memory. None if not available
+  """
+  
+  try:
+    with open("/proc/{}/smaps_rollup".format(pid)) as infile:
+      kbs = [int(line.split()[1]) for line in infile if line.startswith(("Private_Clean:","Private_Dirty:"))]
+  except (IOError,ValueError,IndexError):
+    return None
+  
+  memory = sum(kbs) * 1024
+  
+  return memory
+
 
 class AbstractSimplifier(object,metaclass = ABCMeta):
   """
@@ -14,7 +130,7 @@ class AbstractSimplifier(object,metaclass = ABCMeta):
   Define methods that a Simplifier must implement.
   """
   
-  def __init__(self,parser,cwi,generator,selector,ranker):
+  def __init__(self,parser,cwi,generator,selector,ranker,cache = None):
     """
     Initialization signature for Simplifiers.
         
@@ -30,6 +146,13 @@ class AbstractSimplifier(object,metaclass = ABCMeta):
     
     
     The full pipeline runs in the follwing methods: `simplify_word` and `simplify_text`. 
+    
+    Results of context free calls to `simplify_word` are memoized if a `cache` is given 
+    (see `simplifiers.cache.SimplificationCache`). Entries are invalidated when any of `sources` changes:
+    these are the files (or spacy models) the resources of the Simplifier were loaded from, set by who builds it.
+    
+    Resources loaded on first use are registered with `set_resources`, and all loaded by `load_resources`
+    before processes are forked, so that workers share them instead of loading each a copy.
      
     """
     self.parser = parser
@@ -37,23 +160,335 @@ class AbstractSimplifier(object,metaclass = ABCMeta):
     self.generator = generator
     self.selector = selector
     self.ranker = ranker
+    self.cache = cache
+    self.sources = {}
+    self.resources = None
+    self.pool = None
+  
+  def set_resources(self,resources):
+    """
+    Register resources of Simplifier: its components get each loaded object as soon as it is loaded.
+    
+    Args:
+      resources (resources.ResourceLoader) : resources held by Simplifier and its components
+    """
+    
+    self.resources = resources
+    
+    resources.bind(self,self.cwi,self.generator,self.selector,self.ranker)
+  
+  def load_resources(self,threads = None):
+    """
+    Load all resources not loaded yet, in parallel threads (see `resources.ResourceLoader.preload`).
+    
+    Args:
+      threads (int or None) : number of loading threads. If None one per resource
+    """
+    
+    if self.resources is not None:
+      self.resources.preload(threads = threads)
+  
+  def get_config(self):
+    """
+    Get configuration of Simplifier: class of each component and its parameters,
+    whether it runs on vocabulary indices and the sources of its resources (e.g. language model).
+    Private attributes and usage statistics of components (listed in their `STATS`) are not parameters.
+    
+    Return:
+      config (dict) : simplifier configuration
+    """
+    
+    scalar = (bool,int,float,str)
+    
+    config = {"simplifier" : type(self).__name__,
+              "vocab" : getattr(self,"vocab",None) is not None,
+              "sources" : {k : str(v) for k,v in self.sources.items()}}
+    
+    for name in ["cwi","generator","selector","ranker"]:
+      component = getattr(self,name)
+      params = {}
+      if component is not None:
+        for k,v in vars(component).items():
+          if k.startswith("_") or k in getattr(component,"STATS",()) or is_lazy(v):
+            continue
+          if isinstance(v,scalar):
+            params[k] = v
+          elif isinstance(v,(list,tuple)) and all(isinstance(x,scalar) for x in v):
+            params[k] = list(v)
+      config[name] = [type(component).__name__,params]
+    
+    return config
 
   @abstractmethod
   def simplify_word():
     pass
   
-  @abstractmethod
-  def simplify_text(self,text):
+  def get_context_free_candidates(self,word):
+    """
+    Run the stages of the pipeline that do not depend on the context of complex word,
+    i.e. whose result can be shared by all its occurrences in a text. 
+    By default no stage is shared.
+    
+    Args:
+      word (str or Candidate) : complex word
+    Return:
+      candidates (whatever or None) : input of `simplify_in_context`
+    """
+    
+    return None
+  
+  def get_context_free_candidates_batch(self,words):
+    """
+    Run the stages of the pipeline that do not depend on context for many complex words at once
+    (see `get_context_free_candidates`). By default they are run word by word.
+    
+    Args:
+      words (list) : distinct complex words (str or Candidate)
+    Return:
+      shared (dict) : output of `get_context_free_candidates` of each word
+    """
+    
+    shared = {str(word) : self.get_context_free_candidates(word) for word in words}
+    
+    return shared
+  
+  def share_context_free_candidates(self,words,shared):
+    """
+    Add to shared stages the output of `get_context_free_candidates` for complex words not seen yet,
+    computed with a single call to `get_context_free_candidates_batch`.
+    
+    Args:
+      words (list) : complex words (Candidate)
+      shared (dict) : output of `get_context_free_candidates` for complex words already seen. It is updated
+    """
+    
+    new = {}
+    for word in words:
+      if word.word not in shared:
+        new.setdefault(word.word,word)
+    
+    if new:
+      shared.update(self.get_context_free_candidates_batch(list(new.values())))
+  
+  def get_complex_words(self,tokens):
+    """
+    Find complex words of text.
+    
+    Args:
+      tokens (list) : tokens
+    Return:
+      words (list) : complex words (Candidate), in text order
+    """
+    
+    words = [Candidate(tok) for tok in tokens]
+    
+    words = [w for w,is_complex in zip(words,self.cwi.is_complex_batch(words)) if is_complex]
+    
+    return words
+  
+  def simplify_in_context(self,word,candidates,context = None):
+    """
+    Run the stages of the pipeline that depend on the context of complex word, 
+    starting from the output of `get_context_free_candidates`. By default the entire pipeline is run.
+    
+    Args:
+      word (str or Candidate) : complex word
+      candidates (whatever or None) : output of `get_context_free_candidates`
+      context (str or Sentence or None) : context in which word appears
+    Return:
+      candidates (list) : ranked simplification candidates
+    """
+    
+    return self.simplify_word(word = word, context = context)
+  
+  def get_top_candidate(self,candidates):
+    """
+    Get best simplification candidate.
+    
+    Args:
+      candidates (list) : ranked simplification candidates
+    Return:
+      top_candidate (str or None) : best candidate, None if there is none
+    """
+    
+    top_candidate = str(candidates[0]) if candidates else None
+    
+    return top_candidate
+  
+  def simplify_text(self,text,shared = None):
+    """
+    Simplify text replacing each complex word with its best simplification candidate.
+    
+    Text is annotated once and substitutions are made in place, so the cost is linear in the number of tokens:
+    components read from the sentence only the window of preceding tokens they need as context.
+    
+    Stages that do not depend on context are run once for each distinct complex word of the text,
+    all of them together before substitutions (see `get_context_free_candidates_batch`), 
+    while the others are run for each of its occurrences.
+    
+    Args:
+      text (list) : tokens
+      shared (dict or None) : output of `get_context_free_candidates` for complex words already seen,
+      updated with the new ones. Passing the same dict shares them across texts (e.g. sentences of a document)
+    Return:
+      tokens (list) : simplified tokens
+    """
+    
+    sentence = Sentence(text, parser = self.parser)
+    
+    shared = shared if shared is not None else {}
+    
+    positions = self.cwi.get_complex_positions(sentence)
+    
+    self.share_context_free_candidates([sentence.words[idx] for idx in positions],shared)
+    
+    for idx in positions:
+      word = sentence.words[idx]
+      sentence.index = idx
+      candidates = self.simplify_in_context(word = word, candidates = shared[word.word], context = sentence)
+      top_candidate = self.get_top_candidate(candidates)
+      if top_candidate is not None:
+        sentence.substitute(idx,top_candidate)
+    
+    return sentence.tokens
+  
+  def simplify_document(self,text,chunksize = 1,shared = None):
+    """
+    Simplify document sentence by sentence. Simplifications never depend on text outside
+    the sentence of the complex word, hence sentences are simplified independently:
+    concurrently by the pool of processes started with `start_pool`, if any, otherwise one after the other.
+    Results are reassembled in input order.
+    
+    Sentences simplified one after the other share the stages of the pipeline not depending on context
+    for all the occurrences of a complex word in the document (see `simplify_text`): they are run
+    for all complex words of the document at once, before simplifying its first sentence.
+    
+    Args:
+      text (list) : tokens
+      chunksize (int) : number of sentences sent to a worker at once
+      shared (dict or None) : output of `get_context_free_candidates` for complex words already seen (see `simplify_text`),
+      updated with the new ones. Not used by the pool of processes
+    Return:
+      tokens (list) : simplified tokens
+    """
+    
+    sentences = split_sentences(text)
+    
+    if self.pool is not None and len(sentences) > 1:
+      simplified = self.pool.map(_simplify_text, sentences, chunksize = chunksize)
+    else:
+      shared = shared if shared is not None else {}
+      self.share_context_free_candidates(self.get_complex_words(text),shared)
+      simplified = [self.simplify_text(sentence, shared = shared) for sentence in sentences]
+    
+    tokens = [tok for sentence in simplified for tok in sentence]
+    
+    return tokens
+  
+  def start_pool(self,workers = None):
+    """
+    Start pool of processes simplifying sentences of documents (see `simplify_document`).
+    Workers are forked from the current process (see `fork_pool`) and are kept alive
+    until `stop_pool`, so that each document pays only the cost of sending its sentences.
+    
+    Args:
+      workers (int or None) : number of processes. If None one per core
+    """
+    
+    if self.pool is not None:
+      return
+    
+    workers = workers if workers is not None else multiprocessing.cpu_count()
+    
+    self.pool = fork_pool(self,workers)
+    
+    logger.info("Started pool of {} processes for simplifying sentences".format(workers))
+  
+  def stop_pool(self):
+    """
+    Stop pool of processes started with `start_pool`.
+    """
+    
+    if self.pool is not None:
+      self.pool.terminate()
+      self.pool.join()
+      self.pool = None
+  
+  def after_fork(self):
+    """
+    Restart resources that cannot be shared with the parent process after fork,
+    i.e. GeniaTagger processes, connection to simplification cache on disk and locks of in-process caches and of usage statistics.
+    A pool of processes of the parent is not usable in the child.
+    """
+    
+    self.pool = None
+    
+    for resource in [self.parser,self.cache,self.ranker,getattr(self.ranker,"cache",None),getattr(self.selector,"pipeline",None)]:
+      if hasattr(resource,"after_fork"):
+        resource.after_fork()
+  
+  def simplify_corpus(self,texts,workers = None,chunksize = 16,report_memory = False):
+    """
+    Simplify texts in parallel with a pool of processes.
+    
+    Workers are forked from the current process, hence they inherit the loaded models copy-on-write
+    instead of loading them again (see `fork_pool`). Texts are sent to workers in chunks
+    and results are returned in input order.
+    
+    Large arrays are not copied at all if resources are loaded memory mapped 
+    (e.g. `Vocabulary.load`, `MeSHTree.load`, `freq_store.FrequencyStore`).
+    With `report_memory` the memory used only by each worker is logged, for sizing deployments.
+    
+    Args:
+      texts (list) : texts, each a list of tokens
+      workers (int or None) : number of processes. If None one per core. If 1 texts are simplified in this process
+      chunksize (int) : number of texts sent to a worker at once
+      report_memory (bool) : log unique memory of each worker
+    Return:
+      simplified (list) : simplified texts, each a list of tokens
+    """
+    
+    texts = list(texts)
+    workers = workers if workers is not None else multiprocessing.cpu_count()
+    
+    start = time.perf_counter()
+    
+    if workers <= 1:
+      
+      simplified = [self.simplify_text(text) for text in texts]
+    
+    else:
+      
+      with fork_pool(self,workers) as pool:
+        if report_memory:
+          results = list(pool.imap(_simplify_text_with_memory, texts, chunksize = chunksize))
+          simplified = [r[0] for r in results]
+          self.report_memory({pid : memory for _,pid,memory in results})
+        else:
+          simplified = list(pool.imap(_simplify_text, texts, chunksize = chunksize))
+    
+    elapsed = time.perf_counter() - start
+    
+    logger.info("Simplified {} texts with {} workers in {:.2f}s ({:.1f} texts/s)".format(len(texts),workers,elapsed,
+                len(texts) / max(elapsed,1e-9)))
+    
+    return simplified
+  
+  def report_memory(self,workers_memory):
+    """
+    Log unique memory of this process and of workers.
+    
+    Args:
+      workers_memory (dict) : lookup worker process id -> unique memory (bytes), as last measured by the worker
+    """
+    
+    memory = get_unique_memory()
     
-    simplified_text = []
+    if memory is None:
+      logger.info("Unique memory is not available on this platform")
+      return
     
-    for word in text:
-      if self.cwi.is_complex(word):
-        context = " ".join(simplified_text)
-        candidates = self.simplify_word(word = word, context = context)
-        top_candidate = self.get_top_candidate(candidates)
-        simplified_text.append(top_candidate)
-      else:
-        simplified_text.append(word)
+    logger.info("Main process unique memory : {:.1f} MB".format(memory / 2**20))
     
-  
\ No newline at end of file
+    for pid,memory in sorted(workers_memory.items()):
+      logger.info("Worker {} unique memory : {:.1f} MB".format(pid,memory / 2**20))
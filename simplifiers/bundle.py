@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 19:48:26 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from io_utils import IOManager as iom
+from resources import ResourceLoader
+from freq_store import FrequencyStore
+from simplifiers.cache import get_fingerprint
+from simplifiers.factory import check_arguments,get_resources,load_tagger
+
+logger = logging.getLogger(__name__)
+
+# version of bundle layout: bundles with another one are not loaded
+BUNDLE_FORMAT = 2
+
+# simplifiers that can run only on the vocabulary arrays of a bundle (see `components.vocabulary.Vocabulary`)
+BUNDLE_SIMPLIFIERS = ('simplescience','hiersimple')
+
+# simplifier parameters stored in bundle
+PARAMS = ('simplifier','cwi_threshold','spacy','tagger','ranker','mesh_weight','topn','cos_thr','freq_thr','char_ngram')
+
+
+def get_bundle_version(args,neighbors = True,block_size = 1024):
+  """
+  Compute version of bundle from layout format, simplifier parameters, build options and fingerprint of its source files:
+  the same configuration built with the same options from the same files has the same version.
+  
+  Args:
+    args (argparse.Namespace) : parsed command line arguments (see `simplifiers.factory.add_simplifier_arguments`)
+    neighbors (bool) : bundle has table of nearest neighbors
+    block_size (int) : number of words whose neighbors are computed at once
+  Return:
+    version (str) : bundle version
+  """
+  
+  sources = [p for p in [args.model,args.complex_freq,args.simple_freq,args.mesh_db,args.mesh_tree] if p is not None]
+  
+  params = {name : getattr(args,name) for name in PARAMS}
+  build = {"neighbors" : neighbors, "block_size" : block_size}
+  
+  version = hashlib.sha1(json.dumps([BUNDLE_FORMAT,params,build,get_fingerprint(sources)], sort_keys = True).encode("utf-8")).hexdigest()[:12]
+  
+  return version
+
+
+def save_frequencies(freqs,source,path):
+  """
+  Save word frequencies in bundle as frequency store.
+  
+  Args:
+    freqs (dict or freq_store.FrequencyStore) : lookup word -> frequency
+    source (str) : system path from which frequencies were loaded
+    path (str) : system path to frequency store directory
+  """
+  
+  if os.path.isdir(source):
+    shutil.copytree(source,path)
+  else:
+    FrequencyStore.build(freqs,path)
+
+
+def build_bundle(args,path,neighbors = True,block_size = 1024):
+  """
+  Compile Simplifier described by command line arguments in a bundle: a directory of artifacts
+  that are memory mapped or read with no further processing when loaded (see `load_bundle`).
+  
+  The bundle contains:
+    - `vocab` : vocabulary of embedding model (unit vectors, frequencies, complexity scores, MeSH membership),
+    context free Part of Speech tags of all words and, with `neighbors`, table of nearest neighbors of each word
+    - `complex_freq`,`simple_freq` : frequency stores
+    - `mesh_tree` : MeSH tree, memory mapped when loaded (hierarchical simplifiers given a MeSH tree),
+    otherwise `mesh` : parsed MeSH and list of all its terms (hierarchical simplifiers)
+    - `bundle.json` : manifest with format, version and simplifier parameters
+  
+  Bundles are written in `<path>/<version>`, where version depends on parameters, build options and source files.
+  The directory is written under a temporary name and renamed when complete, then `<path>/LATEST` is updated:
+  a bundle being built is never loaded.
+  
+  Args:
+    args (argparse.Namespace) : parsed command line arguments (see `simplifiers.factory.add_simplifier_arguments`)
+    path (str) : system path to directory of bundles
+    neighbors (bool) : compute table of nearest neighbors
+    block_size (int) : number of words whose neighbors are computed at once
+  Return:
+    bundle_path (str) : system path to bundle
+  """
+  
+  from components.complex_word_identifier import DummyComplexWordIdentifier
+  from components.vocabulary import Vocabulary
+  
+  check_arguments(args)
+  
+  if args.simplifier not in BUNDLE_SIMPLIFIERS:
+    raise ValueError("Simplifier `{}` cannot be bundled. Choose one of : {}".format(args.simplifier,BUNDLE_SIMPLIFIERS))
+  
+  if args.model is None:
+    raise ValueError("Bundle vocabulary is built from embedding model (--model)")
+  
+  version = get_bundle_version(args, neighbors = neighbors, block_size = block_size)
+  bundle_path = os.path.join(path,version)
+  
+  if os.path.exists(bundle_path):
+    logger.info("Bundle `{}` already exists at : `{}`".format(version,bundle_path))
+  
+  else:
+    
+    start = time.perf_counter()
+    
+    tmp = bundle_path + ".tmp"
+    if os.path.exists(tmp):
+      shutil.rmtree(tmp)
+    iom.make_dir(tmp)
+    
+    resources = get_resources(args)
+    resources.preload()
+    res = resources.resources
+    
+    complex_freq = res["complex_freq"].load()
+    simple_freq = res["simple_freq"].load()
+    
+    save_frequencies(complex_freq,args.complex_freq,os.path.join(tmp,"complex_freq"))
+    save_frequencies(simple_freq,args.simple_freq,os.path.join(tmp,"simple_freq"))
+    
+    mesh_words = None
+    
+    if "mesh_tree" in res:
+      mesh_tree = res["mesh_tree"].load()
+      mesh_tree.save(os.path.join(tmp,"mesh_tree"))
+      mesh_words = mesh_tree.get_terms()
+    
+    elif "mesh_db" in res:
+      mesh_db = res["mesh_db"].load()
+      mesh_db.save(os.path.join(tmp,"mesh"))
+      mesh_words = mesh_db.get_terms()
+    
+    cwi = DummyComplexWordIdentifier(threshold = args.cwi_threshold, complex_freq = complex_freq, simple_freq = simple_freq)
+    
+    vocab = Vocabulary(res["model"].load(),cwi,mesh_words)
+    vocab.tag_words(res["parser"].load())
+    if neighbors:
+      vocab.compute_neighbors(args.topn, block_size = block_size)
+    vocab.save(os.path.join(tmp,"vocab"))
+    
+    manifest = {"format" : BUNDLE_FORMAT,
+                "version" : version,
+                "created" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "params" : {name : getattr(args,name) for name in PARAMS},
+                "build" : {"neighbors" : neighbors, "block_size" : block_size},
+                "sources" : {"model" : args.model, "complex_freq" : args.complex_freq,
+                             "simple_freq" : args.simple_freq, "mesh_db" : args.mesh_db, "mesh_tree" : args.mesh_tree}}
+    
+    with open(os.path.join(tmp,"bundle.json"),"w") as outfile:
+      json.dump(manifest,outfile,indent = 2)
+    
+    os.replace(tmp,bundle_path)
+    
+    logger.info("Built bundle `{}` in {:.2f}s at : `{}`".format(version,time.perf_counter() - start,bundle_path))
+  
+  latest = os.path.join(path,"LATEST")
+  
+  with open(latest + ".tmp","w") as outfile:
+    outfile.write(version)
+  
+  os.replace(latest + ".tmp",latest)
+  
+  return bundle_path
+
+
+def get_bundle_path(path):
+  """
+  Resolve path to bundle: either a bundle or a directory of bundles, whose latest one is used.
+  
+  Args:
+    path (str) : system path
+  Return:
+    bundle_path (str) : system path to bundle
+  """
+  
+  if os.path.exists(os.path.join(path,"bundle.json")):
+    return path
+  
+  latest = os.path.join(path,"LATEST")
+  
+  if not os.path.exists(latest):
+    raise ValueError("No bundle found at : `{}`".format(path))
+  
+  with open(latest) as infile:
+    bundle_path = os.path.join(path,infile.read().strip())
+  
+  return bundle_path
+
+
+def load_bundle(path,cache = None,preload = False,genia = None,tagger_workers = None):
+  """
+  Load Simplifier from bundle built with `build_bundle`.
+  
+  Vocabulary arrays and words, frequency stores and MeSH terms are memory mapped, hence they are read from disk only when used and
+  processes loading the same bundle share them, as the arrays of MeSH tree. The tagger (spacy model or GeniaTagger pool, as when the bundle
+  was built) and MeSH database are loaded on first use (see `resources.LazyResource`), or in parallel threads with `preload`.
+  
+  Args:
+    path (str) : system path to bundle, or to directory of bundles (its latest one is loaded)
+    cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
+    preload (bool) : load all resources now
+    genia (str or None) : system path to GeniaTagger executable, needed by bundles tagged with GeniaTagger
+    tagger_workers (int or None) : number of GeniaTagger processes. If None one per core
+  Return:
+    simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+  """
+  
+  from mesh_db import MeSHierarchy,MeSHTree
+  from components.vocabulary import Vocabulary
+  from components.complex_word_identifier import DummyComplexWordIdentifier
+  from components.generators import Word2VecGenerator
+  from components.selectors import SimpleScienceSelector,MeSHSelector
+  from components.rankers import SimpleScienceRanker,MeSHTreeRanker
+  from simplifiers.simplescience import SimpleScience
+  from simplifiers.hierarchical_simple import HierarchicalSimple
+  
+  start = time.perf_counter()
+  
+  path = get_bundle_path(path)
+  
+  with open(os.path.join(path,"bundle.json")) as infile:
+    manifest = json.load(infile)
+  
+  if manifest["format"] != BUNDLE_FORMAT:
+    raise ValueError("Bundle at `{}` has format {}, expected {}".format(path,manifest["format"],BUNDLE_FORMAT))
+  
+  params = manifest["params"]
+  tagger = params.get("tagger","spacy")
+  
+  if tagger == 'genia' and genia is None:
+    raise ValueError("Bundle at `{}` is tagged with GeniaTagger : path to its executable is needed (--genia)".format(path))
+  
+  resources = ResourceLoader()
+  parser = resources.add("parser",lambda : load_tagger(tagger,params["spacy"],genia,tagger_workers))
+  
+  vocab = Vocabulary.load(os.path.join(path,"vocab"), mmap = True)
+  
+  cwi = DummyComplexWordIdentifier(threshold = params["cwi_threshold"],
+                                   complex_freq = FrequencyStore(os.path.join(path,"complex_freq")),
+                                   simple_freq = FrequencyStore(os.path.join(path,"simple_freq")))
+  
+  generator = Word2VecGenerator(topn = params["topn"])
+  ranker = SimpleScienceRanker()
+  
+  if params["simplifier"] == 'hiersimple' and os.path.exists(os.path.join(path,"mesh_tree")):
+    mesh_tree = MeSHTree.load(os.path.join(path,"mesh_tree"), mmap = True)
+    selector = MeSHSelector(char_ngram = params["char_ngram"], mesh_db = mesh_tree)
+    if params.get("ranker") == 'meshtree':
+      ranker = MeSHTreeRanker(tree = mesh_tree, weight = params["mesh_weight"])
+    simplifier = HierarchicalSimple(parser,cwi,generator,selector,ranker,None,vocab = vocab,cache = cache)
+  elif params["simplifier"] == 'hiersimple':
+    mesh_path = os.path.join(path,"mesh")
+    selector = MeSHSelector(char_ngram = params["char_ngram"],
+                            mesh_db = resources.add("mesh_db",lambda : MeSHierarchy.load(mesh_path)),
+                            mesh_words = resources.add("mesh_words",lambda : MeSHierarchy.load_terms(mesh_path)))
+    simplifier = HierarchicalSimple(parser,cwi,generator,selector,ranker,None,vocab = vocab,cache = cache)
+  else:
+    selector = SimpleScienceSelector(char_ngram = params["char_ngram"], cosine_threshold = params["cos_thr"], frequency_threshold = params["freq_thr"])
+    simplifier = SimpleScience(parser,cwi,generator,selector,ranker,None,vocab = vocab,cache = cache)
+  
+  simplifier.sources = {"spacy" : params["spacy"], "bundle" : path}
+  if tagger == 'genia':
+    simplifier.sources["genia"] = genia
+  simplifier.set_resources(resources)
+  
+  logger.info("Opened bundle `{}` in {:.3f}s from : `{}`".format(manifest["version"],time.perf_counter() - start,path))
+  
+  if preload:
+    simplifier.load_resources()
+  
+  return simplifier
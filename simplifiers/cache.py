@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:14:37 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def get_fingerprint(paths):
+  """
+  Compute fingerprint of files, from their path, size and modification time.
+  Directories are fingerprinted with all the files they contain.
+  
+  Args:
+    paths (list) : system paths
+  Return:
+    fingerprint (str) : hexadecimal digest
+  """
+  
+  files = []
+  
+  for path in paths:
+    if os.path.isdir(path):
+      files.extend(sorted(os.path.join(root,f) for root,_,names in os.walk(path) for f in names))
+    else:
+      files.append(path)
+  
+  digest = hashlib.sha1()
+  
+  for path in files:
+    stat = os.stat(path)
+    digest.update("{}:{}:{}\n".format(os.path.abspath(path),stat.st_size,stat.st_mtime_ns).encode("utf-8"))
+  
+  fingerprint = digest.hexdigest()
+  
+  return fingerprint
+
+
+class SimplificationCache(object):
+  """
+  Two level cache of the results of context free simplifications, i.e. word -> ranked simplification candidates.
+  
+  The first level is a bounded in-process cache, discarding least recently used words when full.
+  The second (optional) is a SQLite database on disk, persisting across runs, which can be shared by simplifiers
+  with different configurations. Entries are stored under the simplifier configuration and the fingerprint of its model files
+  (the `sources` in configuration and `model_paths`): when opened, entries of the same configuration with another fingerprint
+  are deleted, hence results are invalidated as soon as a model file changes.
+  
+  The database is shared by processes (e.g. the workers of `simplify_corpus`): it is opened in WAL mode,
+  so that readers do not block the writer, and each result is committed as soon as it is written,
+  so that no process holds the write lock. Writers wait for the lock up to `timeout` seconds. 
+  Failures of the database are logged and never interrupt simplification: results are still cached in memory.
+  """
+  
+  def __init__(self,size = 100000,path = None,model_paths = None,timeout = 30.0):
+    """
+    Initialize SimplificationCache.
+    
+    Args:
+      size (int) : maximum number of words cached in memory
+      path (str or None) : system path to SQLite database. If None results are cached only in memory
+      model_paths (list or None) : system paths of files (or directories) of models used by the simplifier, besides its `sources`
+      timeout (float) : seconds waited for the database lock held by another process before failing
+    """
+    
+    self.size = size
+    self.path = path
+    self.timeout = timeout
+    self.model_paths = list(model_paths or [])
+    
+    self.cache = OrderedDict()
+    self.lock = threading.Lock()
+    self.namespace = None
+    self.fingerprint = None
+    self.db = None
+    
+    self.hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidated = 0
+    self.errors = 0
+  
+  def connect(self):
+    """
+    Open database in autocommit and WAL mode, creating table of results if needed.
+    
+    Return:
+      db (sqlite3.Connection) : connection to database
+    """
+    
+    db = sqlite3.connect(self.path, timeout = self.timeout, isolation_level = None, check_same_thread = False)
+    db.execute("PRAGMA busy_timeout = {}".format(int(self.timeout * 1000)))
+    db.execute("PRAGMA journal_mode = WAL")
+    
+    columns = [row[1] for row in db.execute("PRAGMA table_info(simplifications)")]
+    if columns and "fingerprint" not in columns:
+      # written by a previous version
+      db.execute("DROP TABLE simplifications")
+    db.execute("CREATE TABLE IF NOT EXISTS simplifications (namespace TEXT, fingerprint TEXT, word TEXT, candidates TEXT, PRIMARY KEY (namespace,word))")
+    
+    return db
+  
+  def on_error(self,action,error):
+    """
+    Log failure of database.
+    
+    Args:
+      action (str) : what was being done
+      error (sqlite3.Error) : error
+    """
+    
+    self.errors += 1
+    logger.warning("Simplification cache at `{}` failed {} : {}".format(self.path,action,error))
+  
+  def open(self,config):
+    """
+    Bind cache to simplifier configuration and open database on disk.
+    Entries of database stored with the same configuration but other model files are deleted,
+    the ones of other configurations are kept.
+    
+    Args:
+      config (dict) : simplifier configuration
+    """
+    
+    sources = [p for p in config.get("sources",{}).values() if os.path.exists(p)]
+    fingerprint = get_fingerprint(sorted(set(sources + self.model_paths)))
+    
+    namespace = hashlib.sha1(json.dumps(config, sort_keys = True).encode("utf-8")).hexdigest()
+    
+    if namespace == self.namespace and fingerprint == self.fingerprint:
+      return
+    
+    with self.lock:
+      
+      self.namespace = namespace
+      self.fingerprint = fingerprint
+      self.cache.clear()
+      
+      if self.path is not None:
+        
+        try:
+          if self.db is None:
+            self.db = self.connect()
+          cursor = self.db.execute("DELETE FROM simplifications WHERE namespace = ? AND fingerprint != ?", (namespace,fingerprint))
+        except sqlite3.Error as e:
+          # stale entries may be left : results are cached only in memory
+          self.on_error("opening",e)
+          if self.db is not None:
+            self.db.close()
+          self.db = None
+          return
+        
+        self.invalidated += cursor.rowcount
+        
+        logger.info("Opened simplification cache at : `{}` ({} stale entries deleted)".format(self.path,cursor.rowcount))
+  
+  def after_fork(self):
+    """
+    Drop connection to database inherited from parent process: a new one is opened on first use.
+    """
+    
+    self.lock = threading.Lock()
+    self.db = None
+    self.namespace = None
+  
+  def get(self,word):
+    """
+    Get cached simplification candidates of word, looking first in memory and then on disk.
+    
+    Args:
+      word (str) : word
+    Return:
+      candidates (list or None) : ranked simplification candidates. None if not cached
+    """
+    
+    with self.lock:
+      
+      candidates = self.cache.get(word)
+      
+      if candidates is not None:
+        self.cache.move_to_end(word)
+        self.hits += 1
+        return list(candidates)
+      
+      if self.db is not None:
+        try:
+          row = self.db.execute("SELECT candidates FROM simplifications WHERE namespace = ? AND word = ?",
+                                (self.namespace,word)).fetchone()
+        except sqlite3.Error as e:
+          self.on_error("reading",e)
+          row = None
+        if row is not None:
+          candidates = json.loads(row[0])
+          self._put_memory(word,candidates)
+          self.disk_hits += 1
+          return list(candidates)
+      
+      self.misses += 1
+    
+    return None
+  
+  def _put_memory(self,word,candidates):
+    """
+    Cache simplification candidates in memory, discarding the least recently used word if cache is full.
+    
+    Args:
+      word (str) : word
+      candidates (list) : ranked simplification candidates
+    """
+    
+    self.cache[word] = tuple(candidates)
+    
+    if len(self.cache) > self.size:
+      self.cache.popitem(last = False)
+      self.evictions += 1
+  
+  def put(self,word,candidates):
+    """
+    Cache simplification candidates of word in memory and on disk, where they are committed at once.
+    
+    Args:
+      word (str) : word
+      candidates (list) : ranked simplification candidates
+    """
+    
+    with self.lock:
+      
+      self._put_memory(word,candidates)
+      
+      if self.db is not None:
+        try:
+          self.db.execute("INSERT OR REPLACE INTO simplifications VALUES (?,?,?,?)",
+                          (self.namespace,self.fingerprint,word,json.dumps(list(candidates))))
+        except sqlite3.Error as e:
+          self.on_error("writing",e)
+  
+  def get_hit_rate(self):
+    """
+    Fraction of lookups answered by the cache, either in memory or on disk.
+    
+    Return:
+      rate (float) : cache hit rate
+    """
+    
+    total = self.hits + self.disk_hits + self.misses
+    rate = (self.hits + self.disk_hits) / total if total else 0.0
+    
+    return rate
+  
+  def report(self):
+    """
+    Log cache usage.
+    """
+    
+    logger.info("Simplification cache : size - {} , hits - {} , disk hits - {} , misses - {} , evictions - {} , invalidated - {} , errors - {} , hit rate - {:.3f}".format(
+                len(self.cache),self.hits,self.disk_hits,self.misses,self.evictions,self.invalidated,self.errors,self.get_hit_rate()))
+  
+  def close(self):
+    """
+    Close database.
+    """
+    
+    with self.lock:
+      if self.db is not None:
+        self.db.close()
+        self.db = None
+        self.namespace = None
+
+
+def cached_simplification(simplify_word):
+  """
+  Decorator of `simplify_word` methods of Simplifiers. If the simplifier has a cache,
+  results of context free calls are read from it and stored in it.
+  Calls with context or returning beams always run the pipeline.
+  
+  Args:
+    simplify_word (function) : `simplify_word` method
+  Return:
+    wrapper (function) : memoized method
+  """
+  
+  @functools.wraps(simplify_word)
+  def wrapper(self,word,context = None,**kwargs):
+    
+    cache = getattr(self,"cache",None)
+    
+    if cache is None or context is not None or kwargs.get("return_beams"):
+      return simplify_word(self,word,context = context,**kwargs)
+    
+    if cache.namespace is None:
+      cache.open(self.get_config())
+    
+    key = json.dumps([str(word),kwargs], sort_keys = True) if kwargs else str(word)
+    
+    candidates = cache.get(key)
+    
+    if candidates is None:
+      candidates = simplify_word(self,word,context = context,**kwargs)
+      cache.put(key,candidates)
+    
+    return candidates
+  
+  return wrapper
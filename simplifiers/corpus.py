@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:37:52 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+from collections import deque
+import simplifiers.abstract_simplifier as abstract_simplifier
+
+logger = logging.getLogger(__name__)
+
+
+def get_format(path):
+  """
+  Guess corpus format from file extension: `jsonl` for `.jsonl` and `.jsonl.gz` files, `text` otherwise.
+  
+  Args:
+    path (str) : system path
+  Return:
+    fmt (str) : `text` or `jsonl`
+  """
+  
+  name = path[:-3] if path.endswith(".gz") else path
+  
+  fmt = "jsonl" if name.endswith((".jsonl",".json")) else "text"
+  
+  return fmt
+
+
+def read_corpus(path,fmt = "text",field = "text",skip = 0):
+  """
+  Read corpus line by line. Gzip compressed files (`.gz`) are decompressed on the fly.
+  
+  In `text` format each line is a text, whose tokens are separated by whitespaces.
+  In `jsonl` format each line is a JSON object, whose `field` is the text (string or list of tokens).
+  
+  Args:
+    path (str) : system path
+    fmt (str) : `text` or `jsonl`
+    field (str) : field of JSON objects containing the text
+    skip (int) : number of lines to skip (e.g. already simplified)
+  Return:
+    lines (generator) : tuples (record,tokens), where record is the parsed line
+  """
+  
+  opener = gzip.open if path.endswith(".gz") else open
+  
+  with opener(path, "rt", encoding = "utf-8") as infile:
+    
+    for idx,line in enumerate(infile):
+      
+      if idx < skip:
+        continue
+      
+      line = line.rstrip("\n")
+      
+      if fmt == "jsonl":
+        record = json.loads(line) if line.strip() else {}
+        text = record.get(field,"")
+      else:
+        record = text = line
+      
+      tokens = text.split() if isinstance(text,str) else list(text)
+      
+      yield record,tokens
+
+
+def format_result(record,tokens,fmt = "text",field = "text"):
+  """
+  Format simplified text as output line. In `jsonl` format the simplified text is added
+  to the input object in field `simplified_<field>`.
+  
+  Args:
+    record (str or dict) : parsed input line
+    tokens (list) : simplified tokens
+    fmt (str) : `text` or `jsonl`
+    field (str) : field of JSON objects containing the text
+  Return:
+    line (bytes) : output line
+  """
+  
+  if fmt == "jsonl":
+    record = dict(record)
+    record["simplified_{}".format(field)] = " ".join(tokens) if isinstance(record.get(field),str) else tokens
+    line = json.dumps(record, ensure_ascii = False)
+  else:
+    line = " ".join(tokens)
+  
+  line = (line + "\n").encode("utf-8")
+  
+  return line
+
+
+def load_checkpoint(path):
+  """
+  Load checkpoint of interrupted run.
+  
+  Args:
+    path (str) : system path
+  Return:
+    checkpoint (dict or None) : `lines` simplified and `offset` (bytes) of output after them. None if there is no checkpoint
+  """
+  
+  if not os.path.exists(path):
+    return None
+  
+  with open(path) as infile:
+    checkpoint = json.load(infile)
+  
+  return checkpoint
+
+
+def save_checkpoint(path,lines,offset):
+  """
+  Save checkpoint atomically: a run interrupted while saving keeps the previous one.
+  
+  Args:
+    path (str) : system path
+    lines (int) : number of input lines simplified
+    offset (int) : size (bytes) of output containing their results
+  """
+  
+  tmp = path + ".tmp"
+  
+  with open(tmp, "w") as outfile:
+    json.dump({"lines" : lines, "offset" : offset}, outfile)
+  
+  os.replace(tmp,path)
+
+
+def simplify_batch(simplifier,texts):
+  """
+  Simplify batch of texts in this process.
+  
+  Args:
+    simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+    texts (list) : texts, each a list of tokens
+  Return:
+    simplified (list) : simplified texts
+  """
+  
+  return [simplifier.simplify_text(text) if text else text for text in texts]
+
+
+def _simplify_batch(texts):
+  """
+  Simplify batch of texts in worker process of `simplify_file`.
+  
+  Args:
+    texts (list) : texts, each a list of tokens
+  Return:
+    simplified (list) : simplified texts
+  """
+  
+  return simplify_batch(abstract_simplifier._WORKER_SIMPLIFIER,texts)
+
+
+def iter_batches(lines,batch_size):
+  """
+  Group lines of corpus in batches.
+  
+  Args:
+    lines (iterable) : lines
+    batch_size (int) : number of lines in batch
+  Return:
+    batches (generator) : lists of lines
+  """
+  
+  batch = []
+  
+  for line in lines:
+    batch.append(line)
+    if len(batch) >= batch_size:
+      yield batch
+      batch = []
+  
+  if batch:
+    yield batch
+
+
+def simplify_file(simplifier,input_path,output_path,fmt = None,field = "text",workers = 1,
+                  batch_size = 256,max_in_flight = None,resume = False):
+  """
+  Simplify corpus streaming it line by line: results are written in input order as soon as their batch is done.
+  
+  Memory is bounded by the batches in flight: at most `max_in_flight` batches of `batch_size` lines
+  are read and not yet written, whatever the size of corpus. With `workers` > 1 batches are simplified
+  by a pool of forked processes (see `AbstractSimplifier.simplify_corpus`).
+  
+  A checkpoint (`<output_path>.checkpoint`) is saved before output is created and then after each batch is written,
+  with the number of lines done and the size of output. With `resume` an interrupted run restarts from its last checkpoint,
+  discarding any output written after it. If output is missing or shorter than at the checkpoint 
+  (e.g. it was moved or not flushed to disk) the run restarts from the beginning. 
+  The checkpoint is removed when corpus is completed.
+  
+  Args:
+    simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+    input_path (str) : path to corpus (plain text or JSONL, optionally gzip compressed)
+    output_path (str) : path to output (plain text or JSONL, not compressed)
+    fmt (str or None) : `text` or `jsonl`. If None guessed from extension of `input_path`
+    field (str) : field of JSON objects containing the text
+    workers (int) : number of processes. If 1 texts are simplified in this process
+    batch_size (int) : number of lines in a batch
+    max_in_flight (int or None) : maximum number of batches being simplified at once. 
+    If None `workers` + 1, so that all workers are busy while the oldest batch is written
+    resume (bool) : resume interrupted run from its checkpoint
+  Return:
+    lines (int) : number of lines simplified in this run
+  """
+  
+  fmt = fmt if fmt is not None else get_format(input_path)
+  checkpoint_path = output_path + ".checkpoint"
+  
+  checkpoint = load_checkpoint(checkpoint_path) if resume else None
+  
+  if checkpoint is None and os.path.exists(output_path):
+    raise ValueError("File {} already exists! Not overwriting (use resume to continue an interrupted run)".format(output_path))
+  
+  if checkpoint is not None and checkpoint["lines"]:
+    size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+    if size is None or size < checkpoint["offset"]:
+      logger.warning("Output {} is {} : restarting from the beginning".format(output_path,
+                     "missing" if size is None else "shorter than at checkpoint ({} < {} bytes)".format(size,checkpoint["offset"])))
+      checkpoint = {"lines" : 0, "offset" : 0}
+  
+  done = checkpoint["lines"] if checkpoint is not None else 0
+  offset = checkpoint["offset"] if checkpoint is not None else 0
+  
+  max_in_flight = max_in_flight if max_in_flight is not None else workers + 1
+  
+  if max_in_flight < workers:
+    logger.warning("Only {} batches in flight for {} workers : some workers will be idle".format(max_in_flight,workers))
+  
+  if done:
+    logger.info("Resuming from checkpoint : {} lines already simplified".format(done))
+  
+  batches = iter_batches(read_corpus(input_path, fmt = fmt, field = field, skip = done), batch_size)
+  
+  pool = None
+  
+  if workers > 1:
+    pool = abstract_simplifier.fork_pool(simplifier,workers)
+  
+  start = time.perf_counter()
+  lines = 0
+  in_flight = deque()
+  
+  if not done:
+    # a run interrupted before its first batch can be resumed as well
+    save_checkpoint(checkpoint_path,0,0)
+  
+  try:
+    
+    with open(output_path, "r+b" if done else "wb") as outfile:
+      
+      outfile.truncate(offset)
+      outfile.seek(offset)
+      
+      for batch in batches:
+        
+        records = [record for record,_ in batch]
+        texts = [tokens for _,tokens in batch]
+        
+        if pool is not None:
+          in_flight.append((records,pool.apply_async(_simplify_batch, (texts,))))
+        else:
+          in_flight.append((records,simplify_batch(simplifier,texts)))
+        
+        while len(in_flight) >= max_in_flight:
+          lines += write_batch(outfile,in_flight.popleft(),fmt,field)
+          save_checkpoint(checkpoint_path,done + lines,outfile.tell())
+      
+      while in_flight:
+        lines += write_batch(outfile,in_flight.popleft(),fmt,field)
+        save_checkpoint(checkpoint_path,done + lines,outfile.tell())
+  
+  finally:
+    if pool is not None:
+      pool.terminate()
+  
+  if os.path.exists(checkpoint_path):
+    os.remove(checkpoint_path)
+  
+  elapsed = time.perf_counter() - start
+  
+  logger.info("Simplified {} lines with {} workers in {:.2f}s ({:.1f} lines/s)".format(lines,workers,elapsed,
+              lines / max(elapsed,1e-9)))
+  
+  return lines
+
+
+def write_batch(outfile,batch,fmt,field):
+  """
+  Write results of batch to output and make them durable, so that a checkpoint can refer to them.
+  
+  Args:
+    outfile (file) : output opened in binary mode
+    batch (tuple) : input records and their simplified texts (list or `multiprocessing.pool.AsyncResult`)
+    fmt (str) : `text` or `jsonl`
+    field (str) : field of JSON objects containing the text
+  Return:
+    lines (int) : number of lines written
+  """
+  
+  records,simplified = batch
+  
+  if hasattr(simplified,"get"):
+    simplified = simplified.get()
+  
+  outfile.write(b"".join(format_result(record,tokens,fmt,field) for record,tokens in zip(records,simplified)))
+  outfile.flush()
+  os.fsync(outfile.fileno())
+  
+  lines = len(records)
+  
+  return lines
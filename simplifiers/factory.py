@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:12:40 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import logging
+from freq_store import load_frequencies
+from resources import ResourceLoader
+
+logger = logging.getLogger(__name__)
+
+SIMPLIFIERS = ('simplescience','hiersimple','hierpbs','poinsimple','poinpbs')
+
+TAGGERS = ('spacy','genia')
+
+# rankers of each simplifier, the first one is the default
+RANKERS = {'simplescience' : ('simplescience',),
+           'hiersimple' : ('simplescience','meshtree'),
+           'hierpbs' : ('pbs','cascade'),
+           'poinsimple' : ('simplescience',),
+           'poinpbs' : ('pbs','cascade')}
+
+
+# arguments needed to build a Simplifier if it is not loaded from a bundle
+REQUIRED = ('simplifier','complex_freq','simple_freq','cwi_threshold')
+
+# simplifiers that can run on vocabulary indices (see `components.vocabulary.Vocabulary`)
+VOCAB_SIMPLIFIERS = ('simplescience','hiersimple')
+
+
+def add_simplifier_arguments(parser,bundle = True):
+  """
+  Add to command line parser the arguments needed to build a Simplifier.
+  
+  Args:
+    parser (argparse.ArgumentParser) : command line parser
+    bundle (bool) : add option for loading Simplifier from bundle (see `simplifiers.bundle`)
+  """
+  
+  if bundle:
+    parser.add_argument('--bundle',default = None, type = str, help = "Path to simplifier bundle (see build-bundle). If given arguments describing the simplifier are not needed")
+  parser.add_argument('--simplifier',default = None,choices = SIMPLIFIERS, type = str, help = "Simplification pipeline")
+  parser.add_argument('--model',default = None, type = str, help = "Path to embedding model (Word2Vec, FastText or Poincare), pickled or saved with gensim. Arrays saved apart by gensim are memory mapped")
+  parser.add_argument('--vocab',default = None, type = str, help = "Path to vocabulary of embedding model saved with `Vocabulary.save` (e.g. `vocab` of a bundle), memory mapped. If given --model is not needed (simplescience and hiersimple)")
+  parser.add_argument('--complex-freq',default = None, type = str, help = "Path to complex word frequencies (pickle or frequency store)")
+  parser.add_argument('--simple-freq',default = None, type = str, help = "Path to simple word frequencies (pickle or frequency store)")
+  parser.add_argument('--cwi-threshold',default = None, type = float, help = "Complexity score below which a word is complex")
+  parser.add_argument('--mesh-db',default = None, type = str, help = "Path to parsed MeSH database. Needed by hierarchical simplifiers if --mesh-tree is not given")
+  parser.add_argument('--mesh-tree',default = None, type = str, help = "Path to MeSH tree file (`term;id` lines), or to directory where it was saved with `MeSHTree.save` (memory mapped). Used instead of --mesh-db")
+  parser.add_argument('--lm',default = None, type = str, help = "Path to KenLM (or ARPA) language model. Needed by PBS simplifiers")
+  parser.add_argument('--spacy',default = 'en_core_web_sm', type = str, help = "Spacy model")
+  parser.add_argument('--tagger',default = 'spacy',choices = TAGGERS, type = str, help = "Part of Speech tagger: spacy model or pool of GeniaTagger processes (biomedical)")
+  parser.add_argument('--genia',default = None, type = str, help = "Path to GeniaTagger executable. Needed with --tagger genia")
+  parser.add_argument('--tagger-workers',default = None, type = int, help = "Number of GeniaTagger processes. If not given one per core")
+  parser.add_argument('--topn',default = 100, type = int, help = "Number of candidates generated for each complex word")
+  parser.add_argument('--cos-thr',default = 0.4, type = float, help = "Minimum cosine similarity of candidates (SimpleScience selector)")
+  parser.add_argument('--freq-thr',default = 3000, type = int, help = "Minimum frequency of candidates in complex vocabulary (SimpleScience selector)")
+  parser.add_argument('--char-ngram',default = 4, type = int, help = "Size of character ngrams for filtering candidates by lemma")
+  parser.add_argument('--ranker',default = None,choices = ('simplescience','meshtree','pbs','cascade'), type = str, help = "Ranker: SimpleScience, MeSH tree distance (hiersimple, needs --mesh-tree), Partial Beam Search or cascade of cheap prefilter and Partial Beam Search (PBS simplifiers). If not given the one of the simplifier")
+  parser.add_argument('--beam-width',default = 5, type = int, help = "Beam width of PBS ranker")
+  parser.add_argument('--cascade-k',default = 10, type = int, help = "Number of candidates ranked with language model by cascade ranker")
+  parser.add_argument('--prefilter',default = 'similarity',choices = ('similarity','frequency','unigram'), type = str, help = "Cheap score of cascade ranker")
+  parser.add_argument('--audit-every',default = 0, type = int, help = "Compare cascade ranker with exact ranking every this many calls. If 0 never")
+  parser.add_argument('--mesh-weight',default = 0.0, type = float, help = "Weight of cosine similarity blended with MeSH tree proximity by MeSH tree ranker")
+  parser.add_argument('--cache',default = None, type = str, help = "Path to SQLite database caching context free simplifications")
+  parser.add_argument('--preload',action = 'store_true', help = "Load all resources at startup in parallel threads, instead of on first use")
+  parser.add_argument('--load-threads',default = None, type = int, help = "Number of threads loading resources with --preload. If not given one per resource")
+
+
+def load_language_model(path):
+  """
+  Load language model with KenLM, or with `arpa_lm.ArpaModel` if KenLM is not installed.
+  
+  Args:
+    path (str) : system path to language model
+  Return:
+    lm (kenlm.Model or arpa_lm.ArpaModel) : language model
+  """
+  
+  try:
+    import kenlm
+    lm = kenlm.Model(path)
+  except ImportError:
+    from arpa_lm import ArpaModel
+    lm = ArpaModel(path)
+  
+  logger.info("Loaded language model from : `{}`".format(path))
+  
+  return lm
+
+
+def load_embedding_model(path):
+  """
+  Load embedding model with gensim, memory mapping (read only) the arrays it saved in separate files.
+  Models pickled as a whole are read in memory.
+  
+  Args:
+    path (str) : system path to embedding model
+  Return:
+    model (gensim.models.*) : embedding model
+  """
+  
+  from gensim.utils import SaveLoad
+  
+  model = SaveLoad.load(path, mmap = 'r')
+  
+  logger.info("Loaded embedding model from : `{}`".format(path))
+  
+  return model
+
+
+def load_mesh_tree(path):
+  """
+  Load MeSH tree, memory mapped if it was saved with `MeSHTree.save`.
+  
+  Args:
+    path (str) : system path to MeSH tree file or directory
+  Return:
+    tree (mesh_db.MeSHTree) : MeSH tree
+  """
+  
+  from mesh_db import MeSHTree
+  
+  tree = MeSHTree.load(path, mmap = True) if os.path.isdir(path) else MeSHTree(path)
+  
+  return tree
+
+
+def load_tagger(tagger,spacy_model,genia = None,processes = None):
+  """
+  Load Part of Speech tagger: spacy model or pool of GeniaTagger processes.
+  
+  Args:
+    tagger (str) : `spacy` or `genia`
+    spacy_model (str) : spacy model
+    genia (str or None) : system path to GeniaTagger executable
+    processes (int or None) : number of GeniaTagger processes. If None one per core
+  Return:
+    parser (spacy.lang.* or components.taggers.GeniaTaggerPool) : spacy language instance or pool of GeniaTagger
+  """
+  
+  if tagger == 'genia':
+    from components.taggers import GeniaTaggerPool
+    return GeniaTaggerPool(genia, processes = processes)
+  
+  import spacy
+  
+  return spacy.load(spacy_model)
+
+
+def check_arguments(args):
+  """
+  Check that command line arguments describe a Simplifier.
+  
+  Args:
+    args (argparse.Namespace) : parsed command line arguments
+  """
+  
+  missing = ["--{}".format(name.replace("_","-")) for name in REQUIRED if getattr(args,name) is None]
+  
+  if missing:
+    raise ValueError("Missing arguments describing simplifier : {}".format(", ".join(missing)))
+  
+  if args.model is None and (args.vocab is None or args.simplifier not in VOCAB_SIMPLIFIERS):
+    raise ValueError("Simplifier `{}` needs embedding model (--model{})".format(args.simplifier,
+                     " or --vocab" if args.simplifier in VOCAB_SIMPLIFIERS else ""))
+  
+  if args.simplifier in ('hiersimple','hierpbs') and args.mesh_db is None and args.mesh_tree is None:
+    raise ValueError("Simplifier `{}` needs MeSH database (--mesh-db or --mesh-tree)".format(args.simplifier))
+  
+  if args.simplifier in ('hierpbs','poinpbs') and args.lm is None:
+    raise ValueError("Simplifier `{}` needs language model (--lm)".format(args.simplifier))
+  
+  if args.ranker is not None and args.ranker not in RANKERS[args.simplifier]:
+    raise ValueError("Simplifier `{}` cannot use ranker `{}`. Choose one of : {}".format(args.simplifier,args.ranker,RANKERS[args.simplifier]))
+  
+  if args.ranker == 'meshtree' and args.mesh_tree is None:
+    raise ValueError("Ranker `meshtree` needs MeSH tree (--mesh-tree)")
+  
+  if args.tagger == 'genia' and args.genia is None:
+    raise ValueError("GeniaTagger needs path to its executable (--genia)")
+
+
+def get_resources(args):
+  """
+  Register resources needed by Simplifier described by command line arguments (see `add_simplifier_arguments`).
+  
+  Args:
+    args (argparse.Namespace) : parsed command line arguments
+  Return:
+    resources (resources.ResourceLoader) : resources, not loaded yet
+  """
+  
+  def load_mesh_db():
+    from mesh_db import MeSHierarchy
+    return MeSHierarchy(args.mesh_db)
+  
+  def load_vocab():
+    from components.vocabulary import Vocabulary
+    return Vocabulary.load(args.vocab, mmap = True)
+  
+  name = args.simplifier
+  
+  resources = ResourceLoader()
+  
+  resources.add("parser",lambda : load_tagger(args.tagger,args.spacy,args.genia,args.tagger_workers))
+  if args.model is not None:
+    resources.add("model",lambda : load_embedding_model(args.model))
+  if args.vocab is not None and name in VOCAB_SIMPLIFIERS:
+    resources.add("vocab",load_vocab)
+  resources.add("complex_freq",lambda : load_frequencies(args.complex_freq))
+  resources.add("simple_freq",lambda : load_frequencies(args.simple_freq))
+  
+  if name in ('hiersimple','hierpbs'):
+    if args.mesh_tree is not None:
+      resources.add("mesh_tree",lambda : load_mesh_tree(args.mesh_tree))
+    if args.mesh_db is not None:
+      resources.add("mesh_db",load_mesh_db)
+  
+  if name in ('hierpbs','poinpbs'):
+    resources.add("lm",lambda : load_language_model(args.lm))
+  
+  return resources
+
+
+def build_simplifier(args):
+  """
+  Build Simplifier from command line arguments (see `add_simplifier_arguments`).
+  
+  Resources (spacy model or GeniaTagger pool, embedding model or vocabulary, frequencies, MeSH database or tree and language model) are loaded 
+  on first use, or all at startup in parallel threads with `--preload`. 
+  Time spent loading each of them is logged. Large arrays (embedding model saved with gensim, vocabulary, MeSH tree) are memory mapped.
+  
+  With `--bundle` the Simplifier is loaded from a bundle built with `simplifiers.bundle.build_bundle`.
+  
+  Args:
+    args (argparse.Namespace) : parsed command line arguments
+  Return:
+    simplifier (simplifiers.abstract_simplifier.AbstractSimplifier) : simplifier
+  """
+  
+  from components.complex_word_identifier import DummyComplexWordIdentifier
+  from components.generators import Word2VecGenerator,PoincareGenerator
+  from components.selectors import SimpleScienceSelector,MeSHSelector
+  from components.rankers import SimpleScienceRanker,MeSHTreeRanker,PartialBeamSearchRanker,CascadeRanker,LMScoreCache
+  from simplifiers.cache import SimplificationCache
+  from simplifiers.simplescience import SimpleScience
+  from simplifiers.hierarchical_simple import HierarchicalSimple
+  from simplifiers.hierarchical_pbs import HierarchicalPBS
+  from simplifiers.poincare_simple import PoincareSimple
+  from simplifiers.poincare_pbs import PoincarePBS
+  
+  if getattr(args,"bundle",None) is not None:
+    from simplifiers.bundle import load_bundle
+    cache = SimplificationCache(path = args.cache) if args.cache is not None else None
+    return load_bundle(args.bundle, cache = cache, preload = getattr(args,"preload",False),
+                       genia = args.genia, tagger_workers = args.tagger_workers)
+  
+  check_arguments(args)
+  
+  name = args.simplifier
+  
+  resources = get_resources(args)
+  
+  res = resources.resources
+  parser = res["parser"]
+  model = res.get("model")
+  vocab = res.get("vocab")
+  mesh = res["mesh_tree"] if "mesh_tree" in res else res.get("mesh_db")
+  
+  cwi = DummyComplexWordIdentifier(threshold = args.cwi_threshold,
+                                   complex_freq = res["complex_freq"],
+                                   simple_freq = res["simple_freq"])
+  
+  cache = SimplificationCache(path = args.cache) if args.cache is not None else None
+  
+  if name.startswith('poin'):
+    generator = PoincareGenerator(topn = args.topn)
+  else:
+    generator = Word2VecGenerator(topn = args.topn)
+  
+  ranker_name = args.ranker if args.ranker is not None else RANKERS[name][0]
+  
+  if ranker_name == 'cascade':
+    ranker = CascadeRanker(lm = res["lm"], beam_width = args.beam_width, k = args.cascade_k, prefilter = args.prefilter,
+                           cwi = cwi, cache = LMScoreCache(), audit_every = args.audit_every)
+  elif ranker_name == 'pbs':
+    ranker = PartialBeamSearchRanker(lm = res["lm"], beam_width = args.beam_width, cache = LMScoreCache())
+  elif ranker_name == 'meshtree':
+    ranker = MeSHTreeRanker(tree = res["mesh_tree"], weight = args.mesh_weight)
+  else:
+    ranker = SimpleScienceRanker()
+  
+  if name == 'simplescience':
+    selector = SimpleScienceSelector(char_ngram = args.char_ngram, cosine_threshold = args.cos_thr, frequency_threshold = args.freq_thr)
+    simplifier = SimpleScience(parser,cwi,generator,selector,ranker,model,vocab = vocab,cache = cache)
+  elif name == 'hiersimple':
+    selector = MeSHSelector(char_ngram = args.char_ngram, mesh_db = mesh)
+    simplifier = HierarchicalSimple(parser,cwi,generator,selector,ranker,model,vocab = vocab,cache = cache)
+  elif name == 'hierpbs':
+    selector = MeSHSelector(char_ngram = args.char_ngram, mesh_db = mesh)
+    simplifier = HierarchicalPBS(parser,cwi,generator,selector,ranker,model,cache = cache)
+  elif name == 'poinsimple':
+    simplifier = PoincareSimple(parser,cwi,generator,ranker,model,cache = cache)
+  else:
+    simplifier = PoincarePBS(parser,cwi,generator,ranker,model,cache = cache)
+  
+  simplifier.sources = {k : getattr(args,k) for k in ["spacy","model","vocab","complex_freq","simple_freq","mesh_db","mesh_tree","lm"] if getattr(args,k) is not None}
+  if args.tagger == 'genia':
+    simplifier.sources["genia"] = args.genia
+  simplifier.set_resources(resources)
+  
+  if getattr(args,"preload",False):
+    simplifier.load_resources(threads = getattr(args,"load_threads",None))
+  
+  logger.info("Built `{}` simplifier".format(type(simplifier).__name__))
+  
+  return simplifier
@@ -6,7 +6,9 @@ Created on Wed Sep 25 15:43:06 2019
 @author: Samuele Garda
 """
 
-from simplifiers.abstract_simplifiers import AbstractSimplifier
+from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.cache import cached_simplification
+from components.candidates import as_candidate,get_words
 
 class HierarchicalPBS(AbstractSimplifier):
   """
@@ -16,7 +18,7 @@ class HierarchicalPBS(AbstractSimplifier):
     - ranker : Partial Beam Search
   """
   
-  def __init__(self,model):
+  def __init__(self,parser,cwi,generator,selector,ranker,model,cache = None):
     """
     Initialize HierarchicalPBS Simplifier.
     
@@ -27,11 +29,15 @@ class HierarchicalPBS(AbstractSimplifier):
       ranker (components.rankers.PartialBeamSearchRanker) : Partial Beam Search ranker
       model (gensim.models.Word2Vec or gensim.models.FastText) : embedding model
       parser (spacy.lang.*) : spacy language instance
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
     """
-    super(HierarchicalPBS,self).__init__()
+    super(HierarchicalPBS,self).__init__(parser,cwi,generator,selector,ranker,cache)
     self.model = model
+  
+  @cached_simplification
+  def simplify_word(self,word,context = None, select= True, rank = True, prefilter = False):
     
-  def simplify_word(self,word,context = None, select= True, rank = True):
+    word = as_candidate(word)
     
     parser = self.parser
     model = self.model
@@ -49,24 +55,82 @@ class HierarchicalPBS(AbstractSimplifier):
                                                candidates = candidates,
                                                context = context,
                                                )
+    elif prefilter:
+      candidates = self.ranker.prefilter_candidates(candidates)
+    
+    return get_words(candidates)
+  
+  def get_context_free_candidates(self,word):
+    
+    # candidates are ranked by beam search over the whole text : only the cheap stage of the ranker (if any) is run here
+    candidates = self.simplify_word(word, rank = False, prefilter = True) or [str(word)]
     
     return candidates
   
   
-  def simplify_text(self,text):
+  def search_beams(self,text,max_lag = None,shared = None):
+    """
+    Beam search over text. After each word the prefix on which all hypotheses agree is committed 
+    (see `components.rankers.PartialBeamSearchRanker.commit_beams`).
     
-    hypos = ["<s> " for _ in range(self.ranker.beam_width)]
+    Args:
+      text (list) : tokens
+      max_lag (int or None) : maximum number of words kept in beams before being committed
+      shared (dict or None) : candidates of complex words already seen (see `AbstractSimplifier.simplify_text`)
+    Return:
+      (generator) : tuples (committed words,surviving beams), one per token
+    """
     
-    for word in text:
-      if self.cwi.is_complex(word):
-        candidates = self.simplify_text(word, rank = False)
-        hypos = [self.ranker.merge_words(h,c) for h in hypos for c in candidates] 
-        hypos = self.ranker.prune_beams(hypos)
-      else:
-        hypos = [self.ranker.merge_words(h,word) for h in hypos]
+    # candidates are selected without context : shared by all occurrences of a word
+    shared = shared if shared is not None else {}
+    
+    hypos = [self.ranker.start_beam()]
+    
+    complex_mask = self.cwi.is_complex_batch(text)
     
-    return hypos
-        
+    for word,is_complex in zip(text,complex_mask):
+      if is_complex:
+        if word not in shared:
+          shared[word] = self.get_context_free_candidates(word)
+        candidates = shared[word]
+        hypos = [self.ranker.extend_beam(h,c) for h in hypos for c in candidates] 
+        hypos = self.ranker.prune_beams(hypos, recombine = True)
+      else:
+        hypos = [self.ranker.extend_beam(h,word) for h in hypos]
+      
+      words,hypos = self.ranker.commit_beams(hypos, max_lag = max_lag)
+      
+      yield words,hypos
+  
+  def simplify_text(self,text,shared = None):
     
+    # best hypothesis, as simplified tokens
+    tokens = list(self.simplify_stream(text, shared = shared))
     
+    return tokens
   
+  def simplify_stream(self,text,max_lag = None,shared = None):
+    """
+    Simplify text with beam search, emitting words as soon as they are committed.
+    Words are committed when all the hypotheses agree on them or, if `max_lag` is given,
+    when the best hypothesis is `max_lag` words ahead of them.
+    
+    Args:
+      text (list) : tokens
+      max_lag (int or None) : maximum number of words kept in beams before being emitted
+      shared (dict or None) : candidates of complex words already seen (see `AbstractSimplifier.simplify_text`)
+    Return:
+      (generator) : simplified words
+    """
+    
+    if not len(text):
+      return
+    
+    for words,hypos in self.search_beams(text, max_lag = max_lag, shared = shared):
+      for w in words:
+        yield w
+    
+    best = max(hypos, key = lambda beam: beam.score)
+    
+    for w in best.get_words():
+      yield w
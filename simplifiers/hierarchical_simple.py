@@ -6,16 +6,16 @@ Created on Wed Sep 25 15:38:47 2019
 @author: Samuele Garda
 """
 
-from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.word2vec_simplifier import Word2VecSimplifier
 
-class HierarchicalSimple(AbstractSimplifier):
+class HierarchicalSimple(Word2VecSimplifier):
   """
   Lexical Simplifier with following pipeline components:
     - generator : Word2Vec or FastText embedding model
     - selector : MeSH hierarchy
-    - ranker : Simple Science ranker
+    - ranker : Simple Science ranker, or MeSH tree distance
   """  
-  def __init__(self,model):
+  def __init__(self,parser,cwi,generator,selector,ranker,model,vocab = None,cache = None):
     """
     Initialize HierarchicalSimple Simplifier.
     
@@ -23,28 +23,26 @@ class HierarchicalSimple(AbstractSimplifier):
       cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
       generator (components.generators) : subclass of AbstractGenerator
       selector (components.selectors.MeSHSelector) : Hierarchical selector
-      ranker (components.rankers.SimpleScienceRanker) : SimpleScience ranker
+      ranker (components.rankers.SimpleScienceRanker or components.rankers.MeSHTreeRanker) : SimpleScience or MeSH tree ranker
       model (gensim.models.*) : embedding model
       parser (spacy.lang.*) : spacy language instance
+      vocab (components.vocabulary.Vocabulary or None) : if given, candidates are processed as vocabulary indices
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
     """
-    super(HierarchicalSimple,self).__init__()
-    self.model = model
-    
-  def simplify_word(self,word,context = None):
-    
-    parser = self.parser
-    model = self.model
-    
-    candidates = self.generator.get_candidates(model = model, word = word)
-    
-    candidates = self.selector.select_candidates(complex_word = word,
-                                                 candidates = candidates,
-                                                 parser = parser,
-                                                 context = context)
+    super(HierarchicalSimple,self).__init__(parser,cwi,generator,selector,ranker,model,vocab = vocab,cache = cache)
+  
+  def select_context_free(self,word,candidates):
     
-    candidates = self.ranker.rank_candidates(complex_word = word,
-                                             candidates = candidates,
-                                             model = model)
+    candidates = self.selector.select_context_free(complex_word = word,
+                                                   candidates = candidates)
     
     return candidates
   
+  def select_context_free_ids(self,word,ids,sims):
+    
+    ids,sims = self.selector.select_context_free_ids(complex_word = word,
+                                                     ids = ids,
+                                                     sims = sims,
+                                                     vocab = self.vocab)
+    
+    return ids,sims
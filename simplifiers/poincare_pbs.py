@@ -7,6 +7,8 @@ Created on Wed Sep 25 15:57:34 2019
 """
 
 from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.cache import cached_simplification
+from components.candidates import as_candidate,get_words
 
 class PoincarePBS(AbstractSimplifier):
   """
@@ -16,7 +18,7 @@ class PoincarePBS(AbstractSimplifier):
     - ranker : Partial Beam Search
   """  
   
-  def __init__(self,model):
+  def __init__(self,parser,cwi,generator,ranker,model,cache = None):
     """
     Initialize PoincarePBS Simplifier.
     
@@ -26,12 +28,16 @@ class PoincarePBS(AbstractSimplifier):
       ranker (components.rankers.PartialBeamSearchRanker) : Partial Beam Search ranker
       model (gensim.models.PoincareModel) : embedding model
       parser (spacy.lang.*) : spacy language instance
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
     """
-    super(PoincarePBS,self).__init__()
+    super(PoincarePBS,self).__init__(parser,cwi,generator,None,ranker,cache)
     self.model = model
     
+  @cached_simplification
   def simplify_word(self,word,context = None,return_beams = False):
     
+    word = as_candidate(word)
+    
     model = self.model
     
     candidates = self.generator.get_candidates(model = model, word = word)
@@ -41,9 +47,9 @@ class PoincarePBS(AbstractSimplifier):
                                              context = context,
                                              return_beams = return_beams)
     
-    return candidates
+    return candidates if return_beams else get_words(candidates)
   
   
-  def simplify_text(self,text):
+  def simplify_text(self,text,shared = None):
     
     raise NotImplementedError("Unsupervised simplification is not implemented yet for Simplifiers with PBS ranker.")
\ No newline at end of file
@@ -7,6 +7,8 @@ Created on Wed Sep 25 15:56:01 2019
 """
 
 from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.cache import cached_simplification
+from components.candidates import as_candidate,get_words
 
 class PoincareSimple(AbstractSimplifier):
   """
@@ -16,7 +18,7 @@ class PoincareSimple(AbstractSimplifier):
     - ranker : Simple Science ranker
   """  
   
-  def __init__(self,model):
+  def __init__(self,parser,cwi,generator,ranker,model,cache = None):
     """
     Initialize PoincareSimple Simplifier.
     
@@ -26,12 +28,16 @@ class PoincareSimple(AbstractSimplifier):
       ranker (components.rankers.SimpleScinceRanker) : SimpleScince ranker
       model (gensim.models.PoincareModel) : embedding model
       parser (spacy.lang.*) : spacy language instance
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
     """
-    super(PoincareSimple,self).__init__()
+    super(PoincareSimple,self).__init__(parser,cwi,generator,None,ranker,cache)
     self.model = model
     
+  @cached_simplification
   def simplify_word(self,word,context = None):
     
+    word = as_candidate(word)
+    
     model = self.model
     
     candidates = self.generator.get_candidates(model = model, word = word)
@@ -41,18 +47,13 @@ class PoincareSimple(AbstractSimplifier):
                                              candidates = candidates,
                                              model = model)
     
-    return candidates
+    return get_words(candidates)
   
+  def get_context_free_candidates(self,word):
+    
+    # no stage depends on context
+    return self.simplify_word(word = word)
   
-  def simplify_text(self,text):
-    
-    simplified_text = []
-    
-    for word in text:
-      if self.cwi.is_complex(word):
-        context = " ".join(simplified_text)
-        candidates = self.simplify_word(word = word, context = context)
-        top_candidate = self.get_top_candidate(candidates)
-        simplified_text.append(top_candidate)
-      else:
-        simplified_text.append(word)
\ No newline at end of file
+  def simplify_in_context(self,word,candidates,context = None):
+    
+    return candidates
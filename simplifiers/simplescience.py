@@ -6,9 +6,9 @@ Created on Wed Sep 25 15:22:01 2019
 @author: Samuele Garda
 """
 
-from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.word2vec_simplifier import Word2VecSimplifier
 
-class SimpleScience(AbstractSimplifier):
+class SimpleScience(Word2VecSimplifier):
   """
   Lexical Simplifier with following pipeline components:
     - generator : Word2Vec or FastText embedding model
@@ -22,7 +22,7 @@ class SimpleScience(AbstractSimplifier):
 
   """  
   
-  def __init__(self,model):
+  def __init__(self,parser,cwi,generator,selector,ranker,model,vocab = None,cache = None):
     """
     Initialize SimpleScience Simplifier.
     
@@ -33,50 +33,26 @@ class SimpleScience(AbstractSimplifier):
       ranker (components.rankers.SimpleScienceRanker) : SimpleScience ranker
       model (gensim.models.*) : embedding model
       parser (spacy.lang.*) : spacy language instance
+      vocab (components.vocabulary.Vocabulary or None) : if given, candidates are processed as vocabulary indices
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
     """
-    super(SimpleScience,self).__init__()
-    self.model = model
-    
-  def simplify_word(self,word,context = None):
-    
-    parser = self.parser
-    model = self.model
-    cwi = self.cwi
-    
-    candidates = self.generator.get_candidates(model = model, word = word)
-    
-    candidates = self.selector.select_candidates(complex_word = word,
-                                                 candidates = candidates,
-                                                 parser = parser,
-                                                 context = context,
-                                                 model = model,
-                                                 cwi = cwi)
+    super(SimpleScience,self).__init__(parser,cwi,generator,selector,ranker,model,vocab = vocab,cache = cache)
+  
+  def select_context_free(self,word,candidates):
     
-    candidates = self.ranker.rank_candidates(complex_word = word,
-                                             candidates = candidates,
-                                             model = model)
+    candidates = self.selector.select_context_free(complex_word = word,
+                                                   candidates = candidates,
+                                                   model = self.model,
+                                                   cwi = self.cwi)
     
     return candidates
   
-  
-  def simplify_text(self,text):
-    
-    simplified_text = []
-    
-    for word in text:
-      if self.cwi.is_complex(word):
-        context = " ".join(simplified_text)
-        candidates = self.simplify_word(word = word, context = context)
-        top_candidate = self.get_top_candidate(candidates)
-        simplified_text.append(top_candidate)
-      else:
-        simplified_text.append(word)
-        
-        
-    
-    
-    
-    
+  def select_context_free_ids(self,word,ids,sims):
     
+    ids,sims = self.selector.select_context_free_ids(complex_word = word,
+                                                     ids = ids,
+                                                     sims = sims,
+                                                     vocab = self.vocab,
+                                                     cwi = self.cwi)
     
-    
\ No newline at end of file
+    return ids,sims
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 11:05:37 2026
+
+@author: Samuele Garda
+"""
+
+from abc import abstractmethod
+from simplifiers.abstract_simplifier import AbstractSimplifier
+from simplifiers.cache import cached_simplification
+from components.candidates import as_candidate,get_words
+from components.rankers import SimpleScienceRanker
+
+class Word2VecSimplifier(AbstractSimplifier):
+  """
+  Base class of Simplifiers generating candidates with a Word2Vec or FastText model and ranking them
+  with the SimpleScience ranker (or by MeSH tree distance). The pipeline runs either on candidate records or, if a vocabulary is given,
+  on vocabulary indices (see `components.vocabulary.Vocabulary`).
+  
+  Subclasses implement only the selection stages that do not depend on context
+  (`select_context_free` and `select_context_free_ids`), which depend on their selector.
+  
+  With vocabulary indices and the SimpleScience ranker, candidates are ranked before the filters that depend on context,
+  which preserve their order: candidates of all complex words of a text are ranked together
+  (see `components.rankers.SimpleScienceRanker.rank_candidate_ids_batch`).
+  """
+  
+  def __init__(self,parser,cwi,generator,selector,ranker,model,vocab = None,cache = None):
+    """
+    Initialize Word2VecSimplifier.
+    
+    Args:
+      cwi (components.complex_word_identifier) : subclass of AbstractComplexWordIdentifier
+      generator (components.generators) : subclass of AbstractGenerator
+      selector (components.selectors) : subclass of AbstractSelector
+      ranker (components.rankers.SimpleScienceRanker or components.rankers.MeSHTreeRanker) : SimpleScience or MeSH tree ranker
+      model (gensim.models.*) : embedding model
+      parser (spacy.lang.*) : spacy language instance
+      vocab (components.vocabulary.Vocabulary or None) : if given, candidates are processed as vocabulary indices
+      cache (simplifiers.cache.SimplificationCache or None) : cache of context free simplifications
+    """
+    super(Word2VecSimplifier,self).__init__(parser,cwi,generator,selector,ranker,cache)
+    self.model = model
+    self.vocab = vocab
+    self.rank_context_free = isinstance(ranker,SimpleScienceRanker)
+  
+  @abstractmethod
+  def select_context_free(self,word,candidates):
+    """
+    Apply filters of selector that do not depend on context of complex word.
+    
+    Args:
+      word (Candidate) : complex word
+      candidates (list) : simplification candidates
+    Return:
+      candidates (list) : filtered simplification candidates
+    """
+    
+    pass
+  
+  @abstractmethod
+  def select_context_free_ids(self,word,ids,sims):
+    """
+    Apply filters of selector that do not depend on context of complex word, on vocabulary indices.
+    
+    Args:
+      word (Candidate) : complex word
+      ids (np.ndarray) : indices of simplification candidates
+      sims (np.ndarray) : cosine similarity of simplification candidates
+    Return:
+      ids,sims (tuple of np.ndarray) : indices of filtered simplification candidates and their similarity
+    """
+    
+    pass
+  
+  @cached_simplification
+  def simplify_word(self,word,context = None):
+    
+    word = as_candidate(word)
+    
+    candidates = self.get_context_free_candidates(word)
+    
+    return self.simplify_in_context(word = word, candidates = candidates, context = context)
+  
+  def get_context_free_candidates(self,word):
+    
+    word = as_candidate(word)
+    
+    if self.vocab is not None:
+      return self.get_context_free_candidate_ids(word)
+    
+    model = self.model
+    
+    candidates = self.generator.get_candidates(model = model, word = word)
+    
+    candidates = self.select_context_free(word = word, candidates = candidates)
+    
+    return candidates
+  
+  def simplify_in_context(self,word,candidates,context = None):
+    
+    word = as_candidate(word)
+    
+    if self.vocab is not None:
+      return self.simplify_ids_in_context(word = word, candidates = candidates, context = context)
+    
+    # Part of Speech tags stored in candidates depend on context
+    candidates = self.selector.select_in_context(complex_word = word,
+                                                 candidates = [c.copy() for c in candidates],
+                                                 parser = self.parser,
+                                                 context = context)
+    
+    candidates = self.ranker.rank_candidates(complex_word = word,
+                                             candidates = candidates,
+                                             model = self.model)
+    
+    return get_words(candidates)
+  
+  def simplify_word_ids(self,word,context = None):
+    
+    candidates = self.get_context_free_candidate_ids(word)
+    
+    return self.simplify_ids_in_context(word = word, candidates = candidates, context = context)
+  
+  def get_context_free_candidates_batch(self,words):
+    
+    if self.vocab is None or not self.rank_context_free:
+      return super(Word2VecSimplifier,self).get_context_free_candidates_batch(words)
+    
+    shared = {str(word) : self.get_context_free_candidate_ids(word, rank = False) for word in words}
+    
+    found = [w for w,candidates in shared.items() if candidates is not None]
+    
+    ranked = self.ranker.rank_candidate_ids_batch([shared[w] for w in found], truncate = False)
+    
+    shared.update(zip(found,ranked))
+    
+    return shared
+  
+  def get_context_free_candidate_ids(self,word,rank = True):
+    
+    vocab = self.vocab
+    
+    idx = vocab.encode(str(word))
+    
+    if idx is None:
+      return None
+    
+    ids,sims = self.generator.get_candidate_ids(vocab = vocab, idx = idx)
+    
+    ids,sims = self.select_context_free_ids(word = word, ids = ids, sims = sims)
+    
+    if rank and self.rank_context_free:
+      ids,sims = self.ranker.rank_candidate_ids_batch([(ids,sims)], truncate = False)[0]
+    
+    return ids,sims
+  
+  def simplify_ids_in_context(self,word,candidates,context = None):
+    
+    if candidates is None:
+      return []
+    
+    vocab = self.vocab
+    
+    ids,sims = self.selector.select_ids_in_context(complex_word = word,
+                                                   ids = candidates[0],
+                                                   sims = candidates[1],
+                                                   parser = self.parser,
+                                                   context = context,
+                                                   vocab = vocab)
+    
+    if self.rank_context_free:
+      # already ranked, filters keep order
+      ids = ids[:self.ranker.topk]
+    else:
+      ids = self.ranker.rank_candidate_ids(ids = ids, sims = sims, complex_word = word, vocab = vocab)
+    
+    return vocab.decode(ids)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 11:31:04 2026
+
+@author: Samuele Garda
+"""
+
+import numpy as np
+import pytest
+from mesh_db import MeSHTree
+from components.complex_word_identifier import DummyComplexWordIdentifier
+
+
+class FakeKeyedVectors(object):
+  """
+  Word vectors with the interface of `gensim.models.KeyedVectors` used by the pipeline.
+  """
+  
+  def __init__(self,words,vectors):
+    self.index2word = list(words)
+    self.vectors = np.asarray(vectors, dtype = np.float32)
+    self.word2id = {w : i for i,w in enumerate(self.index2word)}
+    self.unit = self.vectors / np.linalg.norm(self.vectors, axis = 1, keepdims = True)
+  
+  def __getitem__(self,word):
+    return self.vectors[self.word2id[word]]
+  
+  def similarity(self,w1,w2):
+    return float(self.unit[self.word2id[w1]].dot(self.unit[self.word2id[w2]]))
+  
+  def most_similar(self,word,topn = 10):
+    idx = self.word2id[word]
+    sims = self.unit.dot(self.unit[idx])
+    order = [i for i in np.argsort(-sims, kind = "stable") if i != idx][:topn]
+    return [(self.index2word[i],float(sims[i])) for i in order]
+
+
+def make_words(n):
+  return ["w{}".format(i) for i in range(n)]
+
+
+@pytest.fixture
+def embedding_model():
+  rng = np.random.default_rng(0)
+  words = make_words(300)
+  return FakeKeyedVectors(words,rng.normal(size = (len(words),16)))
+
+
+@pytest.fixture
+def frequencies(embedding_model):
+  rng = np.random.default_rng(1)
+  words = embedding_model.index2word
+  complex_freq = {w : int(f) for w,f in zip(words,rng.integers(1,10000,len(words)))}
+  simple_freq = {w : int(f) for w,f in zip(words,rng.integers(1,10000,len(words)))}
+  return complex_freq,simple_freq
+
+
+@pytest.fixture
+def cwi(frequencies):
+  complex_freq,simple_freq = frequencies
+  return DummyComplexWordIdentifier(threshold = 1.0, complex_freq = complex_freq, simple_freq = simple_freq)
+
+
+@pytest.fixture
+def mesh_tree_file(tmp_path,embedding_model):
+  # MeSH ids of every other word of the vocabulary: two roots, each node with up to three children
+  ids = ["C04","D02"]
+  while len(ids) < 100:
+    parent = ids[len(ids) // 3]
+    ids.append("{}.{:03d}".format(parent,len(ids)))
+  words = embedding_model.index2word[::2]
+  path = tmp_path / "mtrees.bin"
+  # second half of terms also in another position of the tree
+  lines = ["{};{}".format(w,mesh_id) for w,mesh_id in zip(words,ids)]
+  lines += ["{};{}".format(w,mesh_id) for w,mesh_id in zip(words[50:],ids[:50])]
+  path.write_text("\n".join(lines) + "\n")
+  return str(path)
+
+
+@pytest.fixture
+def mesh_tree(mesh_tree_file):
+  return MeSHTree(mesh_tree_file)
+
+
+@pytest.fixture
+def arpa_file(tmp_path,embedding_model):
+  # bigram model over the vocabulary: unigrams with decreasing probability, bigrams of consecutive words
+  words = embedding_model.index2word
+  unigrams = [("<s>",-99.0,-0.5),("</s>",-1.0,0.0),("<unk>",-4.0,0.0)]
+  unigrams += [(w,-1.5 - i / 100.0,-0.25) for i,w in enumerate(words)]
+  bigrams = [("<s> {}".format(words[0]),-0.5)] + [("{} {}".format(w1,w2),-0.75) for w1,w2 in zip(words,words[1:])]
+  
+  lines = ["","\\data\\","ngram 1={}".format(len(unigrams)),"ngram 2={}".format(len(bigrams)),"","\\1-grams:"]
+  lines += ["{:.4f}\t{}\t{:.4f}".format(p,w,b) for w,p,b in unigrams]
+  lines += ["","\\2-grams:"]
+  lines += ["{:.4f}\t{}".format(p,ngram) for ngram,p in bigrams]
+  lines += ["","\\end\\",""]
+  
+  path = tmp_path / "lm.arpa"
+  path.write_text("\n".join(lines))
+  return str(path)
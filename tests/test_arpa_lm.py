@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 11:02:45 2026
+
+@author: Samuele Garda
+"""
+
+import pytest
+from arpa_lm import ArpaModel,ArpaState
+
+
+ARPA = """
+\\data\\
+ngram 1=6
+ngram 2=4
+ngram 3=2
+
+\\1-grams:
+-1.0\t</s>
+-99.0\t<s>\t-0.5
+-2.0\t<unk>
+-0.7\ta\t-0.3
+-0.8\tb\t-0.2
+-1.2\tc\t-0.1
+
+\\2-grams:
+-0.4\t<s> a\t-0.15
+-0.3\ta b\t-0.05
+-0.6\tb c
+-0.2\tc </s>
+
+\\3-grams:
+-0.1\t<s> a b
+-0.25\ta b c
+
+\\end\\
+"""
+
+
+@pytest.fixture(params = [False,True], ids = ["sorted","hashed"])
+def lm(request,tmp_path):
+  path = tmp_path / "toy.arpa"
+  path.write_text(ARPA)
+  return ArpaModel(str(path), hashed = request.param)
+
+
+# scores computed by hand following the backoff rules of KenLM
+@pytest.mark.parametrize("sentence,bos,eos,expected", [
+  # <s> a (bigram) , <s> a b (trigram) , a b c (trigram) , c </s> (backoff of `b c` is 0)
+  ("a b c",True,True,-0.4 - 0.1 - 0.25 - 0.2),
+  # b(<s>) + p(b) , b(b) + p(a) , b(a) + p(</s>)
+  ("b a",True,True,(-0.5 - 0.8) + (-0.2 - 0.7) + (-0.3 - 1.0)),
+  # <s> a , <s> a b , b(a b) + b(b) + p(a)
+  ("a b a",True,False,-0.4 - 0.1 + (-0.05 - 0.2 - 0.7)),
+  # p(a) , b(a) + p(<unk>)
+  ("a z",False,False,-0.7 + (-0.3 - 2.0))])
+def test_sentence_scores(lm,sentence,bos,eos,expected):
+  assert lm.order == 3
+  assert lm.score(sentence, bos = bos, eos = eos) == pytest.approx(expected, abs = 1e-5)
+
+
+def test_states_keep_longest_extendable_context(lm):
+  state = ArpaState()
+  lm.BeginSentenceWrite(state)
+  
+  words = []
+  for word in ["a","b","c","a"]:
+    out_state = ArpaState()
+    lm.BaseScore(state,word,out_state)
+    words.append(tuple(out_state.words))
+    state = out_state
+  
+  vocab = lm.vocab
+  # `c a` is not in the model : only `a` is kept as context
+  assert words == [(vocab["<s>"],vocab["a"]),(vocab["a"],vocab["b"]),(vocab["b"],vocab["c"]),(vocab["a"],)]
+  
+  null_state = ArpaState()
+  lm.NullContextWrite(null_state)
+  assert lm.BaseScore(null_state,"c",ArpaState()) == pytest.approx(-1.2)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 09:27:16 2026
+
+@author: Samuele Garda
+"""
+
+import sqlite3
+import multiprocessing
+import pytest
+from simplifiers.cache import SimplificationCache
+
+
+@pytest.fixture
+def config(tmp_path):
+  model = tmp_path / "model.bin"
+  model.write_text("vectors")
+  return {"simplifier" : "SimpleScience", "sources" : {"model" : str(model)}}
+
+
+def open_cache(path,config,**kwargs):
+  cache = SimplificationCache(path = str(path), **kwargs)
+  cache.open(config)
+  return cache
+
+
+def test_round_trip(tmp_path,config):
+  cache = open_cache(tmp_path / "cache.db",config)
+  cache.put("carcinoma",["cancer","tumor"])
+  cache.put("neoplasm",[])
+  
+  assert cache.get("carcinoma") == ["cancer","tumor"] and cache.get("neoplasm") == []
+  assert cache.get("unknown") is None
+  assert (cache.hits,cache.misses) == (2,1)
+  
+  # committed when written : visible to another connection before closing
+  other = open_cache(tmp_path / "cache.db",config)
+  assert other.get("carcinoma") == ["cancer","tumor"] and other.get("neoplasm") == []
+  assert other.disk_hits == 2
+  
+  cache.close()
+  other.close()
+
+
+def test_invalidated_when_model_changes(tmp_path,config):
+  cache = open_cache(tmp_path / "cache.db",config)
+  cache.put("carcinoma",["cancer"])
+  cache.close()
+  
+  other_model = tmp_path / "other_model.bin"
+  other_model.write_text("other vectors")
+  other_config = {"simplifier" : "HierarchicalSimple", "sources" : {"model" : str(other_model)}}
+  other = open_cache(tmp_path / "cache.db",other_config)
+  other.put("carcinoma",["tumor"])
+  other.close()
+  
+  with open(config["sources"]["model"],"a") as outfile:
+    outfile.write(" retrained")
+  
+  cache = open_cache(tmp_path / "cache.db",config)
+  assert cache.invalidated == 1 and cache.get("carcinoma") is None
+  cache.close()
+  
+  # entries of other configurations are kept
+  other = open_cache(tmp_path / "cache.db",other_config)
+  assert other.get("carcinoma") == ["tumor"]
+  other.close()
+
+
+def test_writers_do_not_block_each_other(tmp_path,config):
+  first = open_cache(tmp_path / "cache.db",config,timeout = 0.5)
+  second = open_cache(tmp_path / "cache.db",config,timeout = 0.5)
+  
+  for i in range(300):
+    first.put("a{}".format(i),["x"])
+    second.put("b{}".format(i),["y"])
+  
+  assert first.errors == second.errors == 0
+  assert first.get("b299") == ["y"] and second.get("a0") == ["x"]
+
+
+def write_in_worker(path,config,prefix):
+  cache = open_cache(path,config,timeout = 5.0)
+  for i in range(200):
+    cache.put("{}{}".format(prefix,i),[prefix])
+  cache.close()
+  return cache.errors
+
+
+def test_forked_workers_share_database(tmp_path,config):
+  cache = open_cache(tmp_path / "cache.db",config,timeout = 5.0)
+  cache.put("parent",["p"])
+  
+  with multiprocessing.get_context("fork").Pool(4) as pool:
+    errors = pool.starmap(write_in_worker, [(str(tmp_path / "cache.db"),config,prefix) for prefix in "abcd"])
+  
+  assert errors == [0,0,0,0]
+  assert all(cache.get("{}{}".format(prefix,i)) == [prefix] for prefix in "abcd" for i in range(200))
+  cache.close()
+
+
+def test_memory_evicts_least_recently_used():
+  cache = SimplificationCache(size = 2)
+  cache.put("a",["x"])
+  cache.put("b",["y"])
+  cache.get("a")
+  cache.put("c",["z"])
+  
+  assert cache.get("b") is None and cache.get("a") == ["x"] and cache.evictions == 1
+
+
+def test_database_failures_not_fatal(tmp_path,config):
+  cache = open_cache(tmp_path / "cache.db",config,timeout = 0.05)
+  
+  locker = sqlite3.connect(str(tmp_path / "cache.db"), isolation_level = None)
+  locker.execute("BEGIN EXCLUSIVE")
+  
+  cache.put("carcinoma",["cancer"])
+  assert cache.errors == 1
+  assert cache.get("carcinoma") == ["cancer"]
+  
+  # stale entries cannot be deleted : database is not used
+  blocked = open_cache(tmp_path / "cache.db",dict(config, simplifier = "other"),timeout = 0.05)
+  assert blocked.errors == 1 and blocked.db is None
+  blocked.put("carcinoma",["tumor"])
+  assert blocked.get("carcinoma") == ["tumor"]
+  
+  locker.execute("ROLLBACK")
+  locker.close()
+  
+  cache.put("neoplasm",["tumor"])
+  assert cache.errors == 1
+  cache.close()
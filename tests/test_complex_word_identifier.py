@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 14:36:08 2026
+
+@author: Samuele Garda
+"""
+
+import pytest
+from freq_store import FrequencyStore
+from components.candidates import Candidate
+from components.complex_word_identifier import DummyComplexWordIdentifier
+
+
+@pytest.fixture(params = ["dict","store"])
+def make_cwi(request,tmp_path,frequencies):
+  complex_freq,simple_freq = frequencies
+  
+  if request.param == "store":
+    FrequencyStore.build(complex_freq,str(tmp_path / "complex"))
+    FrequencyStore.build(simple_freq,str(tmp_path / "simple"))
+    complex_freq,simple_freq = FrequencyStore(str(tmp_path / "complex")),FrequencyStore(str(tmp_path / "simple"))
+  
+  def get_cwi(threshold):
+    return DummyComplexWordIdentifier(threshold = threshold, complex_freq = complex_freq, simple_freq = simple_freq)
+  
+  return get_cwi
+
+
+@pytest.mark.parametrize("threshold", [0.0,1.0,5.0])
+def test_batch_same_as_scalar(make_cwi,embedding_model,threshold):
+  cwi = make_cwi(threshold)
+  
+  # repeated words, words in no vocabulary and empty string
+  tokens = embedding_model.index2word[:100] + embedding_model.index2word[:10] + ["unknown","carcinoma","",","]
+  
+  scores = cwi.get_complexity_scores(tokens)
+  mask = cwi.is_complex_batch(tokens)
+  
+  assert scores.tolist() == pytest.approx([cwi.get_complexity_score(t) for t in tokens])
+  assert mask.tolist() == [cwi.is_complex(t) for t in tokens]
+  assert 0 < mask.sum() < len(tokens) or threshold == 0.0
+  
+  # records store the score computed on the word
+  records = [Candidate(t) for t in tokens]
+  assert cwi.is_complex_batch(records).tolist() == mask.tolist()
+  assert [cwi.get_complexity_score(r) for r in records] == pytest.approx(scores.tolist())
+  
+  assert cwi.get_complexity_scores([]).shape == (0,)
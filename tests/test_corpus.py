@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 17:48:30 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import pytest
+from simplifiers.corpus import simplify_file,load_checkpoint
+
+
+class UpperSimplifier(object):
+  """
+  Simplifier upper casing texts, failing after simplifying `fail_after` texts.
+  """
+  
+  def __init__(self,fail_after = None):
+    self.fail_after = fail_after
+    self.texts = 0
+  
+  def simplify_text(self,text):
+    if self.fail_after is not None and self.texts >= self.fail_after:
+      raise RuntimeError("interrupted")
+    self.texts += 1
+    return [tok.upper() for tok in text]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+  path = tmp_path / "corpus.txt"
+  path.write_text("".join("w{} w{} w{}\n".format(i,i + 1,i + 2) for i in range(50)))
+  return str(path)
+
+
+@pytest.fixture
+def expected(corpus,tmp_path):
+  path = str(tmp_path / "expected.txt")
+  simplify_file(UpperSimplifier(),corpus,path, batch_size = 4)
+  with open(path) as infile:
+    return infile.read()
+
+
+def interrupt(corpus,output):
+  with pytest.raises(RuntimeError):
+    simplify_file(UpperSimplifier(fail_after = 21),corpus,output, batch_size = 4, max_in_flight = 1)
+  checkpoint = load_checkpoint(output + ".checkpoint")
+  assert checkpoint == {"lines" : 20, "offset" : os.path.getsize(output)}
+  return checkpoint
+
+
+def read(path):
+  with open(path) as infile:
+    return infile.read()
+
+
+def test_resume_after_interruption(corpus,expected,tmp_path):
+  output = str(tmp_path / "out.txt")
+  interrupt(corpus,output)
+  
+  with pytest.raises(ValueError):
+    simplify_file(UpperSimplifier(),corpus,output)
+  
+  assert simplify_file(UpperSimplifier(),corpus,output, batch_size = 4, resume = True) == 30
+  assert read(output) == expected
+  assert not os.path.exists(output + ".checkpoint")
+
+
+def test_resume_discards_output_after_checkpoint(corpus,expected,tmp_path):
+  output = str(tmp_path / "out.txt")
+  interrupt(corpus,output)
+  
+  with open(output,"a") as outfile:
+    outfile.write("PARTIAL LINE")
+  
+  assert simplify_file(UpperSimplifier(),corpus,output, batch_size = 4, resume = True) == 30
+  assert read(output) == expected
+
+
+@pytest.mark.parametrize("damage", ["missing","shorter"])
+def test_resume_restarts_without_output(corpus,expected,tmp_path,damage):
+  output = str(tmp_path / "out.txt")
+  checkpoint = interrupt(corpus,output)
+  
+  if damage == "missing":
+    os.remove(output)
+  else:
+    with open(output,"r+b") as outfile:
+      outfile.truncate(checkpoint["offset"] // 2)
+  
+  assert simplify_file(UpperSimplifier(),corpus,output, batch_size = 4, resume = True) == 50
+  assert read(output) == expected
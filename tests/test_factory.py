@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 14:20:51 2026
+
+@author: Samuele Garda
+"""
+
+import sys
+import types
+import pickle
+import argparse
+import pytest
+from components.taggers import GeniaTaggerPool
+from components.vocabulary import Vocabulary
+from simplifiers.factory import add_simplifier_arguments,build_simplifier
+
+
+class FakeGeniaTagger(object):
+  """
+  GeniaTagger wrapper tagging every token as noun, recording the sentences it parsed.
+  """
+  
+  parsed = []
+  
+  def __init__(self,path):
+    self.path = path
+  
+  def parse(self,sentence):
+    self.parsed.append(sentence)
+    return [(tok,tok,"NN","O","O") for tok in sentence.split()]
+
+
+@pytest.fixture
+def geniatagger(monkeypatch):
+  module = types.ModuleType("geniatagger")
+  module.GeniaTagger = FakeGeniaTagger
+  monkeypatch.setitem(sys.modules,"geniatagger",module)
+  FakeGeniaTagger.parsed = []
+  return FakeGeniaTagger
+
+
+@pytest.fixture
+def simplifier_args(tmp_path,embedding_model,frequencies,cwi):
+  complex_freq,simple_freq = frequencies
+  
+  Vocabulary(embedding_model,cwi).save(str(tmp_path / "vocab"))
+  
+  for name,freqs in [("complex_freq",complex_freq),("simple_freq",simple_freq)]:
+    with open(str(tmp_path / "{}.pkl".format(name)),"wb") as outfile:
+      pickle.dump(freqs,outfile)
+  
+  def get_args(*extra):
+    parser = argparse.ArgumentParser()
+    add_simplifier_arguments(parser)
+    return parser.parse_args(["--simplifier","simplescience","--vocab",str(tmp_path / "vocab"),
+                              "--complex-freq",str(tmp_path / "complex_freq.pkl"),
+                              "--simple-freq",str(tmp_path / "simple_freq.pkl"),
+                              "--cwi-threshold","1.0","--cos-thr","0.0","--freq-thr","0"] + list(extra))
+  
+  return get_args
+
+
+def test_genia_tagger_from_arguments(simplifier_args,geniatagger,embedding_model):
+  args = simplifier_args("--tagger","genia","--genia","/opt/geniatagger","--tagger-workers","2")
+  
+  simplifier = build_simplifier(args)
+  simplifier.load_resources()
+  
+  assert isinstance(simplifier.parser,GeniaTaggerPool)
+  assert simplifier.parser.processes == 2
+  assert simplifier.sources["genia"] == "/opt/geniatagger"
+  
+  words = embedding_model.index2word[:5]
+  
+  for word in words + words:
+    simplifier.simplify_word(word)
+  
+  assert geniatagger.parsed
+  # context free tags of words are cached by the pool
+  assert simplifier.parser.misses > 0
+  assert set(simplifier.parser.cache) <= set(simplifier.vocab.words)
+  
+  text = embedding_model.index2word[:20]
+  assert len(simplifier.simplify_text(text)) == len(text)
+  
+  simplifier.parser.close()
+
+
+def test_genia_tagger_needs_executable(simplifier_args):
+  with pytest.raises(ValueError):
+    build_simplifier(simplifier_args("--tagger","genia"))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 15:20:44 2026
+
+@author: Samuele Garda
+"""
+
+import math
+import pytest
+from freq_store import FrequencyStore,StringTable,load_frequencies
+from components.candidates import Candidate
+
+
+COUNTS = {"cancer" : 120, "carcinoma" : 3, "tumor" : 45, "tumour" : 7, "größe" : 2, "naïve" : 1, "a" : 1000, "ab" : 10, "b" : 5}
+
+
+@pytest.fixture
+def store(tmp_path):
+  FrequencyStore.build(COUNTS,str(tmp_path / "freqs"))
+  store = FrequencyStore(str(tmp_path / "freqs"))
+  yield store
+  store.close()
+
+
+def test_lookup_same_as_dict(store):
+  assert len(store) == len(COUNTS)
+  assert {w : store[w] for w in COUNTS} == COUNTS
+  assert {w : store.get(w) for w in COUNTS} == COUNTS
+  # string table sorted by UTF-8 bytes
+  assert list(store) == sorted(COUNTS, key = lambda w : w.encode("utf-8"))
+  
+  total = sum(COUNTS.values())
+  for w,count in COUNTS.items():
+    assert store.get_log_freq(w) == pytest.approx(math.log(count / total), abs = 1e-5)
+
+
+@pytest.mark.parametrize("word", ["","aa","c","zzz","tumo","tumors","Cancer","gross"])
+def test_missing_words(store,word):
+  assert word not in store
+  assert store.get(word) is None and store.get(word,1e-10) == 1e-10
+  assert store.get_log_freq(word) is None
+  with pytest.raises(KeyError):
+    store[word]
+
+
+def test_candidate_keys(store):
+  assert store[Candidate("tumor")] == COUNTS["tumor"]
+  assert store.get(Candidate("größe")) == COUNTS["größe"]
+  assert Candidate("carcinoma") in store and Candidate("unknown") not in store
+  with pytest.raises(KeyError):
+    store[Candidate("unknown")]
+
+
+def test_empty_store(tmp_path):
+  FrequencyStore.build({},str(tmp_path / "empty"))
+  store = load_frequencies(str(tmp_path / "empty"))
+  
+  assert isinstance(store,FrequencyStore)
+  assert len(store) == 0 and list(store) == []
+  assert store.get("cancer") is None
+
+
+@pytest.mark.parametrize("mmap_mode", ["r",None])
+def test_string_table_keeps_positions(tmp_path,mmap_mode):
+  strings = list(COUNTS) + ["Cancer"]
+  StringTable.build(strings,str(tmp_path / "table"),"words")
+  table = StringTable(str(tmp_path / "table"),"words", mmap_mode = mmap_mode)
+  
+  assert len(table) == len(strings) and list(table) == strings
+  assert [table[i] for i in range(-len(strings),len(strings))] == strings + strings
+  assert {s : table.get(s) for s in strings} == {s : i for i,s in enumerate(strings)}
+  assert table.get(Candidate("größe")) == strings.index("größe") and Candidate("tumour") in table
+  
+  for missing in ["","aa","c","tumo","gross"]:
+    assert missing not in table and table.get(missing,-1) == -1
+  with pytest.raises(IndexError):
+    table[len(strings)]
+  
+  table.close()
+
+
+def test_empty_string_table(tmp_path):
+  StringTable.build([],str(tmp_path / "table"),"words")
+  table = StringTable(str(tmp_path / "table"),"words")
+  
+  assert len(table) == 0 and list(table) == [] and "cancer" not in table
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 17:11:52 2026
+
+@author: Samuele Garda
+"""
+
+import random
+import itertools
+import numpy as np
+import pytest
+from mesh_db import MeSHTree
+
+
+@pytest.fixture
+def tree_file(tmp_path):
+  rng = random.Random(3)
+  ids = ["A01","C04","D02"]
+  while len(ids) < 80:
+    parent = rng.choice(ids)
+    ids.append("{}.{:03d}".format(parent,len(ids)))
+  # nodes whose parent is missing from file hang from the virtual root
+  ids += ["E05.001","E05.001.002","F03.100.200"]
+  
+  terms = ["term {}".format(i) for i in range(60)] + ["Glands, Mammary","Neoplasms"]
+  lines = ["{};{}".format(rng.choice(terms),mesh_id) for mesh_id in ids]
+  # every term in at least one position
+  lines += ["{};{}".format(term,rng.choice(ids)) for term in terms]
+  
+  path = tmp_path / "mtrees.bin"
+  path.write_text("\n".join(lines) + "\n")
+  return str(path)
+
+
+def get_path(tree,node):
+  """
+  Nodes from virtual root to node, following MeSH ids.
+  """
+  
+  path = [node]
+  mesh_id = tree.ids[node]
+  while mesh_id:
+    mesh_id = mesh_id.rsplit(".",1)[0] if "." in mesh_id else ""
+    parent = tree.id2node.get(mesh_id,0)
+    path.append(parent)
+    mesh_id = tree.ids[parent]
+  return path[::-1]
+
+
+def naive_lca(tree,u,v):
+  common = [a for a,b in zip(get_path(tree,u),get_path(tree,v)) if a == b]
+  return common[-1]
+
+
+def naive_distance(tree,u,v):
+  depth = len(get_path(tree,naive_lca(tree,u,v))) - 1
+  return (len(get_path(tree,u)) - 1) + (len(get_path(tree,v)) - 1) - 2 * depth
+
+
+def check_tree(tree):
+  nodes = np.arange(len(tree.ids))
+  u,v = [np.asarray(x) for x in zip(*itertools.product(nodes,nodes))]
+  
+  assert tree.depth.tolist() == [len(get_path(tree,n)) - 1 for n in nodes]
+  assert tree.lca(u,v).tolist() == [naive_lca(tree,a,b) for a,b in zip(u,v)]
+  assert tree.distance(u,v).tolist() == [naive_distance(tree,a,b) for a,b in zip(u,v)]
+  
+  terms = sorted(tree.get_terms()) + ["unknown"]
+  for term in terms[::7]:
+    nodes = tree.get_nodes(term)
+    dist = tree.term_distance(term,terms)
+    mask = tree.in_hierarchy(term,terms)
+    for other,d,m in zip(terms,dist,mask):
+      others = tree.get_nodes(other)
+      pairs = [(a,b) for a in nodes for b in others]
+      assert d == min([naive_distance(tree,a,b) for a,b in pairs], default = np.inf)
+      assert m == any(naive_lca(tree,a,b) in (a,b) for a,b in pairs)
+
+
+def test_lca_and_distance_same_as_naive(tree_file):
+  tree = MeSHTree(tree_file)
+  
+  assert tree.get_nodes("mammary glands").tolist() == tree.get_nodes("Glands, Mammary").tolist()
+  # `E05` and `F03.100` are missing
+  assert [tree.depth[tree.id2node[i]] for i in ["E05.001","E05.001.002","F03.100.200"]] == [1,2,1]
+  
+  check_tree(tree)
+
+
+@pytest.mark.parametrize("mmap", [True,False])
+def test_saved_tree_same_as_built(tree_file,tmp_path,mmap):
+  tree = MeSHTree(tree_file)
+  tree.save(str(tmp_path / "tree"))
+  loaded = MeSHTree.load(str(tmp_path / "tree"), mmap = mmap)
+  
+  assert list(loaded.ids) == tree.ids and list(loaded.get_terms()) == list(tree.get_terms())
+  for term in tree.get_terms():
+    assert loaded.get_nodes(term).tolist() == tree.get_nodes(term).tolist()
+    assert term in loaded.get_terms()
+  assert "unknown" not in loaded.get_terms() and not len(loaded.get_nodes("unknown"))
+  
+  check_tree(loaded)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 16:05:19 2026
+
+@author: Samuele Garda
+"""
+
+import spacy
+import pytest
+from arpa_lm import ArpaModel
+from components.generators import Word2VecGenerator
+from components.selectors import MeSHSelector
+from components.rankers import PartialBeamSearchRanker,LMScoreCache
+from simplifiers.hierarchical_pbs import HierarchicalPBS
+
+
+@pytest.fixture
+def ranker(arpa_file):
+  return PartialBeamSearchRanker(lm = ArpaModel(arpa_file), beam_width = 3, cache = LMScoreCache())
+
+
+def extend(ranker,beam,words):
+  for w in words:
+    beam = ranker.extend_beam(beam,w)
+  return beam
+
+
+def test_commit_on_agreement(ranker):
+  root = ranker.start_beam()
+  prefix = extend(ranker,root,["w1","w2"])
+  hypos = [extend(ranker,prefix,["w3","w4"]),extend(ranker,prefix,["w5"])]
+  scores = [h.score for h in hypos]
+  
+  words,committed = ranker.commit_beams(hypos)
+  
+  assert words == ["w1","w2"]
+  assert committed == hypos and [h.score for h in committed] == scores
+  # committed prefix is detached from the beam tree
+  assert prefix.parent is None and prefix.word is None
+  assert [h.get_words() for h in committed] == [["w3","w4"],["w5"]]
+  
+  # nothing new to commit
+  assert ranker.commit_beams(committed)[0] == []
+
+
+def test_commit_after_max_lag(ranker):
+  root = ranker.start_beam()
+  best = extend(ranker,root,["w0","w1","w2","w3"])
+  other = extend(ranker,root,["w9","w50","w80","w120"])
+  agree = extend(ranker,best.get_ancestor(1),["w7","w8","w9"])
+  # w0 w1 w2 w3 is the only one made of bigrams of the model
+  assert max([best,other,agree], key = lambda beam : beam.score) is best
+  
+  assert ranker.commit_beams([best,other,agree])[0] == []
+  
+  words,hypos = ranker.commit_beams([best,other,agree], max_lag = 2)
+  
+  # best hypothesis is 4 words ahead of the common root : its first 2 words are committed, hypotheses not sharing them are dropped
+  assert words == ["w0","w1"]
+  assert hypos == [best]
+  assert best.get_words() == ["w2","w3"]
+
+
+def test_recombination_keeps_best_of_same_state(ranker):
+  root = ranker.start_beam()
+  # bigram model : hypotheses ending with the same word have the same state
+  hypos = [extend(ranker,root,[w,"w3"]) for w in ["w2","w50","w100"]] + [extend(ranker,root,["w1","w4"])]
+  
+  assert len(ranker.prune_beams(hypos)) == 3
+  
+  pruned = ranker.prune_beams(hypos, recombine = True)
+  same_state = [h for h in hypos if h.state == hypos[0].state]
+  
+  assert len(pruned) == 2
+  assert max(same_state, key = lambda beam : beam.score) in pruned
+  assert [h.score for h in pruned] == sorted([h.score for h in pruned], reverse = True)
+
+
+def search_without_commit(simplifier,text):
+  """
+  Beam search over the whole text, without committing prefixes.
+  """
+  
+  ranker = simplifier.ranker
+  hypos = [ranker.start_beam()]
+  
+  for word,is_complex in zip(text,simplifier.cwi.is_complex_batch(text)):
+    candidates = simplifier.get_context_free_candidates(word) if is_complex else [word]
+    hypos = ranker.prune_beams([ranker.extend_beam(h,c) for h in hypos for c in candidates], recombine = True)
+  
+  return max(hypos, key = lambda beam : beam.score).get_words()
+
+
+def test_stream_same_as_search_without_commit(ranker,cwi,embedding_model,mesh_tree):
+  selector = MeSHSelector(char_ngram = 4, mesh_db = mesh_tree)
+  simplifier = HierarchicalPBS(spacy.blank("en"),cwi,Word2VecGenerator(topn = 20),selector,ranker,embedding_model)
+  
+  words = embedding_model.index2word
+  text = words[:30] + words[100:110] + words[:10]
+  
+  assert any(simplifier.get_context_free_candidates(w) != [w] for w in text)
+  
+  expected = search_without_commit(simplifier,text)
+  
+  assert simplifier.simplify_text(text) == expected
+  assert list(simplifier.simplify_stream(text, max_lag = len(text))) == expected
+  assert len(list(simplifier.simplify_stream(text, max_lag = 1))) == len(text)
+  assert simplifier.simplify_text([]) == []
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 11:40:03 2026
+
+@author: Samuele Garda
+"""
+
+import os
+import time
+import pytest
+import simplifiers.abstract_simplifier as abstract_simplifier
+from simplifiers.abstract_simplifier import AbstractSimplifier,fork_pool
+
+
+class TagSimplifier(AbstractSimplifier):
+  """
+  Simplifier marking tokens with its name and the process simplifying them.
+  """
+  
+  def __init__(self,name,cwi):
+    super(TagSimplifier,self).__init__(None,cwi,None,None,None)
+    self.name = name
+    self.forked = False
+  
+  def after_fork(self):
+    super(TagSimplifier,self).after_fork()
+    self.forked = True
+  
+  def simplify_word(self,word,context = None):
+    return [word]
+  
+  def simplify_text(self,text,shared = None):
+    return ["{}:{}:{}".format(self.name,self.forked,tok) for tok in text]
+
+
+def get_pid(_):
+  return os.getpid(),abstract_simplifier._WORKER_SIMPLIFIER.name
+
+
+@pytest.mark.parametrize("executor", [False,True])
+def test_fork_pool_hands_simplifier_to_workers(cwi,executor):
+  simplifier = TagSimplifier("a",cwi)
+  
+  pool = fork_pool(simplifier,2,executor = executor)
+  
+  results = list(pool.map(get_pid,range(8)))
+  
+  assert {name for _,name in results} == {"a"}
+  assert all(pid != os.getpid() for pid,_ in results)
+  # parent process does not hold the simplifier of workers
+  assert abstract_simplifier._WORKER_SIMPLIFIER is None
+  
+  if executor:
+    pool.shutdown()
+  else:
+    pool.terminate()
+
+
+def test_corpus_does_not_break_running_pool(cwi):
+  document = "w1 w2 . w3 w4 !".split()
+  
+  first = TagSimplifier("a",cwi)
+  first.start_pool(2)
+  
+  second = TagSimplifier("b",cwi)
+  assert second.simplify_corpus([["w1"],["w2"]], workers = 2) == [["b:True:w1"],["b:True:w2"]]
+  
+  expected = ["a:True:{}".format(tok) for tok in document]
+  assert first.simplify_document(document) == expected
+  
+  # workers restarted by the pool get the simplifier as well
+  pids = {p.pid for p in first.pool._pool}
+  for _ in range(2):
+    first.pool.apply_async(os._exit,(0,))
+  
+  deadline = time.time() + 10
+  while time.time() < deadline and len(pids & {p.pid for p in first.pool._pool if p.is_alive()}) > 0:
+    time.sleep(0.05)
+  
+  assert not pids & {p.pid for p in first.pool._pool}
+  assert first.simplify_document(document) == expected
+  
+  first.stop_pool()
+  assert first.simplify_document(document) == ["a:False:{}".format(tok) for tok in document]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 10:12:37 2026
+
+@author: Samuele Garda
+"""
+
+import pickle
+import argparse
+import threading
+import spacy
+import pytest
+import numpy as np
+import simplifiers.factory as factory
+from arpa_lm import ArpaModel
+from components.candidates import Candidate
+from components.rankers import SimpleScienceRanker,CascadeRanker,MeSHTreeRanker
+from simplifiers.factory import add_simplifier_arguments,build_simplifier
+
+
+@pytest.fixture
+def simplifier_args(tmp_path,monkeypatch,embedding_model,frequencies,arpa_file,mesh_tree_file):
+  complex_freq,simple_freq = frequencies
+  
+  for name,freqs in [("complex_freq",complex_freq),("simple_freq",simple_freq)]:
+    with open(str(tmp_path / "{}.pkl".format(name)),"wb") as outfile:
+      pickle.dump(freqs,outfile)
+  
+  monkeypatch.setattr(factory,"load_embedding_model",lambda path : embedding_model)
+  monkeypatch.setattr(factory,"load_tagger",lambda *args : spacy.blank("en"))
+  
+  def get_args(simplifier,*extra):
+    parser = argparse.ArgumentParser()
+    add_simplifier_arguments(parser)
+    return parser.parse_args(["--simplifier",simplifier,"--model","model.kv",
+                              "--complex-freq",str(tmp_path / "complex_freq.pkl"),
+                              "--simple-freq",str(tmp_path / "simple_freq.pkl"),
+                              "--mesh-tree",mesh_tree_file,"--lm",arpa_file,
+                              "--cwi-threshold","1.0","--cos-thr","0.0","--freq-thr","0"] + list(extra))
+  
+  return get_args
+
+
+@pytest.mark.parametrize("topk", [None,1,3])
+def test_batch_ranking_same_as_single(topk):
+  rng = np.random.default_rng(2)
+  ranker = SimpleScienceRanker(topk = topk)
+  # rounded similarities to have ties, and complex words with no candidate
+  pairs = [(rng.permutation(50)[:n],np.round(rng.random(n),1).astype(np.float32)) for n in [5,0,12,1,30,0,7]]
+  
+  ranked = ranker.rank_candidate_ids_batch(pairs)
+  
+  assert len(ranked) == len(pairs)
+  for (ids,sims),(ranked_ids,ranked_sims) in zip(pairs,ranked):
+    assert ranked_ids.tolist() == ranker.rank_candidate_ids(ids,sims).tolist()
+    assert ranked_sims.tolist() == sorted(sims.tolist(), reverse = True)[:topk]
+  
+  # not truncated : filtering ranked candidates gives the ranking of filtered ones
+  for (ids,sims),(ranked_ids,ranked_sims) in zip(pairs,ranker.rank_candidate_ids_batch(pairs, truncate = False)):
+    assert len(ranked_ids) == len(ids)
+    keep = ids % 2 == 0
+    assert ranked_ids[ranked_ids % 2 == 0][:topk].tolist() == ranker.rank_candidate_ids(ids[keep],sims[keep]).tolist()
+  
+  assert ranker.rank_candidate_ids_batch([]) == []
+
+
+def test_cascade_ranker_from_arguments(simplifier_args,embedding_model):
+  args = simplifier_args("hierpbs","--ranker","cascade","--cascade-k","3","--prefilter","unigram","--audit-every","1")
+  
+  simplifier = build_simplifier(args)
+  
+  assert isinstance(simplifier.ranker,CascadeRanker)
+  assert simplifier.ranker.k == 3 and simplifier.ranker.prefilter == "unigram"
+  
+  words = embedding_model.index2word[::2][:20]
+  results = [simplifier.simplify_word(w) for w in words]
+  
+  assert any(results) and all(len(r) <= 3 for r in results)
+  assert simplifier.ranker.calls == len(words) == simplifier.ranker.audited
+  
+  text = embedding_model.index2word[:20]
+  assert len(simplifier.simplify_text(text)) == len(text)
+
+
+def test_mesh_tree_ranker_from_arguments(simplifier_args,mesh_tree,embedding_model):
+  simplifier = build_simplifier(simplifier_args("hiersimple","--ranker","meshtree"))
+  
+  assert isinstance(simplifier.ranker,MeSHTreeRanker)
+  
+  ranked = [(w,simplifier.simplify_word(w)) for w in embedding_model.index2word[::2][:30]]
+  
+  assert any(candidates for _,candidates in ranked)
+  # with no weight on similarity candidates closest in MeSH tree come first
+  for word,candidates in ranked:
+    distances = list(mesh_tree.term_distance(word,[str(c) for c in candidates]))
+    assert distances == sorted(distances)
+
+
+@pytest.mark.parametrize("simplifier,extra", [("hiersimple",["--ranker","cascade"]),
+                                              ("hierpbs",["--ranker","meshtree"]),
+                                              ("simplescience",["--ranker","pbs"])])
+def test_ranker_not_available_for_simplifier(simplifier_args,simplifier,extra):
+  with pytest.raises(ValueError):
+    build_simplifier(simplifier_args(simplifier,*extra))
+
+
+def test_cascade_counters_consistent_across_threads(arpa_file,embedding_model):
+  ranker = CascadeRanker(lm = ArpaModel(arpa_file), beam_width = 5, k = 2, audit_every = 3)
+  candidates = [Candidate(w,similarity = 1.0 / (i + 1)) for i,w in enumerate(embedding_model.index2word[1:8])]
+  
+  def work():
+    for _ in range(100):
+      ranker.rank_candidates(complex_word = "w0", candidates = candidates, context = "w0 w1 w2")
+  
+  threads = [threading.Thread(target = work) for _ in range(4)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  
+  assert ranker.calls == 4 * 100
+  assert ranker.audited == 4 * 100 // 3
+  assert 0.0 <= ranker.get_change_rate() <= 1.0
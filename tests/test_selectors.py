@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 09:40:12 2026
+
+@author: Samuele Garda
+"""
+
+import random
+import threading
+import pytest
+from components.candidates import Candidate
+from components.selectors import SelectorPipeline,SimpleScienceSelector
+
+
+WORDS = ["carcinoma","cancer","tumor","carcinomas","growth","lump","neoplasm","mass","sore","carcinogen"]
+
+
+class FakeCWI(object):
+  """
+  Complexity scores and frequencies read from lookups.
+  """
+  
+  def __init__(self,scores,freqs):
+    self.scores = scores
+    self.freqs = freqs
+  
+  def get_complexity_score(self,word):
+    return self.scores.get(str(word),0.0)
+  
+  def get_complex_freq(self,word):
+    return self.freqs.get(str(word),0)
+
+
+@pytest.fixture
+def cwi():
+  rng = random.Random(0)
+  return FakeCWI({w : rng.random() for w in WORDS},{w : rng.randint(0,10000) for w in WORDS})
+
+
+def get_candidates(seed = 0):
+  rng = random.Random(seed)
+  return [Candidate(w,similarity = rng.random()) for w in WORDS[1:]]
+
+
+def run_unordered(selector,complex_word,candidates,cwi):
+  """
+  Apply context free filters of SimpleScienceSelector in their declaration order.
+  """
+  
+  selected = list(candidates)
+  for _,filter_fn in selector.get_context_free_filters(complex_word = complex_word, model = None, cwi = cwi):
+    selected = list(filter_fn(candidates = selected))
+  return [w for w in candidates if w in selected]
+
+
+@pytest.mark.parametrize("stats", [{},
+                                   {"lemma" : (10,1.0,10,9), "cos_sim" : (10,1e-6,10,1), "complexity" : (10,1e-3,10,5)},
+                                   {"lemma" : (10,1e-6,10,0), "cos_sim" : (10,1.0,10,10), "complexity" : (10,1e-6,10,10)}])
+def test_pipeline_same_output_as_unordered_filters(stats,cwi):
+  selector = SimpleScienceSelector(char_ngram = 4, cosine_threshold = 0.3, frequency_threshold = 2000)
+  
+  for name,(calls,time,n_in,n_out) in stats.items():
+    selector.pipeline.stats[name] = {"calls" : calls, "time" : time, "in" : n_in, "out" : n_out}
+  
+  for seed in range(5):
+    candidates = get_candidates(seed)
+    expected = run_unordered(selector,"carcinoma",candidates,cwi)
+    assert selector.select_context_free("carcinoma",candidates,None,cwi) == expected
+
+
+def test_pipeline_orders_by_rank_and_stops_when_empty():
+  pipeline = SelectorPipeline(costs = {"a" : 1.0, "b" : 1e-6, "c" : 1e-3})
+  calls = []
+  
+  def make_filter(name,keep):
+    def filter_fn(candidates):
+      calls.append(name)
+      return [w for w in candidates if keep(w)]
+    return filter_fn
+  
+  filters = [("a",make_filter("a",lambda w : True)),
+             ("b",make_filter("b",lambda w : w != "x")),
+             ("c",make_filter("c",lambda w : False))]
+  
+  assert pipeline.run(["x","y","z"],filters) == []
+  # cheapest first, last filter not run once no candidate is left
+  assert calls == ["b","c"]
+  assert pipeline.stats["b"]["in"] == 3 and pipeline.stats["b"]["out"] == 2
+  assert "a" not in pipeline.stats or pipeline.stats["a"]["calls"] == 0
+
+
+def test_pipeline_stats_consistent_across_threads():
+  pipeline = SelectorPipeline()
+  filters = [("lemma",lambda candidates : [w for w in candidates if w != "a"]),
+             ("postag",lambda candidates : list(candidates))]
+  
+  results = []
+  
+  def work():
+    for _ in range(500):
+      results.append(pipeline.run(["a","b","c"],filters))
+  
+  threads = [threading.Thread(target = work) for _ in range(4)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  
+  assert all(r == ["b","c"] for r in results) and len(results) == 4 * 500
+  assert sum(stats["calls"] for stats in pipeline.stats.values()) == 2 * 4 * 500
+  assert pipeline.stats["lemma"]["in"] == 3 * 4 * 500
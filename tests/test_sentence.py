@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:12:37 2026
+
+@author: Samuele Garda
+"""
+
+import spacy
+import pytest
+from spacy.language import Language
+import components.sentence as sentence_module
+from components.candidates import Candidate
+from components.sentence import Sentence,tag_tokens
+from components.selectors import SimpleScienceSelector
+from components.taggers import GeniaTaggerPool
+
+
+# context dependent tags: a noun after `to` is a verb
+UPOS = {"the" : "DET", "a" : "DET", "to" : "PART", "drug" : "NOUN", "medicine" : "NOUN", "cure" : "NOUN", "slowly" : "ADV"}
+PTB = {"DET" : "DT", "PART" : "TO", "NOUN" : "NN", "VERB" : "VB", "ADV" : "RB"}
+
+
+def get_tag(tokens,idx):
+  tag = UPOS.get(tokens[idx],"NOUN")
+  if tag == "NOUN" and idx > 0 and tokens[idx-1] == "to":
+    tag = "VERB"
+  return tag
+
+
+@Language.component("fake_tagger")
+def fake_tagger(doc):
+  tokens = [t.text for t in doc]
+  for idx,tok in enumerate(doc):
+    tok.pos_ = get_tag(tokens,idx)
+  return doc
+
+
+@Language.component("fake_ner")
+def fake_ner(doc):
+  raise RuntimeError("only tagging components should be run")
+
+
+class FakeGeniaTaggerPool(GeniaTaggerPool):
+  """
+  GeniaTaggerPool tagging with PTB tags without starting GeniaTagger processes.
+  """
+  
+  def __init__(self):
+    self.cache = {}
+    self.hits = 0
+    self.misses = 0
+    self.calls = 0
+  
+  def _cache_get(self,word):
+    return self.cache.get(word)
+  
+  def _cache_put(self,word,pos):
+    self.cache[word] = pos
+  
+  def tag_sentences(self,sentences):
+    self.calls += len(sentences)
+    tags = []
+    for sent in sentences:
+      tokens = sent.split()
+      tags.append([PTB[get_tag(tokens,idx)] for idx in range(len(tokens))])
+    return tags
+
+
+@pytest.fixture
+def spacy_tagger():
+  parser = spacy.blank("en")
+  parser.add_pipe("fake_tagger", name = "tagger")
+  parser.add_pipe("fake_ner", name = "ner")
+  return parser
+
+
+@pytest.fixture
+def genia_tagger():
+  return FakeGeniaTaggerPool()
+
+
+@pytest.fixture
+def selector():
+  return SimpleScienceSelector(char_ngram = 4, cosine_threshold = 0.0, frequency_threshold = 0)
+
+
+def test_tag_tokens_spacy(spacy_tagger):
+  assert tag_tokens(["to","cure","the","drug"],spacy_tagger) == ["PART","VERB","DET","NOUN"]
+
+
+def test_tag_tokens_genia(genia_tagger):
+  assert tag_tokens(["to","cure","the","drug"],genia_tagger) == ["TO","VB","DT","NN"]
+
+
+@pytest.mark.parametrize("tagger", ["spacy_tagger","genia_tagger"])
+def test_sentence_tags_original_and_substitution_alike(tagger,request):
+  parser = request.getfixturevalue(tagger)
+  sentence = Sentence("we want to cure the drug".split(), parser = parser)
+  
+  sentence.index = 3
+  # original word is tagged in the left window, as substitutions are
+  assert sentence.get_pos("cure") == tag_tokens(sentence.tokens[:4],parser)[-1]
+  assert sentence.get_pos("cure") == ("VERB" if tagger == "spacy_tagger" else "VB")
+  
+  sentence.index = 5
+  assert sentence.get_pos("drug") == sentence.get_pos("medicine")
+
+
+@pytest.mark.parametrize("tagger", ["spacy_tagger","genia_tagger"])
+def test_filter_postag_in_sentence(tagger,selector,request):
+  parser = request.getfixturevalue(tagger)
+  sentence = Sentence("we want to cure the drug".split(), parser = parser)
+  sentence.index = 3
+  
+  candidates = [Candidate("heal"),Candidate("slowly")]
+  
+  kept = selector.filter_postag(sentence.words[3],candidates,parser,sentence)
+  
+  assert [str(c) for c in kept] == ["heal"]
+  # tags of complex word and candidates come from the same tagger
+  assert sentence.words[3].pos == candidates[0].pos
+
+
+def test_genia_selector_on_spacy_sentence(spacy_tagger,genia_tagger,selector):
+  sentence = Sentence("we want to cure the drug".split(), parser = spacy_tagger)
+  sentence.index = 5
+  
+  candidates = [Candidate("medicine"),Candidate("slowly")]
+  
+  kept = selector.filter_postag(sentence.words[5],candidates,genia_tagger,sentence)
+  
+  assert [str(c) for c in kept] == ["medicine"]
+  assert sentence.words[5].pos == "NN"
+
+
+@pytest.mark.parametrize("tagger", ["spacy_tagger","genia_tagger"])
+def test_candidates_tagged_in_one_batch(tagger,selector,request,monkeypatch):
+  parser = request.getfixturevalue(tagger)
+  sentence = Sentence("we want to cure the drug".split(), parser = parser)
+  sentence.index = 3
+  
+  batches = []
+  tag_batch = sentence_module.tag_batch
+  
+  def counting_tag_batch(texts,parser):
+    batches.append(len(texts))
+    return tag_batch(texts,parser)
+  
+  monkeypatch.setattr(sentence_module,"tag_batch",counting_tag_batch)
+  
+  candidates = [Candidate(w) for w in ["heal","slowly","treat","the","fix"]]
+  kept = selector.filter_postag(sentence.words[3],candidates,parser,sentence)
+  
+  assert sorted(str(c) for c in kept) == ["fix","heal","treat"]
+  # input word read from annotation with spacy, candidates in a single batch
+  assert batches == ([5] if tagger == "spacy_tagger" else [1,5])
+
+
+def test_sentence_annotated_once(spacy_tagger):
+  sentence = Sentence("we want to cure the drug".split(), parser = spacy_tagger)
+  
+  assert sentence.pos == ["NOUN","NOUN","PART","VERB","DET","NOUN"]
+  
+  sentence.index = 3
+  sentence.substitute(3,"heal")
+  # tags refer to input sentence, substitutions are tagged in window around position
+  assert sentence.get_pos("cure") == "VERB"
+  assert sentence.get_pos_batch(["drug","slowly"]) == ["VERB","ADV"]
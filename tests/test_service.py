@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 15:02:41 2026
+
+@author: Samuele Garda
+"""
+
+import json
+import asyncio
+import spacy
+import pytest
+from components.vocabulary import Vocabulary
+from components.generators import Word2VecGenerator
+from components.selectors import SimpleScienceSelector
+from components.rankers import SimpleScienceRanker
+from simplifiers.simplescience import SimpleScience
+from simplifiers.cache import SimplificationCache
+from service import SimplificationService,run_batch
+
+
+@pytest.fixture(params = [False,True], ids = ["records","ids"])
+def simplifier(request,cwi,embedding_model):
+  selector = SimpleScienceSelector(char_ngram = 4, cosine_threshold = 0.0, frequency_threshold = 1000)
+  vocab = Vocabulary(embedding_model,cwi) if request.param else None
+  return SimpleScience(spacy.blank("en"),cwi,Word2VecGenerator(topn = 30),selector,SimpleScienceRanker(),embedding_model,vocab = vocab)
+
+
+def get_batch(words):
+  batch = [("word",{"word" : w}) for w in words[:10]]
+  batch += [("word",{"word" : w, "context" : " ".join(words[i:i + 5])}) for i,w in enumerate(words[5:15])]
+  batch += [("text",{"text" : " ".join(words[:20])}),("text",{"text" : words[10:40] + ["."] + words[:5]})]
+  batch += [("word",{"word" : "unknown"}),("word",{"word" : words[0]})]
+  return batch
+
+
+def run_one_by_one(simplifier,batch):
+  results = []
+  for kind,payload in batch:
+    if kind == "word":
+      results.append({"candidates" : simplifier.simplify_word(payload["word"], context = payload.get("context"))})
+    else:
+      text = payload["text"]
+      results.append({"text" : simplifier.simplify_document(text.split() if isinstance(text,str) else text)})
+  return results
+
+
+@pytest.mark.parametrize("cache", [False,True])
+def test_batch_same_as_one_by_one(simplifier,embedding_model,monkeypatch,cache):
+  batch = get_batch(embedding_model.index2word)
+  expected = run_one_by_one(simplifier,batch)
+  
+  assert any(r.get("candidates") for r in expected)
+  
+  simplifier.cache = SimplificationCache() if cache else None
+  
+  calls = []
+  get_batch_candidates = simplifier.get_context_free_candidates_batch
+  
+  def count_calls(words):
+    calls.append(len(words))
+    return get_batch_candidates(words)
+  
+  monkeypatch.setattr(simplifier,"get_context_free_candidates_batch",count_calls)
+  
+  assert run_batch(simplifier,batch) == expected
+  # words of all requests go through the pipeline together
+  assert len(calls) == 1
+
+
+def test_failing_request_does_not_affect_batch(simplifier,monkeypatch):
+  simplify_in_context = simplifier.simplify_in_context
+  
+  def fail_on_w1(word,candidates,context = None):
+    if str(word) == "w1":
+      raise RuntimeError("boom")
+    return simplify_in_context(word,candidates,context)
+  
+  monkeypatch.setattr(simplifier,"simplify_in_context",fail_on_w1)
+  
+  results = run_batch(simplifier,[("word",{"word" : "w1", "context" : "w0"}),("word",{"word" : "w2", "context" : "w0"})])
+  
+  assert results[0] == {"error" : "RuntimeError : boom"}
+  assert "candidates" in results[1]
+
+
+async def post(path,body,sock):
+  reader,writer = await asyncio.open_unix_connection(sock)
+  data = json.dumps(body).encode("utf-8")
+  writer.write("POST {} HTTP/1.1\r\nContent-Length: {}\r\n\r\n".format(path,len(data)).encode("latin-1") + data)
+  await writer.drain()
+  response = await reader.read()
+  writer.close()
+  head,_,body = response.partition(b"\r\n\r\n")
+  return int(head.split()[1]),json.loads(body.decode("utf-8"))
+
+
+async def serve_requests(simplifier,requests,sock):
+  service = SimplificationService(simplifier, max_batch_size = 8, max_wait = 0.01)
+  server = asyncio.ensure_future(service.serve(unix_socket = sock))
+  await asyncio.sleep(0.1)
+  try:
+    return await asyncio.wait_for(asyncio.gather(*[post(path,body,sock) for path,body in requests]),10)
+  finally:
+    server.cancel()
+    try:
+      await server
+    except asyncio.CancelledError:
+      pass
+    service.close()
+
+
+def test_malformed_requests_rejected(simplifier,tmp_path):
+  requests = [("/simplify-word",{"word" : "w1"}),
+              ("/simplify-word",{"word" : "w1", "context" : ["w0","w2"]}),
+              ("/simplify-word",{"word" : "w1", "context" : {"left" : "w0"}}),
+              ("/simplify-word",{"word" : 1}),
+              ("/simplify-word",{"word" : ["w1"]}),
+              ("/simplify-word",{"context" : "w0"}),
+              ("/simplify-text",{"text" : {"tokens" : ["w1"]}}),
+              ("/simplify-text",{"text" : ["w1",2]}),
+              ("/simplify-text",{"text" : ["w1","w2"]}),
+              ("/simplify-word",["w1"])]
+  
+  results = asyncio.run(serve_requests(simplifier,requests,str(tmp_path / "service.sock")))
+  
+  assert [status for status,_ in results] == [200,400,400,400,400,400,400,400,200,400]
+  assert all("error" in result for status,result in results if status == 400)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 19:06:12 2026
+
+@author: Samuele Garda
+"""
+
+import numpy as np
+import spacy
+import pytest
+from freq_store import StringTable
+from components.vocabulary import Vocabulary
+
+
+@pytest.fixture
+def vocab(embedding_model,cwi):
+  # words that are the same once lowercased
+  embedding_model.index2word[3] = "W1"
+  embedding_model.index2word[7] = "Wörter"
+  vocab = Vocabulary(embedding_model,cwi,mesh_words = {"w2","w5"})
+  vocab.compute_neighbors(10)
+  vocab.tag_words(spacy.blank("en"))
+  return vocab
+
+
+@pytest.mark.parametrize("mmap", [True,False])
+def test_loaded_same_as_built(vocab,tmp_path,mmap):
+  vocab.save(str(tmp_path / "vocab"))
+  loaded = Vocabulary.load(str(tmp_path / "vocab"), mmap = mmap)
+  
+  # words are not decoded when loading
+  assert isinstance(loaded.index2word,StringTable) and isinstance(loaded.words,StringTable)
+  assert len(loaded) == len(vocab)
+  assert list(loaded.index2word) == vocab.index2word and list(loaded.words) == vocab.words
+  
+  assert [loaded.encode(w) for w in vocab.index2word] == list(range(len(vocab)))
+  assert loaded.encode("w3") is None and loaded.encode("unknown") is None
+  
+  ids = np.asarray([1,3,7,2,1])
+  assert loaded.decode(ids) == vocab.decode(ids) == ["w1","wörter","w2"]
+  
+  for name in Vocabulary.ARRAYS + Vocabulary.NEIGHBOR_ARRAYS + ["pos"]:
+    assert np.array_equal(getattr(loaded,name),getattr(vocab,name))
+  assert loaded.tag2id == vocab.tag2id
+  assert loaded.in_mesh[[2,5]].all() and loaded.in_mesh.sum() == 2
+  
+  assert np.array_equal(loaded.get_neighbors(4,5)[0],vocab.get_neighbors(4,5)[0])
+  assert np.allclose(loaded.similarity(4,ids),vocab.similarity(4,ids))
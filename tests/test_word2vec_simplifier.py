@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 11:48:20 2026
+
+@author: Samuele Garda
+"""
+
+import spacy
+import pytest
+from components.vocabulary import Vocabulary
+from components.generators import Word2VecGenerator
+from components.selectors import SimpleScienceSelector,MeSHSelector
+from components.rankers import SimpleScienceRanker
+from simplifiers.simplescience import SimpleScience
+from simplifiers.hierarchical_simple import HierarchicalSimple
+
+
+@pytest.fixture
+def parser():
+  return spacy.blank("en")
+
+
+def build(name,parser,cwi,model,mesh_tree,vocab = None):
+  generator = Word2VecGenerator(topn = 30)
+  ranker = SimpleScienceRanker()
+  if name == "simplescience":
+    selector = SimpleScienceSelector(char_ngram = 4, cosine_threshold = 0.0, frequency_threshold = 1000)
+    return SimpleScience(parser,cwi,generator,selector,ranker,model,vocab = vocab)
+  selector = MeSHSelector(char_ngram = 4, mesh_db = mesh_tree)
+  return HierarchicalSimple(parser,cwi,generator,selector,ranker,model,vocab = vocab)
+
+
+@pytest.mark.parametrize("name", ["simplescience","hiersimple"])
+def test_ids_same_as_candidates(name,parser,cwi,embedding_model,mesh_tree):
+  plain = build(name,parser,cwi,embedding_model,mesh_tree)
+  mesh_words = plain.selector.mesh_words if name == "hiersimple" else None
+  vocab = Vocabulary(embedding_model,cwi,mesh_words)
+  with_ids = build(name,parser,cwi,embedding_model,mesh_tree,vocab = vocab)
+  
+  words = embedding_model.index2word[:60]
+  results = [plain.simplify_word(w) for w in words]
+  
+  assert any(results)
+  assert [with_ids.simplify_word(w) for w in words] == results
+  assert with_ids.simplify_word("unknown") == []
+
+
+@pytest.mark.parametrize("name", ["simplescience","hiersimple"])
+def test_ids_text_same_as_candidates(name,parser,cwi,embedding_model,mesh_tree):
+  plain = build(name,parser,cwi,embedding_model,mesh_tree)
+  mesh_words = plain.selector.mesh_words if name == "hiersimple" else None
+  with_ids = build(name,parser,cwi,embedding_model,mesh_tree,vocab = Vocabulary(embedding_model,cwi,mesh_words))
+  
+  text = embedding_model.index2word[:40] + ["unknown"] + embedding_model.index2word[:10]
+  
+  assert with_ids.simplify_text(text) == plain.simplify_text(text)
+
+
+@pytest.mark.parametrize("name", ["simplescience","hiersimple"])
+def test_ids_document_ranked_in_one_batch(name,parser,cwi,embedding_model,mesh_tree,monkeypatch):
+  plain = build(name,parser,cwi,embedding_model,mesh_tree)
+  mesh_words = plain.selector.mesh_words if name == "hiersimple" else None
+  with_ids = build(name,parser,cwi,embedding_model,mesh_tree,vocab = Vocabulary(embedding_model,cwi,mesh_words))
+  
+  batches = []
+  rank_batch = with_ids.ranker.rank_candidate_ids_batch
+  
+  def count_batches(pairs,truncate = True):
+    batches.append(len(pairs))
+    return rank_batch(pairs, truncate = truncate)
+  
+  monkeypatch.setattr(with_ids.ranker,"rank_candidate_ids_batch",count_batches)
+  
+  words = embedding_model.index2word
+  text = words[:15] + ["."] + words[10:30] + ["."] + words[:5] + ["unknown","."]
+  
+  assert with_ids.simplify_document(text) == plain.simplify_document(text)
+  # all complex words of the document found in vocabulary are ranked at once
+  assert len(batches) == 1 and batches[0] == len([w for w in set(words[:30]) if cwi.is_complex(w)])